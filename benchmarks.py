@@ -0,0 +1,498 @@
+"""
+Fantasy Crew - Benchmarks
+=========================
+
+Micro-benchmarks for the hot paths of the data pipeline. Each benchmark compares the
+current implementation with the previous one (kept here as a reference) on synthetic
+data or on a recorded payload.
+
+Usage:
+    python benchmarks.py laliga [--players 5000] [--extra-fields 20] [--payload data.json]
+    python benchmarks.py comuniate [--fixtures DIR] [--record DIR]
+    python benchmarks.py pipeline --cassette FILE [--latency recorded|SECONDS]
+    python benchmarks.py scale [--players 20000] [--managers 500] [--latency-ms 50] [--rate-limit 50]
+    python benchmarks.py matching [--teams 20] [--squad 25]
+    python benchmarks.py fitness [--players 20000]
+    python benchmarks.py features [--players 20000]
+"""
+
+import argparse
+import glob
+import itertools
+import json
+import os
+import random
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+
+def measure(label, func, *args, repeat: int = 3):
+    """Runs func(*args) `repeat` times and prints the best wall time and the peak memory."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"   • {label:<28} {best * 1000:9.1f} ms   peak {peak / 1024 / 1024:8.1f} MB")
+    return result, best
+
+
+# ----------------------------------------------------------------------
+# LaLiga competition payload
+# ----------------------------------------------------------------------
+
+def synthetic_laliga_payload(n_players: int = 5000, extra_fields: int = 0, seed: int = 0) -> bytes:
+    """Builds a competitions/la-liga/data payload with `n_players` players."""
+    rng = random.Random(seed)
+    statuses = ['ok', 'injured', 'doubt', 'sanctioned']
+    players = {}
+    for i in range(n_players):
+        player = {
+            'name': f"Player {i}",
+            'slug': f"player-{i}",
+            'teamID': rng.randint(1, 20),
+            'position': rng.randint(1, 4),
+            'altPositions': rng.sample([1, 2, 3, 4], rng.randint(0, 2)),
+            'price': rng.randint(150_000, 60_000_000),
+            'priceIncrement': rng.randint(-500_000, 500_000),
+            'status': rng.choice(statuses),
+            'statusInfo': None,
+            'fitness': [rng.choice([rng.randint(-2, 18), None, 'injured']) for _ in range(5)],
+            'points': rng.randint(0, 200),
+            'pointsHome': rng.randint(0, 100),
+            'pointsAway': rng.randint(0, 100),
+            'playedHome': rng.randint(0, 19),
+            'playedAway': rng.randint(0, 19),
+        }
+        for k in range(extra_fields):
+            player[f"extra{k}"] = {'value': rng.random(), 'history': [rng.randint(0, 9) for _ in range(5)]}
+        players[str(100_000 + i)] = player
+
+    teams = {str(t): {'name': f"Team {t}", 'slug': f"team-{t}", 'nextGames': []} for t in range(1, 21)}
+    return json.dumps({'data': {'players': players, 'teams': teams, 'season': {'rounds': []}, 'activeEvents': []}}).encode('utf-8')
+
+
+def legacy_players_info(content: bytes) -> pd.DataFrame:
+    """Previous implementation: json decode, keep the dict, append to 16 lists."""
+    players = json.loads(content).get('data', {}).get('players', {})
+    data_dict = {k: [] for k in ['id', 'name', 'slug', 'teamID', 'position', 'altPositions', 'price',
+                                 'priceIncrement', 'status', 'statusInfo', 'fitness', 'points',
+                                 'pointsHome', 'pointsAway', 'playedHome', 'playedAway']}
+    for player_id, player in players.items():
+        data_dict['id'].append(int(player_id))
+        data_dict['name'].append(player.get('name', ''))
+        data_dict['slug'].append(player.get('slug', ''))
+        data_dict['teamID'].append(player.get('teamID'))
+        data_dict['position'].append(player.get('position'))
+        data_dict['altPositions'].append(player.get('altPositions'))
+        data_dict['price'].append(player.get('price', 0))
+        data_dict['priceIncrement'].append(player.get('priceIncrement', 0))
+        data_dict['status'].append(player.get('status', 'unknown'))
+        data_dict['statusInfo'].append(player.get('statusInfo'))
+        data_dict['fitness'].append(player.get('fitness', []))
+        data_dict['points'].append(player.get('points', 0))
+        data_dict['pointsHome'].append(player.get('pointsHome'))
+        data_dict['pointsAway'].append(player.get('pointsAway'))
+        data_dict['playedHome'].append(player.get('playedHome'))
+        data_dict['playedAway'].append(player.get('playedAway'))
+    return pd.DataFrame(data_dict)
+
+
+def columnar_players_info(content: bytes) -> pd.DataFrame:
+    import orjson
+    from src.data_extraction.biwenger_data import players_frame
+    data = orjson.loads(content).get('data') or {}
+    return players_frame(data.get('players') or {})
+
+
+def bench_laliga(args):
+    if args.payload:
+        with open(args.payload, 'rb') as f:
+            content = f.read()
+    else:
+        content = synthetic_laliga_payload(args.players, args.extra_fields)
+
+    print(f"\n📦 LaLiga payload: {len(content) / 1024 / 1024:.1f} MB")
+    legacy, legacy_time = measure("json + python lists", legacy_players_info, content)
+    current, current_time = measure("orjson + columnar", columnar_players_info, content)
+    assert legacy['id'].tolist() == current['id'].tolist()
+    print(f"   ⚡ Speedup: {legacy_time / current_time:.1f}x")
+
+
+# ----------------------------------------------------------------------
+# Comuniate lineups HTML
+# ----------------------------------------------------------------------
+
+def synthetic_lineup_html(team_id: int, seed: int = 0) -> str:
+    """Builds a pintar_alineacion.php response with the structure of the real one (4-3-3 plus decoration)."""
+    rng = random.Random(seed * 1000 + team_id)
+    lines = [('portero', 1), ('defensas', 4), ('medios', 3), ('delanteros', 3)]
+    parts = ['<div class="campo_futbol"><style>.jugador_campo{position:absolute}</style>']
+    for container_id, n_players in lines:
+        parts.append(f'<div id="{container_id}" class="linea">')
+        for i in range(n_players):
+            name = f"Jugador {team_id}-{container_id[:3]}-{i}"
+            alternativo = f'<div class="alternativo">Suplente {team_id}-{i}</div>' if rng.random() < 0.3 else ''
+            porcentaje = f'<div class="icono_porcentaje">{rng.choice([50, 60, 70, 80, 90])}%</div>' if rng.random() < 0.5 else ''
+            apercibido = '<div class="apercibido">4</div>' if rng.random() < 0.2 else ''
+            duda = '<div class="duda" title="Duda"></div>' if rng.random() < 0.15 else ''
+            parts.append(
+                f'<div class="jugador_campo pos_{i}" data-id="{team_id * 100 + i}">'
+                f'<a href="/jugadores/{team_id * 100 + i}/jugador"><img src="/img/jugadores/{team_id * 100 + i}.png" alt="{name}"></a>'
+                f'{porcentaje}{apercibido}{duda}'
+                f'<div class="nombre_jugador">\n  {name}\n  {alternativo}</div>'
+                f'<div class="puntos_jugador"><span>{rng.randint(0, 20)}</span> pts</div>'
+                '</div>'
+            )
+        parts.append('</div>')
+    parts.append('<div class="leyenda">' + '<span class="item">&nbsp;</span>' * 40 + '</div></div>')
+    return "".join(parts)
+
+
+def record_comuniate_fixtures(folder: str):
+    """Downloads the current lineup HTML of every team into `folder` (<team_id>.html)."""
+    from src.data_extraction.external_data import ComuniateData
+
+    os.makedirs(folder, exist_ok=True)
+    comuniate = ComuniateData(cache_file=None)
+    comuniate.initialize_session()
+    comuniate.load_league_data()
+    for team_id, team_name in comuniate.teams_map.items():
+        html = comuniate.get_probable_lineup(id_equipo=team_id)
+        if html:
+            with open(os.path.join(folder, f"{team_id}.html"), 'w', encoding='utf-8') as f:
+                f.write(html)
+            print(f"   • {team_name} -> {team_id}.html")
+
+
+def parse_all(parser, fixtures):
+    return [parser.parse_lineup(html) for html in fixtures]
+
+
+def bench_comuniate(args):
+    from src.data_extraction.html_parsers import HTML_PARSERS
+
+    if args.record:
+        record_comuniate_fixtures(args.record)
+        args.fixtures = args.record
+
+    if args.fixtures:
+        paths = sorted(glob.glob(os.path.join(args.fixtures, '*.html')))
+        fixtures = []
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                fixtures.append(f.read())
+        source = f"{len(fixtures)} recorded fixtures from {args.fixtures}"
+    else:
+        fixtures = [synthetic_lineup_html(team_id) for team_id in range(1, 21)]
+        source = "20 synthetic fixtures"
+
+    size = sum(len(html) for html in fixtures)
+    print(f"\n📦 Comuniate lineups: {source} ({size / 1024:.0f} KB)")
+    results = {}
+    for name, parser_class in HTML_PARSERS.items():
+        results[name] = measure(f"{name}", parse_all, parser_class(), fixtures)
+    # Both backends must produce the same records
+    assert results['lxml'][0] == results['bs4'][0]
+    print(f"   ⚡ Speedup: {results['bs4'][1] / results['lxml'][1]:.1f}x")
+
+
+# ----------------------------------------------------------------------
+# Full extraction pipeline (offline, from a recorded cassette)
+# ----------------------------------------------------------------------
+
+def bench_pipeline(args):
+    """
+    Replays a cassette recorded with HTTP_MODE=record through the whole extraction DAG: no
+    network, no pacing sleeps, optionally with the recorded latency injected.
+    """
+    from src.data_extraction.cassette import use_cassette
+    from src.data_extraction.pipeline import extract_and_save_data
+
+    latency = args.latency if args.latency in (None, 'recorded') else float(args.latency)
+    use_cassette(args.cassette, 'replay', latency)
+    print(f"\n📼 Extraction pipeline replayed from {args.cassette} (latency: {latency or 'none'})")
+    start = time.perf_counter()
+    extract_and_save_data(max_workers=args.workers)
+    print(f"   ⏱️ Total: {time.perf_counter() - start:.2f}s")
+
+
+# ----------------------------------------------------------------------
+# Biwenger extractors at league scale (local stand-in server)
+# ----------------------------------------------------------------------
+
+def bench_scale(args):
+    """
+    Runs BiwengerAuth, LaLigaGeneralData and UserLeagueData against biwenger_stub.py with
+    `--players` players and `--managers` managers, reporting wall time and peak memory.
+    """
+    from biwenger_stub import StubWorld, make_server, start_in_thread
+
+    world = StubWorld(args.players, args.managers, 1)
+    server = make_server(world, latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 2, rate_limit=args.rate_limit)
+    base_url = start_in_thread(server)
+    # The extractors read the base URLs when imported
+    os.environ['BIWENGER_BASE_URL'] = os.environ['BIWENGER_CDN_URL'] = base_url
+    from src.data_extraction.auth import BiwengerAuth
+    from src.data_extraction.biwenger_data import LaLigaGeneralData, UserLeagueData
+    from src.data_extraction.http_client import HTTP_METRICS
+
+    print(f"\n🧪 Stand-in at {base_url}: {args.players} players, {args.managers} managers, "
+          f"latency {args.latency_ms:.0f} ms, rate limit {args.rate_limit or 'none'}")
+
+    def authenticate():
+        auth = BiwengerAuth('stub@example.com', 'stub', token_store=None)
+        auth.run()
+        return auth
+
+    def laliga(auth):
+        data = LaLigaGeneralData(auth.session)
+        data.run()
+        return data
+
+    def user_league(auth):
+        league = auth.player_info.primary
+        data = UserLeagueData(auth.session, auth.token, league.league_id, league.team_id,
+                              max_workers=args.workers, requests_per_second=args.rps)
+        data.run(auth.session)
+        return data
+
+    auth, _ = measure("auth + account", authenticate, repeat=1)
+    laliga_data, _ = measure(f"laliga ({args.players} players)", laliga, auth, repeat=1)
+    league_data, _ = measure(f"user_league ({args.managers} managers)", user_league, auth, repeat=1)
+    print(f"   📋 {len(laliga_data.df_players)} players, {len(league_data.df_league_players)} squad rows")
+    HTTP_METRICS.print_summary()
+    server.shutdown()
+
+
+# ----------------------------------------------------------------------
+# Comuniate -> Biwenger fuzzy matching
+# ----------------------------------------------------------------------
+
+FIRST_NAMES = ['Álvaro', 'Iñaki', 'José', 'Juan', 'Pedro', 'Sergio', 'Raúl', 'Dani', 'Pablo', 'Javier',
+               'Marcos', 'Nico', 'Óscar', 'Rubén', 'Jesús', 'Adrián', 'Mikel', 'Unai', 'Jon', 'Carlos']
+LAST_NAMES = ['García', 'Fernández', 'González', 'Rodríguez', 'López', 'Martínez', 'Sánchez', 'Pérez',
+              'Gómez', 'Martín', 'Jiménez', 'Ruiz', 'Hernández', 'Díaz', 'Moreno', 'Muñoz', 'Álvarez',
+              'Romero', 'Navarro', 'Torres', 'Domínguez', 'Vázquez', 'Ramos', 'Gil', 'Serrano', 'Iglesias']
+
+
+def synthetic_matching_data(n_teams: int = 20, squad: int = 25, seed: int = 0):
+    """
+    Biwenger players/teams and the Comuniate names of the same players written the way Comuniate
+    does (short name, no first name, or without accents), shuffled. TRUE_NAME is the right match.
+    """
+    import unicodedata
+
+    rng = random.Random(seed)
+    teams = pd.DataFrame({'TEAM_ID': range(1, n_teams + 1), 'TEAM_NAME': [f"Club {t}" for t in range(1, n_teams + 1)]})
+    players, comuniate = [], []
+    for team_id in teams['TEAM_ID']:
+        for i in range(squad):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            name = f"{first} {last} {rng.choice(LAST_NAMES)}" if rng.random() < 0.3 else f"{first} {last}"
+            players.append({'PLAYER_ID': team_id * 1000 + i, 'PLAYER_NAME': name, 'PLAYER_TEAM_ID': team_id,
+                            'PLAYER_POSITION': rng.randint(1, 4)})
+            variant = rng.choice(['short', 'last', 'ascii', 'same'])
+            if variant == 'short':
+                name = f"{first[0]}. {last}"
+            elif variant == 'last':
+                name = name.split(' ', 1)[1]
+            elif variant == 'ascii':
+                name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+            comuniate.append({'COMUNIATE_NAME': name, 'COMUNIATE_TEAM': f"C. {team_id}" if team_id % 2 else f"Club {team_id}",
+                              'TRUE_NAME': players[-1]['PLAYER_NAME']})
+    rng.shuffle(comuniate)
+    return pd.DataFrame(players), teams, pd.DataFrame(comuniate)
+
+
+def legacy_match_players(df_comuniate: pd.DataFrame, df_aux: pd.DataFrame) -> list:
+    """Previous implementation: team filter + thefuzz extractOne per Comuniate row."""
+    from thefuzz import process
+
+    equipos_destino = df_aux['TEAM_NAME'].unique()
+    equipos = {e: process.extractOne(e, equipos_destino)[0] for e in df_comuniate['COMUNIATE_TEAM'].unique()}
+    matches = []
+    for _, row in df_comuniate.iterrows():
+        team_name = equipos[row['COMUNIATE_TEAM']]
+        players_team_list = df_aux[df_aux['TEAM_NAME'] == team_name]['PLAYER_NAME'].tolist()
+        matches.append(process.extractOne(row['COMUNIATE_NAME'], players_team_list)[0])
+    return matches
+
+
+def blocked_match_players(df_comuniate: pd.DataFrame, df_aux: pd.DataFrame) -> list:
+    from src.data_extraction.matching import match_names, match_players
+
+    equipos = match_names(df_comuniate['COMUNIATE_TEAM'], df_aux['TEAM_NAME'].unique())
+    matches = match_players(df_comuniate['COMUNIATE_NAME'], df_comuniate['COMUNIATE_TEAM'].map(equipos),
+                            df_aux[['PLAYER_ID', 'PLAYER_NAME', 'TEAM_NAME']])
+    return matches['PLAYER_NAME'].tolist()
+
+
+def bench_matching(args):
+    df_players, df_teams, df_comuniate = synthetic_matching_data(args.teams, args.squad)
+    df_aux = df_players.merge(df_teams, left_on="PLAYER_TEAM_ID", right_on="TEAM_ID", how="left")
+
+    print(f"\n🔗 Comuniate matching: {len(df_comuniate)} names against {len(df_players)} players in {args.teams} teams")
+    legacy, legacy_time = measure("extractOne per row", legacy_match_players, df_comuniate, df_aux)
+    current, current_time = measure("cdist per team", blocked_match_players, df_comuniate, df_aux)
+    truth = df_comuniate['TRUE_NAME'].tolist()
+    # Homonyms in a squad (e.g. two 'Pedro García') count as right whichever is picked
+    accuracy = {name: sum(m == t for m, t in zip(matches, truth)) / len(truth) for name, matches in
+                (('extractOne', legacy), ('cdist', current))}
+    print(f"   🎯 Right matches: extractOne {accuracy['extractOne']:.1%}, cdist {accuracy['cdist']:.1%}")
+
+    # Regression: plain WRatio prefers 'Adrián Muñoz' (85.5 vs 79.2) for an initial
+    from src.data_extraction.matching import match_names
+    assert match_names(['Ó. Muñoz'], ['Adrián Muñoz', 'Óscar Muñoz'])['Ó. Muñoz'] == 'Óscar Muñoz'
+    print(f"   ⚡ Speedup: {legacy_time / current_time:.1f}x")
+
+
+# ----------------------------------------------------------------------
+# Momentum from PLAYER_FITNESS
+# ----------------------------------------------------------------------
+
+def legacy_momentum(fitness: pd.Series) -> pd.Series:
+    """Previous implementation: Python loop over each player's fitness list."""
+    def calculate_momentum(val_list):
+        if not isinstance(val_list, list):
+            return 0.0
+        processed_points = []
+        for x in val_list:
+            if x in ['injured', 'sanctioned', 'doubt']:
+                continue
+            if x is None or x == 'discarded':
+                processed_points.append(0.0)
+            elif isinstance(x, (int, float)):
+                processed_points.append(float(x))
+        if not processed_points:
+            return 0.0
+        return sum(processed_points) / len(processed_points)
+    return fitness.apply(calculate_momentum)
+
+
+def matrix_momentum(points, codes):
+    from src.data_extraction.fitness import momentum
+    return momentum(points, codes)
+
+
+def bench_fitness(args):
+    from src.data_extraction.fitness import fitness_matrix
+
+    rng = random.Random(0)
+    tokens = ['injured', 'sanctioned', 'doubt', 'discarded', None]
+    fitness = pd.Series([[rng.randint(-2, 18) if rng.random() < 0.7 else rng.choice(tokens) for _ in range(5)]
+                         for _ in range(args.players)])
+
+    print(f"\n📈 Momentum of {args.players} players (5 matches each)")
+    legacy, legacy_time = measure(".apply per player", legacy_momentum, fitness)
+    (points, codes), ingest_time = measure("fitness matrix (ingestion)", fitness_matrix, fitness)
+    current, current_time = measure("masked reduction", matrix_momentum, points, codes)
+    assert np.allclose(legacy.to_numpy(), current)
+    print(f"   ⚡ Speedup: {legacy_time / current_time:.0f}x per feature engineering run, "
+          f"{legacy_time / (ingest_time + current_time):.1f}x including the ingestion")
+
+
+# ----------------------------------------------------------------------
+# Feature engineering of df_master
+# ----------------------------------------------------------------------
+
+def synthetic_consolidated(n_players: int, seed: int = 0) -> pd.DataFrame:
+    """Consolidated player columns the feature engineering reads."""
+    from src.data_extraction.fitness import fitness_columns
+
+    rng = np.random.default_rng(seed)
+    tokens = ['injured', 'sanctioned', 'doubt', 'discarded', None]
+    fitness = pd.Series([[int(rng.integers(-2, 18)) if rng.random() < 0.7 else tokens[rng.integers(len(tokens))]
+                          for _ in range(5)] for _ in range(n_players)])
+    df = pd.DataFrame({
+        'PLAYER_ID': np.arange(n_players),
+        'PLAYER_POSITION': pd.array(rng.integers(1, 5, n_players), dtype='Int64'),
+        'PLAYER_ALT_POSITIONS': [[int(p)] if p < 5 else [] for p in rng.integers(1, 9, n_players)],
+        'PLAYER_FITNESS': fitness,
+        'PLAYER_POINTS': rng.integers(0, 150, n_players).astype(float),
+        'AVG_POINTS': rng.random(n_players) * 8,
+        'MARKET_SALE_PRICE': np.where(rng.random(n_players) < 0.1, rng.integers(100_000, 20_000_000, n_players), 0).astype(float),
+        'BIWPLAYER_CLAUSE': np.where(rng.random(n_players) < 0.3, rng.integers(100_000, 20_000_000, n_players), np.nan),
+        'BIWPLAYER_CLAUSE_LOCKED_UNTIL': pd.Series([pd.NaT] * n_players),
+        'COMUNIATE_STARTER': np.where(rng.random(n_players) < 0.6, rng.random(n_players), np.nan),
+        'COMUNIATE_SUPPLENT': np.where(rng.random(n_players) < 0.6, rng.random(n_players), np.nan),
+    })
+    return pd.concat([df, fitness_columns(df['PLAYER_FITNESS'])], axis=1)
+
+
+def bench_features(args):
+    from src.agents.data_analyst import FEATURES
+    from src.data_extraction.features import FeatureGraph
+
+    base = synthetic_consolidated(args.players)
+    # A market poll: a few sale prices move, everything else is unchanged
+    polled = base.copy()
+    polled.loc[polled.sample(10, random_state=0).index, 'MARKET_SALE_PRICE'] = 5_000_000.0
+
+    graph = FeatureGraph(FEATURES)
+    graph.build(base)
+    # Alternates between both frames so every build sees a market change
+    frames = itertools.cycle([polled, base])
+
+    print(f"\n🧮 Feature engineering of {args.players} players")
+    full, full_time = measure("full build", lambda df: FeatureGraph(FEATURES).build(df), polled)
+    _, incremental_time = measure("after a market poll", lambda: graph.build(next(frames)))
+    graph.build(base)
+    pd.testing.assert_frame_equal(graph.build(polled), full)
+    print(f"   ⏱️ {graph.summary()}")
+    print(f"   ⚡ Speedup: {full_time / incremental_time:.1f}x per rebuild")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fantasy Crew benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    laliga = subparsers.add_parser("laliga", help="Parse of the LaLiga competition payload")
+    laliga.add_argument("--players", type=int, default=5000)
+    laliga.add_argument("--extra-fields", type=int, default=0)
+    laliga.add_argument("--payload", help="Recorded competitions/la-liga/data response")
+    laliga.set_defaults(func=bench_laliga)
+
+    comuniate = subparsers.add_parser("comuniate", help="Parse of the Comuniate lineups HTML (bs4 vs lxml)")
+    comuniate.add_argument("--fixtures", help="Folder with recorded <team_id>.html lineups")
+    comuniate.add_argument("--record", help="Download the current lineups into this folder first")
+    comuniate.set_defaults(func=bench_comuniate)
+
+    pipeline = subparsers.add_parser("pipeline", help="Full extraction replayed from a recorded cassette")
+    pipeline.add_argument("--cassette", required=True, help="Cassette recorded with HTTP_MODE=record")
+    pipeline.add_argument("--latency", help="'recorded' or seconds per request (default: none)")
+    pipeline.add_argument("--workers", type=int, default=4)
+    pipeline.set_defaults(func=bench_pipeline)
+
+    scale = subparsers.add_parser("scale", help="Biwenger extractors against the local stand-in server")
+    scale.add_argument("--players", type=int, default=20000)
+    scale.add_argument("--managers", type=int, default=500)
+    scale.add_argument("--latency-ms", type=float, default=0)
+    scale.add_argument("--rate-limit", type=float, help="Requests per second the stand-in accepts before 429")
+    scale.add_argument("--workers", type=int, default=8, help="UserLeagueData threads")
+    scale.add_argument("--rps", type=float, default=50, help="UserLeagueData token bucket rate")
+    scale.set_defaults(func=bench_scale)
+
+    matching = subparsers.add_parser("matching", help="Comuniate -> Biwenger fuzzy matching (extractOne vs cdist)")
+    matching.add_argument("--teams", type=int, default=20)
+    matching.add_argument("--squad", type=int, default=25, help="Players per team")
+    matching.set_defaults(func=bench_matching)
+
+    fitness = subparsers.add_parser("fitness", help="Momentum: .apply over fitness lists vs masked matrix reduction")
+    fitness.add_argument("--players", type=int, default=20000)
+    fitness.set_defaults(func=bench_fitness)
+
+    features = subparsers.add_parser("features", help="df_master features: full build vs incremental after a market poll")
+    features.add_argument("--players", type=int, default=20000)
+    features.set_defaults(func=bench_features)
+
+    args = parser.parse_args()
+    args.func(args)
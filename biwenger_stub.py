@@ -0,0 +1,292 @@
+"""
+Fantasy Crew - Biwenger stand-in server
+=======================================
+
+Local HTTP server that mimics the Biwenger endpoints hit by the extractors, with synthetic data
+of configurable size, so BiwengerAuth / LaLigaGeneralData / UserLeagueData can be load tested at
+league scale without touching the real API:
+
+    POST /api/v2/auth/login                     GET  /api/v2/league        (x-league header)
+    GET  /api/v2/account                        GET  /api/v2/market        (x-league header)
+    GET  /api/v2/competitions/la-liga/data      GET  /api/v2/user/{id}
+    GET  /api/v2/rounds/la-liga
+
+It can also simulate latency (`latency_ms` ± `jitter_ms`), a rate limit (429 + Retry-After once
+more than `rate_limit` requests per second arrive) and random 503s (`error_rate`).
+
+Usage:
+    python biwenger_stub.py [--players 5000] [--managers 200] [--leagues 3] [--port 8765]
+                            [--latency-ms 80] [--jitter-ms 40] [--rate-limit 20] [--error-rate 0.01]
+
+Then point the extractors to it (any email/password logs in):
+    BIWENGER_BASE_URL=http://127.0.0.1:8765/ BIWENGER_CDN_URL=http://127.0.0.1:8765/
+"""
+
+import argparse
+import base64
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+N_TEAMS = 20
+SQUAD_SIZE = 15
+SALES_PER_LEAGUE = 20
+STATUSES = ['ok', 'ok', 'ok', 'ok', 'injured', 'doubt', 'sanctioned']
+
+
+def _fake_jwt(user_id: int, ttl: float = 24 * 3600) -> str:
+    """Unsigned JWT with an `exp` claim (the extractors only read the expiry)."""
+    def encode(part: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(part).encode('utf-8')).decode('ascii').rstrip('=')
+    return f"{encode({'alg': 'none'})}.{encode({'sub': user_id, 'exp': int(time.time() + ttl)})}.stub"
+
+
+class StubWorld:
+    """Synthetic competition (players, teams, rounds) and leagues of managers, built once."""
+    def __init__(self, n_players: int = 5000, n_managers: int = 20, n_leagues: int = 1, seed: int = 0):
+        rng = random.Random(seed)
+        now = int(time.time())
+
+        self.teams = {}
+        team_ids = list(range(1, N_TEAMS + 1))
+        rng.shuffle(team_ids)
+        fixtures = list(zip(team_ids[::2], team_ids[1::2]))
+        for home, away in fixtures:
+            date = now + rng.randint(1, 6) * 86400
+            for team_id in (home, away):
+                self.teams[str(team_id)] = {
+                    'id': team_id,
+                    'name': f"Team {team_id}",
+                    'slug': f"team-{team_id}",
+                    'nextGames': [{'date': date, 'home': {'id': home}, 'away': {'id': away}}]
+                }
+
+        self.players = {}
+        for player_id in range(1, n_players + 1):
+            played_home, played_away = rng.randint(0, 10), rng.randint(0, 10)
+            self.players[str(player_id)] = {
+                'name': f"Player {player_id}",
+                'slug': f"player-{player_id}",
+                'teamID': rng.randint(1, N_TEAMS),
+                'position': rng.randint(1, 4),
+                'altPositions': rng.sample([1, 2, 3, 4], rng.randint(0, 2)),
+                'price': rng.randint(150_000, 60_000_000),
+                'priceIncrement': rng.randint(-500_000, 500_000),
+                'status': rng.choice(STATUSES),
+                'statusInfo': None,
+                'fitness': [rng.choice([rng.randint(-2, 15), 'injured', None]) for _ in range(5)],
+                'points': rng.randint(0, 150),
+                'pointsHome': rng.randint(0, 80) if played_home else 0,
+                'pointsAway': rng.randint(0, 80) if played_away else 0,
+                'playedHome': played_home,
+                'playedAway': played_away,
+            }
+
+        self.rounds = [{'id': 1000 + r, 'name': f"Jornada {r}", 'short': f"J{r}", 'type': 'league',
+                        'status': 'finished' if r < 10 else 'pending'} for r in range(1, 39)]
+        self.next_round = {
+            'name': "Jornada 10",
+            'games': [{'date': self.teams[str(home)]['nextGames'][0]['date'],
+                       'home': {'name': f"Team {home}"}, 'away': {'name': f"Team {away}"},
+                       'location': f"Stadium {home}", 'status': 'pending'} for home, away in fixtures]
+        }
+        self.active_events = [{'id': 1, 'name': "Jornada 10", 'status': 'pending', 'end': now + 7 * 86400, 'type': 'round'}]
+
+        # Leagues: managers with disjoint squads drawn from the player pool
+        self.account = {'id': 1, 'name': "Stub User"}
+        self.leagues = {}
+        self.managers = {}
+        player_ids = [int(p) for p in self.players]
+        next_manager_id = 100
+        for league_index in range(n_leagues):
+            league_id = 5000 + league_index
+            rng.shuffle(player_ids)
+            standings = []
+            # Disjoint squads while the pool allows it (they wrap around for very large leagues)
+            squads = [[player_ids[(i * SQUAD_SIZE + k) % len(player_ids)] for k in range(SQUAD_SIZE)] for i in range(n_managers)]
+            for position, squad in enumerate(squads, start=1):
+                manager_id = next_manager_id
+                next_manager_id += 1
+                players = [{'id': player_id, 'owner': {
+                    'date': now - rng.randint(1, 200) * 86400,
+                    'price': rng.randint(150_000, 40_000_000),
+                    'clause': rng.randint(1_000_000, 80_000_000),
+                    'clauseLockedUntil': now + rng.randint(-5, 5) * 86400,
+                    'invested': rng.randint(0, 5_000_000)}} for player_id in squad]
+                self.managers[manager_id] = {'id': manager_id, 'name': f"Manager {manager_id}", 'players': players}
+                standings.append({'id': manager_id, 'name': f"Manager {manager_id}", 'points': rng.randint(0, 900),
+                                  'position': position, 'teamSize': len(players),
+                                  'teamValue': sum(self.players[str(p['id'])]['price'] for p in players),
+                                  'teamValueInc': rng.randint(-2_000_000, 2_000_000)})
+
+            sales = []
+            for player_id in rng.sample(player_ids, min(SALES_PER_LEAGUE, len(player_ids))):
+                seller = rng.choice(standings + [None])
+                sales.append({'player': {'id': player_id, 'owner': {'clause': rng.randint(1_000_000, 80_000_000)} if seller else None},
+                              'price': self.players[str(player_id)]['price'],
+                              'date': now - 3600, 'until': now + 86400,
+                              'user': {'id': seller['id'], 'name': seller['name']} if seller else None})
+            offers = [{'id': 900000 + i, 'amount': rng.randint(500_000, 10_000_000), 'created': now - 600,
+                       'until': now + 86400, 'status': 'waiting', 'type': 'purchase', 'from': None,
+                       'requestedPlayers': [squads[0][i]]} for i in range(min(3, len(squads[0]) if squads else 0))]
+
+            self.leagues[league_id] = {
+                'id': league_id, 'name': f"Stub League {league_index + 1}",
+                'user': standings[0] if standings else {'id': next_manager_id, 'name': "Manager"},
+                'standings': standings, 'sales': sales, 'offers': offers
+            }
+
+    def competition(self) -> dict:
+        return {'data': {'players': self.players, 'teams': self.teams, 'season': {'rounds': self.rounds},
+                         'activeEvents': self.active_events}}
+
+    def account_payload(self) -> dict:
+        return {'data': {'account': self.account, 'leagues': [
+            {'id': league['id'], 'name': league['name'],
+             'user': {'id': league['user']['id'], 'name': league['user']['name'], 'balance': 10_000_000}}
+            for league in self.leagues.values()]}}
+
+
+class _RateLimit:
+    """Non-blocking token bucket: answers whether a request fits in the limit."""
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+def make_server(world: StubWorld, host: str = '127.0.0.1', port: int = 0, latency_ms: float = 0, jitter_ms: float = 0,
+                rate_limit: float = None, error_rate: float = 0, seed: int = 0) -> ThreadingHTTPServer:
+    """
+    Builds (without starting) the stand-in server. `server.stats` counts the answered requests
+    per route and status; port 0 picks a free port (`server.server_port`).
+    """
+    limiter = _RateLimit(rate_limit) if rate_limit else None
+    rng = random.Random(seed)
+    stats = {}
+    stats_lock = threading.Lock()
+    user_route = re.compile(r'^/api/v2/user/(\d+)$')
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, route: str, status: int, payload=None, headers: dict = None):
+            body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+            with stats_lock:
+                stats.setdefault(route, {}).setdefault(status, 0)
+                stats[route][status] += 1
+
+        def _league(self):
+            return world.leagues.get(int(self.headers.get('x-league') or 0))
+
+        def _handle(self, method: str):
+            path = urlsplit(self.path).path
+            if method == 'POST':
+                self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+            if latency_ms or jitter_ms:
+                time.sleep(max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000)
+            if limiter is not None and not limiter.allow():
+                return self._send(path, 429, {'status': 429, 'message': 'Too many requests'}, {'Retry-After': '1'})
+            if error_rate and rng.random() < error_rate:
+                return self._send(path, 503, {'status': 503, 'message': 'Service unavailable'})
+
+            match = user_route.match(path)
+            if method == 'POST' and path == '/api/v2/auth/login':
+                return self._send(path, 200, {'token': _fake_jwt(world.account['id'])})
+            if method == 'GET' and path == '/':
+                return self._send(path, 200, {})
+            if method == 'GET' and path == '/api/v2/account':
+                return self._send(path, 200, world.account_payload())
+            if method == 'GET' and path == '/api/v2/competitions/la-liga/data':
+                return self._send(path, 200, world.competition())
+            if method == 'GET' and path == '/api/v2/rounds/la-liga':
+                return self._send(path, 200, {'data': {'next': world.next_round}})
+            if method == 'GET' and path == '/api/v2/league':
+                league = self._league()
+                if league is None:
+                    return self._send(path, 404, {'status': 404, 'message': 'League not found'})
+                return self._send(path, 200, {'data': {'id': league['id'], 'name': league['name'], 'standings': league['standings']}})
+            if method == 'GET' and path == '/api/v2/market':
+                league = self._league()
+                if league is None:
+                    return self._send(path, 404, {'status': 404, 'message': 'League not found'})
+                return self._send(path, 200, {'data': {'sales': league['sales'], 'offers': league['offers']}})
+            if method == 'GET' and match:
+                manager = world.managers.get(int(match.group(1)))
+                if manager is None:
+                    return self._send('/api/v2/user/{id}', 404, {'status': 404, 'message': 'User not found'})
+                return self._send('/api/v2/user/{id}', 200, {'data': manager})
+            return self._send(path, 404, {'status': 404, 'message': 'Not found'})
+
+        def do_GET(self):
+            self._handle('GET')
+
+        def do_POST(self):
+            self._handle('POST')
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.stats = stats
+    return server
+
+
+def start_in_thread(server: ThreadingHTTPServer) -> str:
+    """Serves in a daemon thread and returns the base URL (with trailing slash)."""
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in of the Biwenger API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--players", type=int, default=5000)
+    parser.add_argument("--managers", type=int, default=20, help="Managers per league")
+    parser.add_argument("--leagues", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--rate-limit", type=float, help="Requests per second before answering 429")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction of requests answered with 503")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    world = StubWorld(args.players, args.managers, args.leagues, seed=args.seed)
+    server = make_server(world, args.host, args.port, args.latency_ms, args.jitter_ms, args.rate_limit,
+                         args.error_rate, seed=args.seed)
+    print(f"🧪 Biwenger stand-in on http://{args.host}:{args.port}/ "
+          f"({args.players} players, {args.leagues} league(s) x {args.managers} managers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("\n📊 Requests served:")
+        for route, statuses in sorted(server.stats.items()):
+            print(f"   • {route:<40} " + ' '.join(f"{status}×{n}" for status, n in sorted(statuses.items())))
@@ -5,7 +5,8 @@ Fantasy Crew - LangGraph Multi-Agent System
 Entry point for running the Fantasy Crew using LangGraph orchestration.
 
 Usage:
-    python main_langgraph.py
+    python main_langgraph.py            # one run
+    python main_langgraph.py --daemon   # keep df_master fresh and re-run the agents on changes (src/daemon.py)
 
 This version uses LangGraph StateGraph for:
 - Explicit workflow visualization
@@ -14,13 +15,17 @@ This version uses LangGraph StateGraph for:
 - Checkpointing and debugging support
 """
 
+import argparse
 from datetime import datetime
 from src.graph import fantasy_crew_graph
 
 
-def run_fantasy_crew_langgraph():
+def run_fantasy_crew_langgraph(df_master=None):
     """
     Runs the Fantasy Crew multi-agent system using LangGraph.
+
+    Args:
+        df_master: Prebuilt df_master (e.g. the refresh daemon's). None extracts the data first.
     """
     print("=" * 60)
     print("🚀 FANTASY CREW - LangGraph Multi-Agent System")
@@ -29,7 +34,7 @@ def run_fantasy_crew_langgraph():
     
     # Initial state
     initial_state = {
-        "df_master": None,
+        "df_master": df_master,
         "coach_report": "",
         "sd_proposals": "",
         "president_decision": "",
@@ -51,6 +56,8 @@ def run_fantasy_crew_langgraph():
                     print("🚀 Node: DataAnalyst - Extracting and processing data...")
                     if node_output.get("error"):
                         print(f"   ❌ Error: {node_output['error']}")
+                    elif df_master is not None:
+                        print(f"   ✅ Using the resident df_master with {len(df_master)} rows")
                     else:
                         rows = len(node_output.get("df_master", [])) if node_output.get("df_master") is not None else 0
                         print(f"   ✅ df_master generated with {rows} rows")
@@ -96,4 +103,13 @@ def run_fantasy_crew_langgraph():
 
 
 if __name__ == "__main__":
-    run_fantasy_crew_langgraph()
+    parser = argparse.ArgumentParser(description="Fantasy Crew - LangGraph Multi-Agent System")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Refresh each source on its cadence and re-run the agents when df_master changes")
+    args = parser.parse_args()
+
+    if args.daemon:
+        from src.daemon import RefreshDaemon
+        RefreshDaemon(on_trigger=lambda df_master, reason: run_fantasy_crew_langgraph(df_master)).run_forever()
+    else:
+        run_fantasy_crew_langgraph()
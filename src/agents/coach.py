@@ -10,12 +10,12 @@ points for the upcoming jornada by selecting the best lineup and optimizing the
 Workflow:
 ---------
 1. **Identify User Team**:
-   - Retrieves the team name strictly from `./data/user_info.csv`.
+   - Retrieves the team name strictly from the `user_info` table.
    - Aborts analysis with an error if the team name is missing (no hardcoded fallbacks).
 2. **Filter Squad**:
    - Filters the consolidated `df_master` to isolate players belonging to the identified team.
 3. **Gather Context**:
-   - Loads upcoming Jornada details (name, dates) from `./data/next_match.csv`.
+   - Loads upcoming Jornada details (name, dates) from the `next_match` table.
    - Captures current timestamp for context.
 4. **Prepare Technical Metrics**:
    - **Positions**: Primary and valid alternatives for each player.
@@ -38,15 +38,16 @@ Workflow:
 
 Information Used:
 -----------------
-- **user_info.csv**: Crucial for team identification.
-- **next_match.csv**: Context for the upcoming Jornada and rivals.
+- **user_info**: Crucial for team identification.
+- **next_match**: Context for the upcoming Jornada and rivals.
 - **df_master**: The source of truth for player stats, status, and probabilities.
 """
 
 from src.llm_endpoints.deepseek import DeepseekClient
 from src.data_extraction.pipeline import print_step
+from src.data_extraction.positions import eligible_counts
+from src.data_extraction.storage import load_table
 import pandas as pd
-import os
 
 from src.config import GeneralSettings
 
@@ -60,16 +61,15 @@ class Coach:
 
     def get_my_team_name(self):
         """
-        Retrieves the user's team name from the persisted user_info.csv.
+        Retrieves the user's team name from the persisted user_info.
         Returns None if file not found.
         """
         try:
-            if os.path.exists('./data/user_info.csv'):
-                df_user = pd.read_csv('./data/user_info.csv')
-                if not df_user.empty:
-                    return df_user['team_name'].iloc[0]
+            df_user = load_table('user_info', columns=['team_name'])
+            if not df_user.empty:
+                return df_user['team_name'].iloc[0]
         except Exception as e:
-            print(f"⚠️ Warning: Could not read user_info.csv: {e}")
+            print(f"⚠️ Warning: Could not read user_info: {e}")
             
         return None
 
@@ -84,8 +84,8 @@ class Coach:
         # 1. Identify "My Team"
         my_team_name = self.get_my_team_name()
         if not my_team_name:
-            print("❌ Coach Error: 'team_name' not found in ./data/user_info.csv. Cannot proceed.")
-            return "Could not analyze squad: Team name missing in user_info.csv."
+            print("❌ Coach Error: 'team_name' not found in user_info. Cannot proceed.")
+            return "Could not analyze squad: Team name missing in user_info."
 
         print(f"   ℹ️ Analyzing squad for team: '{my_team_name}'")
 
@@ -106,27 +106,27 @@ class Coach:
         jornada_info = "Unknown Jornada"
         matches_summary = "No match data available."
         
-        if os.path.exists('./data/next_match.csv'):
-            try:
-                df_next = pd.read_csv('./data/next_match.csv')
-                if not df_next.empty:
-                    # Get general Jornada info from the first match
-                    first_match = df_next.iloc[0]
-                    jornada_name = first_match['NEXT_MATCH_JORNADA']
-                    start_date = first_match['NEXT_MATCH_FECHA']
-                    jornada_info = f"{jornada_name} (Starts: {start_date})"
-                    
-                    # Build match context table
-                    match_cols = ['NEXT_MATCH_LOCAL', 'NEXT_MATCH_VISITANTE', 'NEXT_MATCH_FECHA', 'ODDS_1', 'ODDS_X', 'ODDS_2']
-                    existing_match_cols = [c for c in match_cols if c in df_next.columns]
-                    matches_summary = df_next[existing_match_cols].to_markdown(index=False)
-            except Exception as e:
-                print(f"⚠️ Warning reading next_match.csv: {e}")
+        try:
+            df_next = load_table('next_match')
+            if not df_next.empty:
+                # Get general Jornada info from the first match
+                first_match = df_next.iloc[0]
+                jornada_name = first_match['NEXT_MATCH_JORNADA']
+                start_date = first_match['NEXT_MATCH_FECHA']
+                jornada_info = f"{jornada_name} (Starts: {start_date})"
+                
+                # Build match context table
+                match_cols = ['NEXT_MATCH_LOCAL', 'NEXT_MATCH_VISITANTE', 'NEXT_MATCH_FECHA', 'ODDS_1', 'ODDS_X', 'ODDS_2',
+                              'ODDS_PROB_1', 'ODDS_PROB_X', 'ODDS_PROB_2']
+                existing_match_cols = [c for c in match_cols if c in df_next.columns]
+                matches_summary = df_next[existing_match_cols].to_markdown(index=False)
+        except Exception as e:
+            print(f"⚠️ Warning reading next_match: {e}")
 
         # 4. Preparing Squad Data for Prompt
         # We need specific columns. If some are missing in df_master, handle gracefully.
         relevant_cols = [
-            'PLAYER_NAME', 'TEAM_NAME', 'TEAM_IS_HOME', 'PLAYER_POSITION', 'PLAYER_ALT_POSITIONS', 
+            'PLAYER_NAME', 'TEAM_NAME', 'TEAM_IS_HOME', 'TEAM_WIN_PROB', 'PLAYER_POSITION', 'PLAYER_ALT_POSITIONS', 
             'PLAYER_STATUS', 'COMUNIATE_STARTER', 
             'EXPECTED_POINTS', 'AVG_POINTS_MOMENTUM', 'MOMENTUM_TREND',
             'PLAYER_FITNESS', 'AVG_POINTS', 
@@ -138,6 +138,8 @@ class Coach:
         squad_view = my_squad[cols_to_use].copy()
         
         squad_summary = squad_view.to_markdown(index=False)
+        # Eligible players per position (PLAYER_POSITION or PLAYER_ALT_POSITIONS), from the POSITION_MASK bitmask
+        eligible_summary = ", ".join(f"{pos}: {count}" for pos, count in eligible_counts(my_squad).items())
         
         # 5. Construct the Super Prompt
         prompt = f"""
@@ -155,6 +157,8 @@ YOUR TEAM: "{my_team_name}"
 ## YOUR SQUAD
 {squad_summary}
 
+**Eligible players per position** (a versatile player counts in each of their positions): {eligible_summary}
+
 ---
 ## FIELD DEFINITIONS
 - **EXPECTED_POINTS (xP)**: Points expected for this matchday. Calculated as: `Momentum * (Prob. Starter + Prob. Sub * 0.8)`. **MAXIMIZE THIS.**
@@ -163,7 +167,9 @@ YOUR TEAM: "{my_team_name}"
 - **TEAM_IS_HOME**: `True` = team plays at home (usually better performance).
 - **PLAYER_STATUS**: 'ok' (available), 'injured', 'sanctioned' (suspended), 'doubt' (uncertain).
 - **COMUNIATE_STARTER**: Probability of starting (1.0 = 100%).
-- **ODDS_1 / ODDS_X / ODDS_2**: Win probabilities. High ODDS_1 at home = favorable match.
+- **ODDS_1 / ODDS_X / ODDS_2**: Betting quotes (home win / draw / away win). Lower quote = more likely.
+- **ODDS_PROB_1 / ODDS_PROB_X / ODDS_PROB_2**: Probabilities implied by the quotes (0-1).
+- **TEAM_WIN_PROB**: Probability that the player's team wins its next match (0-1). Higher = favorable match.
 
 ---
 ## RULES & TACTICS
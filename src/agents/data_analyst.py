@@ -1,8 +1,139 @@
+import os
 import pandas as pd
-import ast
 import numpy as np
-from thefuzz import process
+from src.config import GeneralSettings
+from src.data_extraction.features import Feature, FeatureGraph
+from src.data_extraction.fitness import (FITNESS_POINTS_COLUMNS, FITNESS_STATUS_COLUMNS, decay_weights,
+                                          fitness_matrix, momentum)
+from src.data_extraction.matching import AliasIndex
 from src.data_extraction.pipeline import get_data, print_step
+from src.data_extraction.positions import POSITION_MASK, POSITION_NAMES, position_mask
+from src.data_extraction.storage import DataStore, data_root, flatten_for_export
+
+# Columns _process_odds adds to the teams (next fixture of each team) and to next_match
+ODDS_TEAM_COLUMNS = ['ODDS_FECHA', 'ODDS_OPPONENT_ID', 'ODDS_IS_HOME', 'ODDS_1', 'ODDS_X', 'ODDS_2',
+                     'TEAM_WIN_PROB', 'TEAM_DRAW_PROB', 'TEAM_LOSS_PROB']
+ODDS_MATCH_COLUMNS = ['ODDS_1', 'ODDS_X', 'ODDS_2', 'ODDS_PROB_1', 'ODDS_PROB_X', 'ODDS_PROB_2']
+# Minimum fuzzy score (0-100) of a name match: weaker candidates are left unmatched
+MATCH_MIN_SCORE = 80
+
+
+# ----------------------------------------------------------------------
+# Features of df_master (see features.FeatureGraph)
+# ----------------------------------------------------------------------
+
+def _positions(df):
+    # 1. Map Positions (1->GK, 2->DF, 3->MF, 4->FW), with the eligibility bitmask (primary + alt
+    #    positions, see positions.py) taken from the codes first
+    out = {}
+    if 'PLAYER_POSITION' in df.columns:
+        out[POSITION_MASK] = position_mask(df['PLAYER_POSITION'], df.get('PLAYER_ALT_POSITIONS'))
+        out['PLAYER_POSITION'] = df['PLAYER_POSITION'].map(POSITION_NAMES).fillna(df['PLAYER_POSITION'])
+
+    # 2. Map Alt Positions (e.g. [2, 4] -> "DF, FW"), parsed into lists of ints at ingestion (see schemas.SCHEMAS)
+    if 'PLAYER_ALT_POSITIONS' in df.columns:
+        out['PLAYER_ALT_POSITIONS'] = df['PLAYER_ALT_POSITIONS'].map(
+            lambda positions: ", ".join(POSITION_NAMES.get(p, str(p)) for p in positions) if isinstance(positions, list) else ''
+        )
+    return out
+
+
+def _lineup_probabilities(df):
+    # 3. COMUNIATE_STARTER / COMUNIATE_SUPPLENT: already 0-1 floats, NaN for players without a Comuniate match
+    return {col: df[col].fillna(0.0) if col in df.columns else 0.0 for col in ('COMUNIATE_STARTER', 'COMUNIATE_SUPPLENT')}
+
+
+def _percentiles(df):
+    # 5. PERCENTILE: Global percentile based on PLAYER_POINTS
+    if 'PLAYER_POINTS' not in df.columns:
+        return {'PERCENTILE': 0.0, 'POSITION_PERCENTILE': 0.0}
+    # POSITION_PERCENTILE: Percentile within each PLAYER_POSITION group
+    if 'PLAYER_POSITION' in df.columns:
+        position_percentile = df.groupby('PLAYER_POSITION')['PLAYER_POINTS'].rank(pct=True)
+    else:
+        position_percentile = 0.0
+    return {'PERCENTILE': df['PLAYER_POINTS'].rank(pct=True), 'POSITION_PERCENTILE': position_percentile}
+
+
+def _availability(df):
+    # 6. Availability Metrics
+    is_market = (df['MARKET_SALE_PRICE'] > 0)
+    is_clause = (df['BIWPLAYER_CLAUSE'] > 0) & df['BIWPLAYER_CLAUSE_LOCKED_UNTIL'].isna()
+
+    availability_type = pd.Series("None", index=df.index)
+    availability_type[is_market] = "Purchase"
+    availability_type[is_clause] = "Clause"
+    availability_type[is_market & is_clause] = "Purchase, Clause"
+
+    # REAL_SALE_PRICE: The actual cost to acquire the player (market price has priority over the clause)
+    real_sale_price = pd.Series(0.0, index=df.index)
+    real_sale_price[is_clause] = df.loc[is_clause, 'BIWPLAYER_CLAUSE']
+    real_sale_price[is_market] = df.loc[is_market, 'MARKET_SALE_PRICE']
+
+    return {'IS_AVAILABLE': is_market | is_clause, 'AVAILABILITY_TYPE': availability_type,
+            'REAL_SALE_PRICE': real_sale_price}
+
+
+def _momentum(df):
+    # 7. Masked reductions over the fitness matrix built at ingestion (see fitness.py): points
+    #    of the last matches, skipping injuries, suspensions and doubts, 0 when not played.
+    if all(col in df.columns for col in FITNESS_POINTS_COLUMNS + FITNESS_STATUS_COLUMNS):
+        points = df[FITNESS_POINTS_COLUMNS].to_numpy(dtype=np.float64)
+        codes = df[FITNESS_STATUS_COLUMNS].to_numpy(dtype=np.int8)
+    elif 'PLAYER_FITNESS' in df.columns:
+        points, codes = fitness_matrix(df['PLAYER_FITNESS'])
+    else:
+        return {'AVG_POINTS_MOMENTUM': 0.0, 'DECAYED_MOMENTUM': 0.0, 'MOMENTUM_TREND': 0.0}
+
+    avg_momentum = pd.Series(momentum(points, codes), index=df.index)
+    # MOMENTUM_TREND: Difference between recent form and seasonal average
+    trend = avg_momentum - df['AVG_POINTS'] if 'AVG_POINTS' in df.columns else 0.0
+    return {
+        'AVG_POINTS_MOMENTUM': avg_momentum,
+        # Recent matches weigh more (1, 0.75, 0.56, ...)
+        'DECAYED_MOMENTUM': momentum(points, codes, decay_weights(points.shape[1])),
+        'MOMENTUM_TREND': trend
+    }
+
+
+def _cost_per_point(df):
+    # 8. Moneyball (Efficiency) Metrics: "Millions per Point" to identify bargains, only for
+    #    players that can actually be acquired (IS_AVAILABLE)
+    out = {}
+    for col, points in (('COST_PER_POINT', 'AVG_POINTS'), ('COST_PER_MOMENTUM_POINT', 'AVG_POINTS_MOMENTUM')):
+        mask = df['IS_AVAILABLE'] & (df[points] > 0)
+        out[col] = ((df['REAL_SALE_PRICE'] / 1_000_000) / df[points]).where(mask, 0.0)
+    return out
+
+
+def _expected_points(df):
+    # 9. EXPECTED_POINTS (xP): Momentum * (P(Starter) + P(Sub)*0.8). 0.8 factor is lenient for subs
+    return {'EXPECTED_POINTS': df['AVG_POINTS_MOMENTUM'] * (df['COMUNIATE_STARTER'] + (df['COMUNIATE_SUPPLENT'] * 0.8))}
+
+
+def _cost_per_xp(df):
+    # COST_PER_XP: Price / xP
+    mask = df['IS_AVAILABLE'] & (df['EXPECTED_POINTS'] > 0)
+    return {'COST_PER_XP': ((df['REAL_SALE_PRICE'] / 1_000_000) / df['EXPECTED_POINTS']).where(mask, 0.0)}
+
+
+# Feature -> consolidated (or previously computed) columns it reads, in dependency order
+FEATURES = [
+    Feature('positions', ('PLAYER_POSITION', 'PLAYER_ALT_POSITIONS'),
+            (POSITION_MASK, 'PLAYER_POSITION', 'PLAYER_ALT_POSITIONS'), _positions),
+    Feature('lineup_probabilities', ('COMUNIATE_STARTER', 'COMUNIATE_SUPPLENT'),
+            ('COMUNIATE_STARTER', 'COMUNIATE_SUPPLENT'), _lineup_probabilities),
+    Feature('percentiles', ('PLAYER_POINTS', 'PLAYER_POSITION'), ('PERCENTILE', 'POSITION_PERCENTILE'), _percentiles),
+    Feature('availability', ('MARKET_SALE_PRICE', 'BIWPLAYER_CLAUSE', 'BIWPLAYER_CLAUSE_LOCKED_UNTIL'),
+            ('IS_AVAILABLE', 'AVAILABILITY_TYPE', 'REAL_SALE_PRICE'), _availability),
+    Feature('momentum', (*FITNESS_POINTS_COLUMNS, *FITNESS_STATUS_COLUMNS, 'PLAYER_FITNESS', 'AVG_POINTS'),
+            ('AVG_POINTS_MOMENTUM', 'DECAYED_MOMENTUM', 'MOMENTUM_TREND'), _momentum),
+    Feature('cost_per_point', ('IS_AVAILABLE', 'REAL_SALE_PRICE', 'AVG_POINTS', 'AVG_POINTS_MOMENTUM'),
+            ('COST_PER_POINT', 'COST_PER_MOMENTUM_POINT'), _cost_per_point),
+    Feature('expected_points', ('AVG_POINTS_MOMENTUM', 'COMUNIATE_STARTER', 'COMUNIATE_SUPPLENT'),
+            ('EXPECTED_POINTS',), _expected_points),
+    Feature('cost_per_xp', ('IS_AVAILABLE', 'REAL_SALE_PRICE', 'EXPECTED_POINTS'), ('COST_PER_XP',), _cost_per_xp),
+]
 
 class DataAnalyst:
     """
@@ -11,253 +142,100 @@ class DataAnalyst:
     to prepare the data for consumption.
     """
 
-    def __init__(self):
-        pass
+    # Processing of the auxiliary tables and the data keys each stage reads. After a partial refresh
+    # only the stages whose inputs changed run again (see build).
+    STAGES = [
+        ('comuniate', ('comuniate', 'players', 'teams'), '_process_comuniate'),
+        ('odds', ('odds', 'teams', 'next_match'), '_process_odds'),
+    ]
 
-    def run(self, extract: bool = True):
+    def __init__(self):
+        # Resident processed tables and df_master of the last build
+        self.data = None
+        self.df_master = None
+        # Persistent external name -> Biwenger ID resolutions (only unseen names are fuzzy matched)
+        self.aliases = AliasIndex(review_score=GeneralSettings.ALIAS_REVIEW_SCORE)
+        # Cached features of the last build (only those downstream of changed columns are recomputed)
+        self.features = FeatureGraph(FEATURES)
+
+    def run(self, extract: bool = True, snapshot: str = None):
         """
         Executes the analyst's main workflow:
-        1. Get data (extract or load from CSV).
+        1. Get data (extract, load from the data store, or load a previous run with `snapshot`).
         2. Process/Transform specific datasets (Comuniate fuzzy matching).
         3. Consolidate player data.
         4. Feature Engineering (Cleaning & Metrics).
         5. Return master dataframe.
+
+        A `snapshot` run is a read-only re-analysis: nothing is saved, so the current _master and
+        next_match the agents read are left untouched.
         """
         # 1. Get Data
-        data = get_data(extract=extract)
+        data = get_data(extract=extract, snapshot=snapshot)
+
+        # 2-4. Process, consolidate and engineer features
+        df_master = self.build(data)
+
+        if df_master is not None and not df_master.empty and snapshot is None:
+            self.save_outputs()
+            flatten_for_export(df_master).to_excel(os.path.join(data_root(), '_master.xlsx'), index=False)
+        return df_master
 
-        # 2. Process Auxiliary Data
-        data = self._process_comuniate(data)
-        data = self._process_odds(data)
+    def save_outputs(self):
+        """Saves df_master and the odds-enriched next_match the agents read."""
+        store = DataStore()
+        if self.df_master is not None and not self.df_master.empty:
+            store.save('_master', self.df_master)
+        if self.data and 'next_match' in self.data and not self.data['next_match'].empty:
+            store.save('next_match', self.data['next_match'])
+
+    def build(self, data: dict, changed: set = None):
+        """
+        Builds df_master from the normalized tables and keeps it resident with the processed tables.
+
+        Args:
+            data (dict): Normalized tables (see pipeline.get_data). With `changed`, only the
+                         refreshed tables are needed: they replace the resident ones.
+            changed (set): Data keys refreshed since the previous build. Only the STAGES reading
+                           them run again (e.g. a market refresh skips the fuzzy matching);
+                           consolidation and feature engineering always run. None rebuilds everything.
+        """
+        if changed is None or self.data is None:
+            self.data = dict(data)
+            changed = set(self.data)
+        else:
+            self.data.update(data)
 
-        # 3. Consolidate Player Data
-        df_players_total = self._consolidate_player_data(data)
+        for _, inputs, method in self.STAGES:
+            if changed & set(inputs):
+                self.data = getattr(self, method)(self.data)
 
+        df_players_total = self._consolidate_player_data(self.data)
         if df_players_total is not None and not df_players_total.empty:
-            # 4. Feature Engineering
-            df_master = self._feature_engineering(df_players_total)
-            df_master.to_csv('./data/_master.csv', index=False)
-            df_master.to_excel('./data/_master.xlsx', index=False)
-            return df_master
-        
-        return df_players_total
+            self.df_master = self._feature_engineering(df_players_total)
+        else:
+            self.df_master = df_players_total
+        return self.df_master
 
     def _feature_engineering(self, df):
         """
         Cleans data and creates new features for the Master Analysis.
+
+        The features are the nodes of FEATURES: after a partial refresh only those downstream of
+        the changed columns are recomputed (a market poll only re-runs availability and costs).
         """
         print_step(13, "Running Feature Engineering")
-        
-        # Avoid SettingWithCopyWarning
-        df = df.copy()
-
-        # ----------------------------------------------------------------------
-        # 1. Map Positions (1->GK, 2->DF, 3->MF, 4->FW)
-        # ----------------------------------------------------------------------
-        pos_map = {1: 'GK', 2: 'DF', 3: 'MF', 4: 'FW'}
-        if 'PLAYER_POSITION' in df.columns:
-            df['PLAYER_POSITION'] = df['PLAYER_POSITION'].map(pos_map).fillna(df['PLAYER_POSITION'])
-
-        # ----------------------------------------------------------------------
-        # 2. Map Alt Positions (e.g. [2, 4] -> "DF, FW")
-        # ----------------------------------------------------------------------
-        def map_alt_positions(val):
-            if pd.isna(val) or val == '' or val == '[]':
-                return ''
-            try:
-                if isinstance(val, str):
-                    if val.startswith('['):
-                        val_list = ast.literal_eval(val)
-                    else:
-                        val_list = [int(x.strip()) for x in val.split(',') if x.strip().isdigit()]
-                elif isinstance(val, (list, tuple)):
-                    val_list = val
-                else:
-                    return ''
-                
-                mapped = [pos_map.get(int(x), str(x)) for x in val_list]
-                return ", ".join(mapped)
-            except Exception:
-                return str(val)
-
-        if 'PLAYER_ALT_POSITIONS' in df.columns:
-            df['PLAYER_ALT_POSITIONS'] = df['PLAYER_ALT_POSITIONS'].apply(map_alt_positions)
-
-        # ----------------------------------------------------------------------
-        # 3. Clean COMUNIATE_STARTER (e.g. "80%" -> 0.8)
-        # ----------------------------------------------------------------------
-        def clean_percentage(val):
-            if pd.isna(val):
-                return 0.0
-            if isinstance(val, (int, float)):
-                return float(val) / 100 if val > 1 else float(val)
-            if isinstance(val, str):
-                val = val.replace('%', '').strip()
-                try:
-                    return float(val) / 100
-                except ValueError:
-                    return 0.0
-            return 0.0
-
-        if 'COMUNIATE_STARTER' in df.columns:
-            df['COMUNIATE_STARTER'] = df['COMUNIATE_STARTER'].apply(clean_percentage)
-        else:
-            df['COMUNIATE_STARTER'] = 0.0
 
-        # ----------------------------------------------------------------------
-        # 4. Round decimal points for efficiency (Tokens)
-        # ----------------------------------------------------------------------
+        # Round decimal points for efficiency (Tokens)
+        df = df.copy()
         float_cols = df.select_dtypes(include=['float64', 'float32']).columns
         df[float_cols] = df[float_cols].round(2)
 
-        # ----------------------------------------------------------------------
-        # 5. Financial & Scoring Metrics
-        # ----------------------------------------------------------------------
-        
-        # PERCENTILE: Global percentile based on PLAYER_POINTS
-        if 'PLAYER_POINTS' in df.columns:
-            df['PERCENTILE'] = df['PLAYER_POINTS'].rank(pct=True)
-            
-            # POSITION_PERCENTILE: Percentile within each PLAYER_POSITION group
-            if 'PLAYER_POSITION' in df.columns:
-                df['POSITION_PERCENTILE'] = df.groupby('PLAYER_POSITION')['PLAYER_POINTS'].rank(pct=True)
-            else:
-                df['POSITION_PERCENTILE'] = 0.0
-        else:
-            df['PERCENTILE'] = 0.0
-            df['POSITION_PERCENTILE'] = 0.0
+        df = self.features.build(df)
+        print(f"   ⏱️ {self.features.summary()}")
 
-        # ----------------------------------------------------------------------
-        # 6. Availability Metrics
-        # ----------------------------------------------------------------------
-        
-        # Helper to determine availability
-        is_market = (df['MARKET_SALE_PRICE'] > 0)
-        is_clause = (df['BIWPLAYER_CLAUSE'] > 0) & (df['BIWPLAYER_CLAUSE_LOCKED_UNTIL'].isna() | (df['BIWPLAYER_CLAUSE_LOCKED_UNTIL'] == ''))
-        
-        df['IS_AVAILABLE'] = is_market | is_clause
-        
-        def get_avail_type(row_is_market, row_is_clause):
-            types = []
-            if row_is_market: types.append("Purchase")
-            if row_is_clause: types.append("Clause")
-            return ", ".join(types) if types else "None"
-        
-        df['AVAILABILITY_TYPE'] = df.apply(lambda r: get_avail_type(r.name in is_market[is_market].index, r.name in is_clause[is_clause].index), axis=1)
-        # Optimization: use np.select or simple vectorization instead of apply if possible, but for small datasets this is fine.
-        # Let's vectorize it for better performance and clarity.
-        df['AVAILABILITY_TYPE'] = "None"
-        df.loc[is_market, 'AVAILABILITY_TYPE'] = "Purchase"
-        df.loc[is_clause, 'AVAILABILITY_TYPE'] = "Clause"
-        df.loc[is_market & is_clause, 'AVAILABILITY_TYPE'] = "Purchase, Clause"
-
-        # REAL_SALE_PRICE: The actual cost to acquire the player
-        df['REAL_SALE_PRICE'] = 0.0
-        # Set clause price first
-        df.loc[is_clause, 'REAL_SALE_PRICE'] = df.loc[is_clause, 'BIWPLAYER_CLAUSE']
-        # Override with market price if available (priority)
-        df.loc[is_market, 'REAL_SALE_PRICE'] = df.loc[is_market, 'MARKET_SALE_PRICE']
-
-        # ----------------------------------------------------------------------
-        # 7. Momentum Metrics
-        # ----------------------------------------------------------------------
-        
-        def calculate_momentum(val):
-            if pd.isna(val) or val == '' or val == '[]':
-                return 0.0
-            try:
-                # Parse string list if needed
-                if isinstance(val, str):
-                    val_list = ast.literal_eval(val)
-                elif isinstance(val, (list, tuple)):
-                    val_list = val
-                else:
-                    return 0.0
-                
-                # Filter and Map values:
-                # - Skip 'injured', 'sanctioned', and 'doubt' (treat doubt as injury)
-                # - Map None or 'discarded' to 0.0
-                processed_points = []
-                for x in val_list:
-                    if x in ['injured', 'sanctioned', 'doubt']:
-                        continue
-
-                    if x is None or x == 'discarded':
-                        processed_points.append(0.0)
-                    elif isinstance(x, (int, float)):
-                        processed_points.append(float(x))
-                
-                if not processed_points:
-                    return 0.0
-                
-                return sum(processed_points) / len(processed_points)
-            except Exception:
-                return 0.0
-
-        if 'PLAYER_FITNESS' in df.columns:
-            df['AVG_POINTS_MOMENTUM'] = df['PLAYER_FITNESS'].apply(calculate_momentum)
-            # MOMENTUM_TREND: Difference between recent form and seasonal average
-            if 'AVG_POINTS' in df.columns:
-                df['MOMENTUM_TREND'] = df['AVG_POINTS_MOMENTUM'] - df['AVG_POINTS']
-            else:
-                df['MOMENTUM_TREND'] = 0.0
-        else:
-            df['AVG_POINTS_MOMENTUM'] = 0.0
-            df['MOMENTUM_TREND'] = 0.0
-
-        # ----------------------------------------------------------------------
-        # 8. Moneyball (Efficiency) Metrics
-        # ----------------------------------------------------------------------
-        
-        # We calculate "Millions per Point" to identify bargains
-        # Only relevant for players that can actually be acquired (IS_AVAILABLE)
-        
-        df['COST_PER_POINT'] = 0.0
-        mask_cpp = (df['IS_AVAILABLE']) & (df['AVG_POINTS'] > 0)
-        df.loc[mask_cpp, 'COST_PER_POINT'] = (df.loc[mask_cpp, 'REAL_SALE_PRICE'] / 1_000_000) / df.loc[mask_cpp, 'AVG_POINTS']
-        
-        # COST_PER_MOMENTUM_POINT: Price in millions / Recent average points
-        df['COST_PER_MOMENTUM_POINT'] = 0.0
-        mask_cpmp = (df['IS_AVAILABLE']) & (df['AVG_POINTS_MOMENTUM'] > 0)
-        df.loc[mask_cpmp, 'COST_PER_MOMENTUM_POINT'] = (df.loc[mask_cpmp, 'REAL_SALE_PRICE'] / 1_000_000) / df.loc[mask_cpmp, 'AVG_POINTS_MOMENTUM']
-
-        # ----------------------------------------------------------------------
-        # 9. Expected Points (xP) & Risk-Adjusted Cost
-        # ----------------------------------------------------------------------
-        
-        def clean_percentage(val):
-            if pd.isna(val):
-                return 0.0
-            if isinstance(val, (int, float)):
-                return float(val) / 100.0 if val > 1.0 else float(val)
-            if isinstance(val, str):
-                val = val.replace('%', '').strip()
-                if not val:
-                    return 0.0
-                try:
-                    return float(val) / 100.0
-                except ValueError:
-                    # Non-numeric string (e.g., player name due to column shift)
-                    return 0.0
-            return 0.0
-
-
-        # Clean COMUNIATE_SUPPLENT (it might be string with %)
-        if 'COMUNIATE_SUPPLENT' in df.columns:
-            df['COMUNIATE_SUPPLENT'] = df['COMUNIATE_SUPPLENT'].apply(clean_percentage)
-        else:
-            df['COMUNIATE_SUPPLENT'] = 0.0
-            
-        # EXPECTED_POINTS (xP): Momentum * (P(Starter) + P(Sub)*0.8)
-        # 0.8 factor is lenient for subs
-        df['EXPECTED_POINTS'] = df['AVG_POINTS_MOMENTUM'] * (df['COMUNIATE_STARTER'] + (df['COMUNIATE_SUPPLENT'] * 0.8))
-        
-        # COST_PER_XP: Price / xP
-        df['COST_PER_XP'] = 0.0
-        mask_cpxp = (df['IS_AVAILABLE']) & (df['EXPECTED_POINTS'] > 0)
-        df.loc[mask_cpxp, 'COST_PER_XP'] = (df.loc[mask_cpxp, 'REAL_SALE_PRICE'] / 1_000_000) / df.loc[mask_cpxp, 'EXPECTED_POINTS']
-
-        return df
+        # The numeric fitness is only an input of the momentum
+        return df.drop(columns=FITNESS_POINTS_COLUMNS + FITNESS_STATUS_COLUMNS, errors='ignore')
 
     def _process_comuniate(self, data):
         """
@@ -272,7 +250,8 @@ class DataAnalyst:
             return data
 
         print_step(10, "Processing Comuniate data (Fuzzy Matching)")
-        df_comuniate = data['comuniate']
+        # Copia: la tabla de entrada puede estar compartida (datos residentes del daemon, builds incrementales)
+        df_comuniate = data['comuniate'].copy()
         # Filter out coaches (position 5)
         df_players = data['players'][data['players']['PLAYER_POSITION'] != 5]
         df_teams = data['teams']
@@ -280,47 +259,30 @@ class DataAnalyst:
         # Join players and teams to have a list of players per team name
         df_aux = df_players.merge(df_teams, left_on="PLAYER_TEAM_ID", right_on="TEAM_ID", how="left")
 
-        # 1. Team Mapping
-        equipos_origen = df_comuniate['COMUNIATE_TEAM'].unique()
-        equipos_destino = df_aux['TEAM_NAME'].unique()
-
-        diccionario_equipos = {}
-        for equipo in equipos_origen:
-            if isinstance(equipo, str):
-                mejor_match, score = process.extractOne(equipo, equipos_destino)
-                diccionario_equipos[equipo] = mejor_match
-            else:
-                diccionario_equipos[equipo] = None
-
-        df_comuniate['BIW_TEAM_NAME'] = df_comuniate['COMUNIATE_TEAM'].map(diccionario_equipos)
-
-        # 2. Player Mapping
-        diccionario_jugadores = {}
-        for index, row in df_comuniate.iterrows():
-            player_name = row['COMUNIATE_NAME']
-            team_name = row['BIW_TEAM_NAME']
-            
-            # Ensure we have a valid team match
-            if pd.isna(team_name):
-                diccionario_jugadores[player_name] = None
-                continue
-
-            players_team_list = df_aux[df_aux['TEAM_NAME'] == team_name]['PLAYER_NAME'].tolist()
+        # 1. Team Mapping (names resolved in previous runs come from the alias cache)
+        teams = self.aliases.resolve('comuniate_team', df_comuniate['COMUNIATE_TEAM'], df_teams, 'TEAM_ID', 'TEAM_NAME')
+        df_comuniate['BIW_TEAM_NAME'] = teams['NAME']
 
-            if players_team_list and isinstance(player_name, str):
-                best_match, score = process.extractOne(player_name, players_team_list)
-                diccionario_jugadores[player_name] = best_match
-            else:
-                diccionario_jugadores[player_name] = None
-
-        df_comuniate['BIW_PLAYER_NAME'] = df_comuniate['COMUNIATE_NAME'].map(diccionario_jugadores)
+        # 2. Player Mapping: each team's names against its roster, one similarity matrix per team
+        matches = self.aliases.resolve('comuniate', df_comuniate['COMUNIATE_NAME'], df_aux, 'PLAYER_ID', 'PLAYER_NAME',
+                                       teams=df_comuniate['BIW_TEAM_NAME'], team_col='TEAM_NAME',
+                                       score_cutoff=MATCH_MIN_SCORE)
+        df_comuniate['BIW_PLAYER_ID'] = matches['ID']
+        df_comuniate['BIW_PLAYER_NAME'] = matches['NAME']
+        df_comuniate['BIW_MATCH_SCORE'] = matches['MATCH_SCORE']
+        self.aliases.save()
 
         data['comuniate'] = df_comuniate
         return data
 
     def _process_odds(self, data):
         """
-        Asocia las cuotas (Odds) del próximo partido a cada equipo.
+        Asocia las cuotas (Odds) de los próximos partidos a cada equipo.
+
+        Cada partido sin jugar se convierte en dos filas (local y visitante) indexadas por el
+        TEAM_ID de Biwenger, con las cuotas 1X2 del partido y las probabilidades implícitas desde
+        el punto de vista del equipo. Todas las jornadas con cuotas quedan en data['team_odds'];
+        la más próxima de cada equipo se añade a data['teams'] y la de cada partido a data['next_match'].
         """
         if 'odds' not in data or 'teams' not in data:
             print("Skipping odds processing due to missing data keys.")
@@ -332,97 +294,61 @@ class DataAnalyst:
 
         print_step(10.5, "Processing Odds data (Match Matching)")
         df_odds = data['odds']
-        df_teams = data['teams']
+        # Previous enrichment is replaced, never stacked (the daemon re-runs this stage)
+        df_teams = data['teams'].drop(columns=ODDS_TEAM_COLUMNS, errors='ignore')
 
-        # Filter unplayed matches (where goals are NaN or empty)
-        # Assuming 'ODDS_HOME_GOALS' is NaN for future matches
+        # Unplayed matches (goals are NaN for future matches)
         if 'ODDS_HOME_GOALS' in df_odds.columns:
-            future_odds = df_odds[df_odds['ODDS_HOME_GOALS'].isna() | (df_odds['ODDS_HOME_GOALS'] == '')].copy()
+            future_odds = df_odds[df_odds['ODDS_HOME_GOALS'].isna()]
         else:
-            future_odds = df_odds.copy()
-
-        # Prepare mapping columns
-        df_teams['ODDS_1'] = np.nan
-        df_teams['ODDS_X'] = np.nan
-        df_teams['ODDS_2'] = np.nan
-
-        # Helper to find odds info
-        # We match based on team names. Since 'odds' source names might differ, we use fuzzy matching.
-        # Ideally, we map 'ODDS_LOCAL' and 'ODDS_VISITANTE' to our 'TEAM_NAME'.
-        
-        # 1. Create a map of Odds Team Name -> Biwenger Team Name
-        odds_team_names = pd.concat([future_odds['ODDS_LOCAL'], future_odds['ODDS_VISITANTE']]).unique()
-        biwenger_teams = df_teams['TEAM_NAME'].unique()
-        
-        odds_to_biwenger_map = {}
-        for ot in odds_team_names:
-            if isinstance(ot, str):
-                match, score = process.extractOne(ot, biwenger_teams)
-                if score > 80: # Threshold to ensure decent match
-                    odds_to_biwenger_map[ot] = match
-        
-        # 2. Iterate through matches in future_odds and assign to teams
-        for idx, row in future_odds.iterrows():
-            local_odds_name = row.get('ODDS_LOCAL')
-            visit_odds_name = row.get('ODDS_VISITANTE')
-            
-            local_biw = odds_to_biwenger_map.get(local_odds_name)
-            visit_biw = odds_to_biwenger_map.get(visit_odds_name)
-            
-            # Values
-            o1 = row.get('ODDS_1')
-            ox = row.get('ODDS_X')
-            o2 = row.get('ODDS_2')
-            
-            if local_biw:
-                # Assign to local team row
-                mask = df_teams['TEAM_NAME'] == local_biw
-                df_teams.loc[mask, 'ODDS_1'] = o1
-                df_teams.loc[mask, 'ODDS_X'] = ox
-                df_teams.loc[mask, 'ODDS_2'] = o2
-                
-            if visit_biw:
-                # Assign to visitor team row
-                mask = df_teams['TEAM_NAME'] == visit_biw
-                df_teams.loc[mask, 'ODDS_1'] = o1
-                df_teams.loc[mask, 'ODDS_X'] = ox
-                df_teams.loc[mask, 'ODDS_2'] = o2
-
-        data['teams'] = df_teams
+            future_odds = df_odds
+
+        # 1. Odds team names -> Biwenger TEAM_ID (names resolved in previous runs come from the alias cache)
+        names = pd.concat([future_odds['ODDS_LOCAL'], future_odds['ODDS_VISITANTE']], ignore_index=True)
+        team_ids = self.aliases.resolve('odds_team', names, df_teams, 'TEAM_ID', 'TEAM_NAME', score_cutoff=MATCH_MIN_SCORE)['ID']
+        self.aliases.save()
+        home_ids = team_ids.iloc[:len(future_odds)].to_numpy()
+        away_ids = team_ids.iloc[len(future_odds):].to_numpy()
+
+        # 2. Implied probabilities of the 1X2 quotes, normalized to remove the bookmaker margin
+        quotes = future_odds[['ODDS_1', 'ODDS_X', 'ODDS_2']].astype(float).where(lambda q: q > 0)
+        implied = 1 / quotes
+        probs = implied.div(implied.sum(axis=1, min_count=3), axis=0).round(3).to_numpy()
+
+        # 3. One row per team and match: the home row takes P(1) as its win probability, the away row P(2)
+        fixtures = {
+            'ODDS_FECHA': future_odds['ODDS_FECHA'].to_numpy() if 'ODDS_FECHA' in future_odds.columns else pd.NaT,
+            'ODDS_1': quotes['ODDS_1'].to_numpy(), 'ODDS_X': quotes['ODDS_X'].to_numpy(), 'ODDS_2': quotes['ODDS_2'].to_numpy()
+        }
+        home = pd.DataFrame({'TEAM_ID': home_ids, 'ODDS_OPPONENT_ID': away_ids, 'ODDS_IS_HOME': True, **fixtures,
+                             'TEAM_WIN_PROB': probs[:, 0], 'TEAM_DRAW_PROB': probs[:, 1], 'TEAM_LOSS_PROB': probs[:, 2]})
+        away = pd.DataFrame({'TEAM_ID': away_ids, 'ODDS_OPPONENT_ID': home_ids, 'ODDS_IS_HOME': False, **fixtures,
+                             'TEAM_WIN_PROB': probs[:, 2], 'TEAM_DRAW_PROB': probs[:, 1], 'TEAM_LOSS_PROB': probs[:, 0]})
+        team_odds = (pd.concat([home, away], ignore_index=True)
+                     .dropna(subset=['TEAM_ID'])
+                     .astype({'TEAM_ID': 'Int64', 'ODDS_OPPONENT_ID': 'Int64'})
+                     .sort_values(['TEAM_ID', 'ODDS_FECHA'], kind='stable'))
+        team_odds['ODDS_FIXTURE'] = team_odds.groupby('TEAM_ID').cumcount() + 1
+        data['team_odds'] = team_odds.reset_index(drop=True)
+
+        # 4. Next fixture of each team
+        next_odds = team_odds[team_odds['ODDS_FIXTURE'] == 1]
+        data['teams'] = df_teams.merge(next_odds[['TEAM_ID'] + ODDS_TEAM_COLUMNS], on='TEAM_ID', how='left', validate='one_to_one')
+        print(f"   • {len(future_odds)} matches with odds, {len(next_odds)} of {len(df_teams)} teams with a next fixture")
 
         # ---------------------------------------------------------
-        # ALSO ENRICH df_next_match IF AVAILABLE
+        # ALSO ENRICH df_next_match IF AVAILABLE (saved with the analyst outputs, see save_outputs)
         # ---------------------------------------------------------
         if 'next_match' in data and not data['next_match'].empty:
-            df_next_match = data['next_match']
-            df_next_match['ODDS_1'] = np.nan
-            df_next_match['ODDS_X'] = np.nan
-            df_next_match['ODDS_2'] = np.nan
-
-            for idx, row in future_odds.iterrows():
-                local_odds_name = row.get('ODDS_LOCAL')
-                local_biw = odds_to_biwenger_map.get(local_odds_name)
-                
-                # Values
-                o1 = row.get('ODDS_1')
-                ox = row.get('ODDS_X')
-                o2 = row.get('ODDS_2')
-
-                if local_biw:
-                    # Match on NEXT_MATCH_LOCAL
-                    mask = df_next_match['NEXT_MATCH_LOCAL'] == local_biw
-                    df_next_match.loc[mask, 'ODDS_1'] = o1
-                    df_next_match.loc[mask, 'ODDS_X'] = ox
-                    df_next_match.loc[mask, 'ODDS_2'] = o2
-            
-            # Round odds columns
-            cols_to_round = ['ODDS_1', 'ODDS_X', 'ODDS_2']
-            df_next_match[cols_to_round] = df_next_match[cols_to_round].astype(float).round(2)
-
-            data['next_match'] = df_next_match
-            # Save the enriched dataframe to disk
-            print("   ℹ️ Saving enriched next_match to ./data/next_match.csv")
-            df_next_match.to_csv('./data/next_match.csv', index=False)
+            df_next_match = data['next_match'].drop(columns=ODDS_MATCH_COLUMNS, errors='ignore')
+            local_ids = df_next_match['NEXT_MATCH_LOCAL'].map(df_teams.drop_duplicates('TEAM_NAME').set_index('TEAM_NAME')['TEAM_ID'])
+            home_odds = next_odds[next_odds['ODDS_IS_HOME']].set_index('TEAM_ID')
+            match_odds = home_odds.reindex(local_ids.astype('Int64'))[['ODDS_1', 'ODDS_X', 'ODDS_2',
+                                                                     'TEAM_WIN_PROB', 'TEAM_DRAW_PROB', 'TEAM_LOSS_PROB']]
+            match_odds.columns = ODDS_MATCH_COLUMNS
+            match_odds.index = df_next_match.index
+            match_odds[['ODDS_1', 'ODDS_X', 'ODDS_2']] = match_odds[['ODDS_1', 'ODDS_X', 'ODDS_2']].round(2)
+            data['next_match'] = pd.concat([df_next_match, match_odds], axis=1)
 
         return data
 
@@ -430,9 +356,11 @@ class DataAnalyst:
         """
         Consolida todas las fuentes de datos en un único DataFrame maestro de jugadores.
         
-        Esta función realiza una serie de 'left joins' empezando por la tabla base de jugadores
-        de LaLiga para ir enriqueciéndola con información de equipos, propiedad en la liga,
-        mercado y predicciones tácticas.
+        Parte de la tabla base de jugadores de LaLiga indexada por PLAYER_ID y le alinea, siempre
+        por ID entero, la información de equipos, propiedad en la liga, mercado y predicciones
+        tácticas. Cada fuente se reduce antes a una fila por jugador (las ofertas se agregan y de
+        Comuniate se queda el mejor match), así que el resultado tiene exactamente una fila por
+        jugador: una clave duplicada es un error, no filas multiplicadas.
         """
         print_step(11, "Consolidating player data")
         required_keys = ['players', 'teams', 'league_players', 'market_offers', 'market_sales', 'comuniate']
@@ -440,27 +368,45 @@ class DataAnalyst:
             print(f"Missing one of {required_keys}, skipping consolidation.")
             return None
 
-        # 1. Base: Tabla de jugadores de LaLiga (todos los jugadores disponibles)
-        df_players_total = data['players']
-        
-        # 2. Unión con Equipos: Añade información del equipo (Nombre, si juega en casa, etc.)
-        df_players_total = df_players_total.merge(data['teams'], left_on="PLAYER_TEAM_ID", right_on="TEAM_ID", how="left")
-        
+        # 1. Base: Tabla de jugadores de LaLiga (todos los jugadores disponibles), una fila por PLAYER_ID
+        df_players_total = self._unique_by(data['players'], 'PLAYER_ID', 'players')
+        print(f"   • {'players':<15} {len(df_players_total)} rows")
+
+        # 2. Equipos: Añade información del equipo (Nombre, si juega en casa, cuotas...)
+        df_teams = self._unique_by(data['teams'], 'TEAM_ID', 'teams')
+        df_teams = df_teams.reindex(df_players_total['PLAYER_TEAM_ID'].astype('Int64'))
+        df_teams.index = df_players_total.index
+        df_players_total = self._align(df_players_total, df_teams, 'teams')
+
         # 3. Datos de la Liga (Propiedad): Añade quién tiene al jugador, por cuánto lo compró y su cláusula.
         if not data['league_players'].empty:
-            df_players_total = df_players_total.merge(data['league_players'], left_on="PLAYER_ID", right_on="BIWPLAYER_ID", how="left")
-            
-        # 4. Ofertas de Mercado: Añade si hay ofertas activas por el jugador (y su importe).
+            df_league_players = self._unique_by(data['league_players'], 'BIWPLAYER_ID', 'league_players')
+            df_players_total = self._align(df_players_total, df_league_players, 'league_players')
+
+        # 4. Ofertas de Mercado: Una fila por jugador con el número de ofertas y la mejor (importe, pujador y plazo).
         if not data['market_offers'].empty:
-            df_players_total = df_players_total.merge(data['market_offers'], left_on="PLAYER_ID", right_on="MARKET_OFFER_REQUESTED_PLAYER_ID", how="left")
-            
+            df_players_total = self._align(df_players_total, self._aggregate_offers(data['market_offers']), 'market_offers')
+            df_players_total['MARKET_OFFER_COUNT'] = df_players_total['MARKET_OFFER_COUNT'].fillna(0).astype(int)
+
         # 5. Ventas de Mercado: Añade si el jugador está en el mercado (precio de venta, usuario que lo vende).
         if not data['market_sales'].empty:
-             df_players_total = df_players_total.merge(data['market_sales'], left_on="PLAYER_ID", right_on="MARKET_SALE_PLAYER_ID", how="left")
-             
+            df_market_sales = self._unique_by(data['market_sales'], 'MARKET_SALE_PLAYER_ID', 'market_sales')
+            df_players_total = self._align(df_players_total, df_market_sales, 'market_sales')
+
         # 6. Datos de Comuniate: Añade la probabilidad de titularidad y alertas tácticas (dudas, apercibidos).
-        if not data['comuniate'].empty:
-             df_players_total = df_players_total.merge(data['comuniate'], left_on="PLAYER_NAME", right_on="BIW_PLAYER_NAME", how="left")
+        # Si varios nombres de Comuniate apuntan al mismo jugador se queda el de mejor puntuación.
+        if not data['comuniate'].empty and 'BIW_PLAYER_ID' in data['comuniate'].columns:
+            df_comuniate = (data['comuniate'].dropna(subset=['BIW_PLAYER_ID'])
+                            .sort_values('BIW_MATCH_SCORE', ascending=False, kind='stable')
+                            .drop_duplicates('BIW_PLAYER_ID'))
+            df_comuniate = self._unique_by(df_comuniate, 'BIW_PLAYER_ID', 'comuniate')
+            df_players_total = self._align(df_players_total, df_comuniate, 'comuniate')
+
+        # Una fila por jugador con PLAYER_ID (los que no lo tienen se descartan en el paso 1)
+        n_players = data['players']['PLAYER_ID'].dropna().nunique()
+        if len(df_players_total) != n_players or not df_players_total.index.is_unique:
+            raise ValueError(f"Consolidation produced {len(df_players_total)} rows for {n_players} players.")
+        df_players_total = df_players_total.reset_index(drop=True)
 
         # 7. Selección de Columnas: Limpia el DataFrame para mantener solo los campos relevantes para el análisis.
         selected_columns = [
@@ -468,16 +414,58 @@ class DataAnalyst:
             'PLAYER_PRICE_INCREMENT', 'PLAYER_STATUS', 'PLAYER_STATUS_INFO',
             'PLAYER_FITNESS', 'PLAYER_POINTS', 'AVG_POINTS', 'AVG_POINTS_HOME',
             'AVG_POINTS_AWAY', 'TEAM_ID', 'TEAM_NAME', 'TEAM_IS_HOME',
-            'ODDS_1', 'ODDS_X', 'ODDS_2',
+            'ODDS_1', 'ODDS_X', 'ODDS_2', 'ODDS_IS_HOME', 'TEAM_WIN_PROB', 'TEAM_DRAW_PROB', 'TEAM_LOSS_PROB',
             'BIWPLAYER_TEAM_NAME', 'BIWPLAYER_PURCHASE_DATE', 'BIWPLAYER_PURCHASE_PRICE',
             'BIWPLAYER_CLAUSE', 'BIWPLAYER_CLAUSE_LOCKED_UNTIL', 'BIWPLAYER_INVESTED',
-            'MARKET_OFFER_AMOUNT', 'MARKET_OFFER_UNTIL', 'MARKET_OFFER_FROM_NAME',
+            'MARKET_OFFER_COUNT', 'MARKET_OFFER_AMOUNT', 'MARKET_OFFER_UNTIL', 'MARKET_OFFER_FROM_NAME',
             'MARKET_OFFER_REQUESTED_PLAYER_ID', 'MARKET_SALE_PRICE', 'MARKET_SALE_UNTIL',
             'MARKET_SALE_USER_NAME', 'MARKET_SALE_CLAUSE',
-            'COMUNIATE_STARTER', 'COMUNIATE_SUPPLENT', 'COMUNIATE_DOUBT', 'COMUNIATE_CAUTIONED'
+            'COMUNIATE_STARTER', 'COMUNIATE_SUPPLENT', 'COMUNIATE_DOUBT', 'COMUNIATE_CAUTIONED',
+            # Numeric fitness, used by the feature engineering and dropped afterwards
+            *FITNESS_POINTS_COLUMNS, *FITNESS_STATUS_COLUMNS
         ]
         
         # Filtrar solo las columnas que realmente existen (evita errores si alguna tabla falló)
         existing_columns = [col for col in selected_columns if col in df_players_total.columns]
         
         return df_players_total[existing_columns]
+
+    @staticmethod
+    def _unique_by(df, key, stage):
+        """
+        Indexes `df` by its integer `key` (keeping the column), dropping (and logging) rows without one.
+
+        Raises:
+            ValueError: If `key` has duplicates (they would multiply the players' rows).
+        """
+        missing = df[key].isna()
+        if missing.any():
+            print(f"   ⚠️ {stage}: {int(missing.sum())} rows without {key} dropped "
+                  f"(rows {df.index[missing][:5].tolist()})")
+        df = df[~missing]
+        index = pd.Index(df[key].astype('Int64'), name=key)
+        if not index.is_unique:
+            raise ValueError(f"{stage}: duplicate {key} values {index[index.duplicated()].unique()[:5].tolist()}")
+        return df.set_axis(index, axis=0)
+
+    @staticmethod
+    def _align(df_players, df_source, stage):
+        """Adds the columns of `df_source` (indexed like df_players) to each player's row."""
+        df_source = df_source.reindex(df_players.index)
+        matched = int(df_source.notna().any(axis=1).sum())
+        print(f"   • {stage:<15} {matched} of {len(df_players)} players matched")
+        return pd.concat([df_players, df_source], axis=1)
+
+    @staticmethod
+    def _aggregate_offers(df_offers):
+        """
+        One row per requested player: MARKET_OFFER_COUNT and the best offer (amount, bidder and
+        deadline of the highest one), indexed by MARKET_OFFER_REQUESTED_PLAYER_ID.
+        """
+        df_offers = df_offers.dropna(subset=['MARKET_OFFER_REQUESTED_PLAYER_ID'])
+        counts = df_offers.groupby('MARKET_OFFER_REQUESTED_PLAYER_ID').size().rename('MARKET_OFFER_COUNT')
+        best = (df_offers.sort_values('MARKET_OFFER_AMOUNT', ascending=False, kind='stable')
+                .drop_duplicates('MARKET_OFFER_REQUESTED_PLAYER_ID')
+                .set_index('MARKET_OFFER_REQUESTED_PLAYER_ID', drop=False))
+        best.insert(0, 'MARKET_OFFER_COUNT', counts.reindex(best.index).to_numpy())
+        return DataAnalyst._unique_by(best.reset_index(drop=True), 'MARKET_OFFER_REQUESTED_PLAYER_ID', 'market_offers')
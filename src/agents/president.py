@@ -41,8 +41,9 @@ A clear, actionable Executive Order that can be executed by the user.
 
 from src.llm_endpoints.deepseek import DeepseekClient
 from src.data_extraction.pipeline import print_step
+from src.data_extraction.positions import eligible_counts
+from src.data_extraction.storage import load_table
 import pandas as pd
-import os
 from datetime import datetime, timedelta
 
 class President:
@@ -55,75 +56,72 @@ class President:
         self.llm = DeepseekClient()
 
     def get_my_team_name(self):
-        """Retrieves the user's team name from user_info.csv."""
+        """Retrieves the user's team name from user_info."""
         try:
-            if os.path.exists('./data/user_info.csv'):
-                df_user = pd.read_csv('./data/user_info.csv')
-                if not df_user.empty:
-                    return df_user['team_name'].iloc[0]
+            df_user = load_table('user_info', columns=['team_name'])
+            if not df_user.empty:
+                return df_user['team_name'].iloc[0]
         except Exception as e:
-            print(f"⚠️ Warning: Could not read user_info.csv: {e}")
+            print(f"⚠️ Warning: Could not read user_info: {e}")
         return "Unknown Team"
 
     def get_budget_info(self):
-        """Retrieves the current balance/budget from user_info.csv."""
+        """Retrieves the current balance/budget from user_info."""
         try:
-            if os.path.exists('./data/user_info.csv'):
-                df_user = pd.read_csv('./data/user_info.csv')
-                if not df_user.empty:
-                    for col in ['balance', 'credit', 'money', 'budget']:
-                        if col in df_user.columns:
-                            return float(df_user[col].iloc[0])
+            df_user = load_table('user_info', columns=['balance', 'credit', 'money', 'budget'])
+            if not df_user.empty:
+                for col in ['balance', 'credit', 'money', 'budget']:
+                    if col in df_user.columns:
+                        return float(df_user[col].iloc[0])
         except Exception as e:
-            print(f"⚠️ Warning: Could not read budget from user_info.csv: {e}")
+            print(f"⚠️ Warning: Could not read budget from user_info: {e}")
         return 0.0
 
     def get_jornada_info(self):
         """Gets next jornada name and start time."""
         try:
-            if os.path.exists('./data/next_match.csv'):
-                df_next = pd.read_csv('./data/next_match.csv')
-                if not df_next.empty:
-                    first_match = df_next.iloc[0]
-                    jornada_name = first_match['NEXT_MATCH_JORNADA']
-                    start_date = first_match['NEXT_MATCH_FECHA']
-                    return jornada_name, start_date
+            df_next = load_table('next_match', columns=['NEXT_MATCH_JORNADA', 'NEXT_MATCH_FECHA'])
+            if not df_next.empty:
+                first_match = df_next.iloc[0]
+                jornada_name = first_match['NEXT_MATCH_JORNADA']
+                start_date = first_match['NEXT_MATCH_FECHA']
+                return jornada_name, start_date
         except Exception as e:
-            print(f"⚠️ Warning: Could not read next_match.csv: {e}")
+            print(f"⚠️ Warning: Could not read next_match: {e}")
         return "Unknown", "Unknown"
 
     def get_clause_deadline(self):
         """Calculates clause deadline (48h before jornada)."""
         try:
-            if os.path.exists('./data/next_match.csv'):
-                df_next = pd.read_csv('./data/next_match.csv')
-                if not df_next.empty:
-                    first_match_date = pd.to_datetime(df_next['NEXT_MATCH_FECHA'].iloc[0])
-                    clause_deadline = first_match_date - timedelta(hours=48)
-                    now = datetime.now(clause_deadline.tzinfo) if clause_deadline.tzinfo else datetime.now()
-                    is_open = now < clause_deadline
-                    return clause_deadline.strftime("%Y-%m-%d %H:%M"), is_open
+            df_next = load_table('next_match', columns=['NEXT_MATCH_FECHA'])
+            if not df_next.empty:
+                first_match_date = pd.to_datetime(df_next['NEXT_MATCH_FECHA'].iloc[0])
+                clause_deadline = first_match_date - timedelta(hours=48)
+                now = datetime.now(clause_deadline.tzinfo) if clause_deadline.tzinfo else datetime.now()
+                is_open = now < clause_deadline
+                return clause_deadline.strftime("%Y-%m-%d %H:%M"), is_open
         except Exception as e:
             print(f"⚠️ Warning: Could not calculate clause deadline: {e}")
         return "Unknown", False
 
     def get_squad_position_summary(self, df_master):
-        """Counts available players per position in my squad."""
+        """
+        Counts the players of my squad eligible for each position (including alt positions).
+
+        Returns:
+            tuple[dict, int]: {position: eligible players} and squad size. A versatile player
+            counts in each of their positions.
+        """
         my_team = self.get_my_team_name()
         summary = {"GK": 0, "DF": 0, "MF": 0, "FW": 0}
         
         if 'BIWPLAYER_TEAM_NAME' not in df_master.columns:
-            return summary
+            return summary, 0
             
         my_squad = df_master[df_master['BIWPLAYER_TEAM_NAME'] == my_team]
-        
-        if 'PLAYER_POSITION' in my_squad.columns:
-            for pos in ['GK', 'DF', 'MF', 'FW']:
-                # Count players with this position (including alt positions)
-                count = len(my_squad[my_squad['PLAYER_POSITION'] == pos])
-                summary[pos] = count
-        
-        return summary
+        # One AND per position over the POSITION_MASK bitmask
+        summary.update(eligible_counts(my_squad))
+        return summary, len(my_squad)
 
     def decide(self, coach_report, sporting_director_proposals, df_master):
         """
@@ -141,12 +139,11 @@ class President:
         current_balance = self.get_budget_info()
         jornada_name, jornada_start = self.get_jornada_info()
         clause_deadline, clause_open = self.get_clause_deadline()
-        position_summary = self.get_squad_position_summary(df_master)
+        position_summary, total_players = self.get_squad_position_summary(df_master)
         current_time = datetime.now().strftime("%Y-%m-%d %H:%M")
         
         # Format position summary
         pos_str = ", ".join([f"{pos}: {count}" for pos, count in position_summary.items()])
-        total_players = sum(position_summary.values())
         
         # Check for potential issues
         warnings = []
@@ -171,7 +168,7 @@ Current Date/Time: {current_time}
 | **Current Balance** | €{current_balance:,.0f} |
 | **Next Jornada** | {jornada_name} (Starts: {jornada_start}) |
 | **Clause Window** | {"OPEN ✅" if clause_open else "CLOSED ❌"} (Deadline: {clause_deadline}) |
-| **Squad Size** | {total_players} players ({pos_str}) |
+| **Squad Size** | {total_players} players (eligible per position: {pos_str}) |
 
 ### ⚠️ ALERTS
 {warnings_str}
@@ -37,7 +37,7 @@ Mission & Logic:
 
 Workflow:
 ---------
-1. Retrieve current balance from 'user_info.csv'.
+1. Retrieve current balance from 'user_info'.
 2. Load and analyze the Coach's "COACH REPORT" for needs and sales suggestions.
 3. Scan the market (df_master) for opportunities (Free Agents vs. League Players).
 4. Apply value-based metrics (Points/Price, Price Trends).
@@ -47,8 +47,9 @@ Workflow:
 
 from src.llm_endpoints.deepseek import DeepseekClient
 from src.data_extraction.pipeline import print_step
+from src.data_extraction.positions import POSITION_BITS, eligible
+from src.data_extraction.storage import load_table
 import pandas as pd
-import os
 from datetime import datetime, timedelta
 
 class SportingDirector:
@@ -60,31 +61,29 @@ class SportingDirector:
         self.llm = DeepseekClient()
 
     def get_my_team_name(self):
-        """Retrieves the user's team name from user_info.csv."""
+        """Retrieves the user's team name from user_info."""
         try:
-            if os.path.exists('./data/user_info.csv'):
-                df_user = pd.read_csv('./data/user_info.csv')
-                if not df_user.empty:
-                    return df_user['team_name'].iloc[0]
+            df_user = load_table('user_info', columns=['team_name'])
+            if not df_user.empty:
+                return df_user['team_name'].iloc[0]
         except Exception as e:
-            print(f"⚠️ Warning: Could not read user_info.csv: {e}")
+            print(f"⚠️ Warning: Could not read user_info: {e}")
         return None
 
     def get_active_round_info(self):
         """
-        Reads active_events.csv to check for ongoing rounds.
+        Reads active_events to check for ongoing rounds.
         Returns a string context or None.
         """
         try:
-            if os.path.exists('./data/active_events.csv'):
-                df_events = pd.read_csv('./data/active_events.csv')
-                if not df_events.empty:
-                    active_rounds = df_events[df_events['status'] == 'active']
-                    if not active_rounds.empty:
-                        event = active_rounds.iloc[0]
-                        return f"Jornada '{event['name']}' is ACTIVE until {event['end']}. You will receive income after it ends."
+            df_events = load_table('active_events', columns=['name', 'status', 'end'])
+            if not df_events.empty:
+                active_rounds = df_events[df_events['status'] == 'active']
+                if not active_rounds.empty:
+                    event = active_rounds.iloc[0]
+                    return f"Jornada '{event['name']}' is ACTIVE until {event['end']}. You will receive income after it ends."
         except Exception as e:
-            print(f"⚠️ Warning: Could not read active_events.csv: {e}")
+            print(f"⚠️ Warning: Could not read active_events: {e}")
         return None
 
     def get_clause_deadline(self):
@@ -93,39 +92,37 @@ class SportingDirector:
         Returns a tuple (deadline_str, is_open: bool).
         """
         try:
-            if os.path.exists('./data/next_match.csv'):
-                df_next = pd.read_csv('./data/next_match.csv')
-                if not df_next.empty:
-                    # Get the earliest match date
-                    first_match_date_str = df_next['NEXT_MATCH_FECHA'].iloc[0]
-                    first_match_date = pd.to_datetime(first_match_date_str)
-                    
-                    # Deadline is 48 hours before the first match
-                    clause_deadline = first_match_date - timedelta(hours=48)
-                    now = datetime.now(clause_deadline.tzinfo) if clause_deadline.tzinfo else datetime.now()
-                    
-                    is_open = now < clause_deadline
-                    deadline_str = clause_deadline.strftime("%Y-%m-%d %H:%M")
-                    
-                    return deadline_str, is_open
+            df_next = load_table('next_match', columns=['NEXT_MATCH_FECHA'])
+            if not df_next.empty:
+                # Get the earliest match date
+                first_match_date_str = df_next['NEXT_MATCH_FECHA'].iloc[0]
+                first_match_date = pd.to_datetime(first_match_date_str)
+
+                # Deadline is 48 hours before the first match
+                clause_deadline = first_match_date - timedelta(hours=48)
+                now = datetime.now(clause_deadline.tzinfo) if clause_deadline.tzinfo else datetime.now()
+
+                is_open = now < clause_deadline
+                deadline_str = clause_deadline.strftime("%Y-%m-%d %H:%M")
+
+                return deadline_str, is_open
         except Exception as e:
             print(f"⚠️ Warning: Could not calculate clause deadline: {e}")
         return "Unknown", False
 
     def get_budget_info(self):
         """
-        Retrieves the current balance/budget from user_info.csv.
+        Retrieves the current balance/budget from user_info.
         Returns 0.0 if not found.
         """
         try:
-            if os.path.exists('./data/user_info.csv'):
-                df_user = pd.read_csv('./data/user_info.csv')
-                if not df_user.empty:
-                    for col in ['balance', 'credit', 'money', 'budget']:
-                        if col in df_user.columns:
-                            return float(df_user[col].iloc[0])
+            df_user = load_table('user_info', columns=['balance', 'credit', 'money', 'budget'])
+            if not df_user.empty:
+                for col in ['balance', 'credit', 'money', 'budget']:
+                    if col in df_user.columns:
+                        return float(df_user[col].iloc[0])
         except Exception as e:
-            print(f"⚠️ Warning: Could not read budget from user_info.csv: {e}")
+            print(f"⚠️ Warning: Could not read budget from user_info: {e}")
         return 0.0
 
     def propose(self, coach_report, df_master):
@@ -154,7 +151,7 @@ class SportingDirector:
         # ==========================================================================
         
         # --- A. MARKET (Free Agents) ---
-        market_cols = ['PLAYER_ID', 'PLAYER_NAME', 'PLAYER_POSITION', 'TEAM_NAME', 
+        market_cols = ['PLAYER_ID', 'PLAYER_NAME', 'PLAYER_POSITION', 'PLAYER_ALT_POSITIONS', 'TEAM_NAME', 
                        'AVG_POINTS', 'MARKET_SALE_PRICE', 'FINAL_SCORE', 
                        'COST_PER_XP', 'COST_PER_POINT', 'COST_PER_MOMENTUM_POINT']
         existing_market_cols = [c for c in market_cols if c in df_master.columns]
@@ -163,9 +160,13 @@ class SportingDirector:
         if not market_players.empty and 'FINAL_SCORE' in market_players.columns:
             # Sort by Value Efficiency (Cost per xP) instead of Score
             if 'COST_PER_XP' in market_players.columns:
-                 market_players = market_players.sort_values(by='COST_PER_XP', ascending=True).head(15)
+                 market_players = market_players.sort_values(by='COST_PER_XP', ascending=True)
             else:
-                 market_players = market_players.sort_values(by='FINAL_SCORE', ascending=False).head(15)
+                 market_players = market_players.sort_values(by='FINAL_SCORE', ascending=False)
+            # Best 15 plus the best 3 eligible for each position, so any need the Coach signals has options
+            best_by_position = [market_players[eligible(market_players, pos)].head(3) for pos in POSITION_BITS]
+            market_players = market_players.loc[market_players.index.isin(
+                pd.concat([market_players.head(15), *best_by_position]).index)]
             market_summary = market_players[existing_market_cols].to_markdown(index=False)
         else:
             market_summary = "No free agents on the market."
@@ -245,6 +246,7 @@ High Price + Low xP + Negative Trend = SELL
 - **COST_PER_XP**: Millions paid per Expected Point. **LOWER IS BETTER**. (e.g. 0.5 is better than 1.2).
 - **COST_PER_MOMENTUM_POINT**: Cost per recent form point. If this is MUCH LOWER than Cost/Point, it's a **BARGAIN (Chollo)**.
 - **EXPECTED_POINTS (xP)**: Risk-adjusted points expected for this week.
+- **PLAYER_ALT_POSITIONS**: Other positions the player can be lined up in (besides `PLAYER_POSITION`).
 - **MOMENTUM_TREND**: Price/Form momentum. Positive = rising.
 - **BIWPLAYER_PURCHASE_PRICE**: What we PAID to acquire this player (market or clause).
 - **BIWPLAYER_CLAUSE**: What OTHERS must pay to steal this player from us.
@@ -13,4 +13,42 @@ class GeneralSettings:
     LANGUAGE = os.getenv("LANGUAGE")
     # Biwenger score ID (1: AS, 2: SofaScore, 5: Media, etc.)
     # Priority: SCORE_TYPE (common in .env) > SCORE_ID (alternative) > '1' (AS default)
-    SCORE_TYPE = os.getenv("SCORE_TYPE")
\ No newline at end of file
+    SCORE_TYPE = os.getenv("SCORE_TYPE")
+    # Primary Biwenger league (the one the agents report on) when the account plays in several.
+    # Defaults to the first league returned by Biwenger.
+    LEAGUE_ID = os.getenv("LEAGUE_ID")
+    # Storage backend of the ./data tables: 'parquet' (default), 'arrow' (Arrow IPC) or 'csv'
+    DATA_BACKEND = os.getenv("DATA_BACKEND", "parquet")
+    # Also export every table as CSV for inspection
+    DATA_CSV_EXPORT = os.getenv("DATA_CSV_EXPORT", "false").lower() == "true"
+    # Keep a versioned snapshot of every extraction run in ./data/snapshots
+    SNAPSHOTS = os.getenv("SNAPSHOTS", "true").lower() == "true"
+    # Retention: last N runs, plus the latest run of each of the last N days
+    SNAPSHOT_KEEP_LAST = int(os.getenv("SNAPSHOT_KEEP_LAST", "10"))
+    SNAPSHOT_KEEP_DAILY = int(os.getenv("SNAPSHOT_KEEP_DAILY", "30"))
+    # Seconds a source finished by a failed run stays reusable by the next one
+    JOURNAL_MAX_AGE = int(os.getenv("JOURNAL_MAX_AGE", str(6 * 3600)))
+    # Rolling window of the news index: days an entry is kept, and max entries
+    NEWS_WINDOW_DAYS = int(os.getenv("NEWS_WINDOW_DAYS", "14"))
+    NEWS_MAX_ITEMS = int(os.getenv("NEWS_MAX_ITEMS", "500"))
+    # Fuzzy matches (Comuniate / odds names -> Biwenger IDs) below this score are flagged for review in ./data/name_aliases
+    ALIAS_REVIEW_SCORE = float(os.getenv("ALIAS_REVIEW_SCORE", "85"))
+    # HTTP client (see http_client.HttpClient): timeouts in seconds and retries of network errors, 429 and 5xx
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+    HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+    # Record / replay of the HTTP traffic (see cassette.py): 'live' (default), 'record' or 'replay'
+    HTTP_MODE = os.getenv("HTTP_MODE", "live")
+    HTTP_CASSETTE = os.getenv("HTTP_CASSETTE", "./data/cache/cassettes/extraction.json.gz")
+    # Replay delay per request: empty (none), seconds, or 'recorded'
+    HTTP_REPLAY_LATENCY = os.getenv("HTTP_REPLAY_LATENCY") or None
+    # Scratch data root of record / replay runs, emptied at the start of each (./data is left untouched)
+    HTTP_CASSETTE_DATA_DIR = os.getenv("HTTP_CASSETTE_DATA_DIR", "./data/cassette_run")
+    # Base URLs of the Biwenger API and CDN. Point both to a local stand-in (biwenger_stub.py) for load tests
+    BIWENGER_BASE_URL = os.getenv("BIWENGER_BASE_URL", "https://biwenger.as.com/")
+    BIWENGER_CDN_URL = os.getenv("BIWENGER_CDN_URL", "https://cf.biwenger.com/")
+    # Refresh daemon (python main_langgraph.py --daemon): seconds between refreshes of each source
+    DAEMON_CADENCES = os.getenv("DAEMON_CADENCES", "user_league=300,laliga=900,comuniate=3600,news=3600,odds=21600")
+    # Agents run when df_master changes materially, at most every MIN_INTERVAL seconds, and at least every INTERVAL seconds
+    DAEMON_AGENTS_MIN_INTERVAL = int(os.getenv("DAEMON_AGENTS_MIN_INTERVAL", "1800"))
+    DAEMON_AGENTS_INTERVAL = int(os.getenv("DAEMON_AGENTS_INTERVAL", str(6 * 3600)))
@@ -0,0 +1,233 @@
+"""
+Fantasy Crew - Refresh daemon
+=============================
+
+Long-running alternative to the one-shot pipeline: after a full extraction, each source is
+refreshed on its own cadence (GeneralSettings.DAEMON_CADENCES, seconds):
+
+    user_league (standings, market, offers, squads)   every few minutes
+    laliga      (competition payload, next round)      polled, conditional GET: rebuilds only on change
+    comuniate   (probable lineups)                     hourly
+    news / odds                                        hourly / a few times a day
+
+The DataAnalyst stays resident: a refresh only replaces the tables of its source, and only if
+their content changed; DataAnalyst.build then re-runs just the stages that read them (a market
+refresh skips the fuzzy matching), consolidates, and recomputes only the features downstream of
+the columns that changed (see features.FeatureGraph).
+
+The agents (`on_trigger(df_master, reason)`) run on start, whenever a refresh changes the
+material columns of df_master (status, lineups, ownership, market, odds) and at least every
+DAEMON_AGENTS_INTERVAL seconds. Material triggers are spaced by DAEMON_AGENTS_MIN_INTERVAL.
+
+Each refresh of user_league also re-reads the account (user_info), so the agents see the current
+balance. The HTTP cache counters are reset every cycle, so the logs of a refresh only count its requests.
+"""
+
+import hashlib
+import io
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from typing import Callable, Optional
+
+import pandas as pd
+
+from src.agents.data_analyst import DataAnalyst
+from src.config import GeneralSettings
+from src.data_extraction import pipeline
+from src.data_extraction.pipeline import SOURCE_EXTRACTORS, _authenticate, get_data, refresh_source
+
+# Sources that need the Biwenger session
+AUTH_SOURCES = {'laliga', 'user_league'}
+# df_master columns whose change is worth a new agents run
+MATERIAL_COLUMNS = [
+    'PLAYER_STATUS', 'COMUNIATE_STARTER', 'COMUNIATE_DOUBT', 'BIWPLAYER_TEAM_NAME', 'BIWPLAYER_CLAUSE',
+    'MARKET_SALE_PRICE', 'MARKET_OFFER_COUNT', 'MARKET_OFFER_AMOUNT', 'ODDS_1', 'ODDS_X', 'ODDS_2'
+]
+
+
+def parse_cadences(text: str) -> dict:
+    """'user_league=300,odds=21600' -> {'user_league': 300.0, 'odds': 21600.0}"""
+    cadences = {}
+    for item in filter(None, (part.strip() for part in text.split(','))):
+        source, _, seconds = item.partition('=')
+        if source not in SOURCE_EXTRACTORS:
+            raise ValueError(f"Unknown source '{source}' in DAEMON_CADENCES. Options: {', '.join(SOURCE_EXTRACTORS)}")
+        cadences[source] = float(seconds)
+    return cadences
+
+
+def table_fingerprint(df: pd.DataFrame) -> str:
+    return hashlib.sha1(df.to_json(orient='split', date_format='iso', default_handler=str).encode('utf-8')).hexdigest()
+
+
+def material_changes(old: Optional[pd.DataFrame], new: Optional[pd.DataFrame]) -> int:
+    """Number of players whose MATERIAL_COLUMNS differ between two df_master."""
+    if old is None or new is None or 'PLAYER_ID' not in new.columns:
+        return 0 if old is new else len(new if new is not None else old)
+    columns = ['PLAYER_ID'] + [c for c in MATERIAL_COLUMNS if c in old.columns and c in new.columns]
+    old_rows = pd.util.hash_pandas_object(old[columns], index=False)
+    new_rows = pd.util.hash_pandas_object(new[columns], index=False)
+    changed = set(old_rows) ^ set(new_rows)
+    ids = pd.concat([old['PLAYER_ID'][old_rows.isin(changed).values], new['PLAYER_ID'][new_rows.isin(changed).values]])
+    return ids.nunique()
+
+
+class RefreshDaemon:
+    """
+    Args:
+        on_trigger (callable): Called with (df_master, reason) to run the agents. None only keeps
+                               df_master up to date.
+        cadences (dict): Seconds between refreshes per source. Defaults to DAEMON_CADENCES.
+        agents_interval (float): Maximum seconds between agents runs.
+        agents_min_interval (float): Minimum seconds between agents runs triggered by changes.
+    """
+    def __init__(self, on_trigger: Callable[[pd.DataFrame, str], None] = None, cadences: dict = None,
+                 agents_interval: float = None, agents_min_interval: float = None, max_workers: int = 4):
+        self.on_trigger = on_trigger
+        self.cadences = cadences or parse_cadences(GeneralSettings.DAEMON_CADENCES)
+        self.agents_interval = agents_interval or GeneralSettings.DAEMON_AGENTS_INTERVAL
+        self.agents_min_interval = agents_min_interval or GeneralSettings.DAEMON_AGENTS_MIN_INTERVAL
+        self.max_workers = max_workers
+        self.analyst = DataAnalyst()
+        self.auth = None
+        self.next_refresh = {}
+        self.fingerprints = {}
+        self.last_agents_run = None
+        self.pending_trigger = "daemon started"
+        self._stop = threading.Event()
+
+    @property
+    def df_master(self) -> Optional[pd.DataFrame]:
+        return self.analyst.df_master
+
+    def start(self):
+        """Full extraction and build; schedules the per-source refreshes."""
+        print(f"🛰️ Refresh daemon starting. Cadences: " + ', '.join(f"{s}={c:.0f}s" for s, c in self.cadences.items()))
+        data = get_data(extract=True, max_workers=self.max_workers)
+        self.fingerprints = {key: table_fingerprint(df) for key, df in data.items()}
+        self.analyst.build(data)
+        self._save_master()
+
+        now = time.monotonic()
+        self.next_refresh = {source: now + cadence for source, cadence in self.cadences.items()}
+
+    def _ensure_auth(self):
+        # Restores the stored token or logs in again when it is about to expire
+        if self.auth is None or (self.auth.token_expires_at or 0) - time.time() < self.auth.refresh_margin:
+            self.auth = _authenticate({})
+
+    def refresh(self, sources: list) -> set:
+        """
+        Refreshes `sources` concurrently and rebuilds df_master if any table changed.
+
+        Returns:
+            set: Data keys whose content changed.
+        """
+        start = time.perf_counter()
+        log = io.StringIO()
+        refreshed, errors = {}, {}
+        # Module attribute: cassette runs replace the cache
+        pipeline.HTTP_CACHE.reset_stats()
+        with redirect_stdout(log):
+            if AUTH_SOURCES & set(sources):
+                self._ensure_auth()
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(sources))) as executor:
+                futures = {source: executor.submit(refresh_source, source, {'auth': self.auth}) for source in sources}
+            for source, future in futures.items():
+                try:
+                    refreshed.update(future.result())
+                except Exception as e:
+                    errors[source] = e
+            pipeline.HTTP_CACHE.print_stats()
+
+        for source, e in errors.items():
+            print(f"⚠️ Refresh of {source} failed: {e}\n--- Detailed Logs ---\n{log.getvalue()}")
+
+        changed, fingerprints = {}, {}
+        for key, df in refreshed.items():
+            fp = table_fingerprint(df)
+            if self.fingerprints.get(key) != fp:
+                fingerprints[key] = fp
+                changed[key] = df
+        extract_time = time.perf_counter() - start
+
+        if not changed:
+            print(f"🔄 {', '.join(sources)}: no changes ({extract_time:.1f}s)")
+            return set()
+
+        previous = self.df_master
+        start = time.perf_counter()
+        build_log = io.StringIO()
+        try:
+            with redirect_stdout(build_log):
+                self.analyst.build(changed, changed=set(changed))
+            self._save_master()
+        except Exception as e:
+            # Fingerprints are left as they were: the next refresh of these sources builds them again
+            print(f"❌ Rebuild with {', '.join(sorted(changed))} failed: {e}\n--- Detailed Logs ---\n{build_log.getvalue()}")
+            return set()
+        # Only a successful build makes the refreshed tables the reference
+        self.fingerprints.update(fingerprints)
+        n_material = material_changes(previous, self.df_master)
+        print(f"🔄 {', '.join(sources)}: {', '.join(sorted(changed))} changed ({extract_time:.1f}s), "
+              f"df_master rebuilt in {time.perf_counter() - start:.2f}s ({self.analyst.features.summary()}), "
+              f"{n_material} players with material changes")
+        if n_material:
+            self.pending_trigger = f"{n_material} players changed ({', '.join(sorted(changed))})"
+        return set(changed)
+
+    def _save_master(self):
+        self.analyst.save_outputs()
+
+    def _maybe_trigger(self):
+        if self.on_trigger is None or self.df_master is None or self.df_master.empty:
+            return
+        now = time.monotonic()
+        since = now - self.last_agents_run if self.last_agents_run is not None else float('inf')
+        if self.pending_trigger and since >= self.agents_min_interval:
+            reason = self.pending_trigger
+        elif since >= self.agents_interval:
+            reason = "schedule"
+        else:
+            return
+
+        print(f"🤖 Running the agents: {reason}")
+        self.last_agents_run = now
+        self.pending_trigger = None
+        try:
+            self.on_trigger(self.df_master.copy(), reason)
+        except Exception as e:
+            print(f"❌ Agents run failed: {e}")
+
+    def run_forever(self):
+        """Starts the daemon and refreshes until stop() (or Ctrl+C)."""
+        self.start()
+        try:
+            while not self._stop.is_set():
+                now = time.monotonic()
+                due = [source for source, at in self.next_refresh.items() if at <= now]
+                if due:
+                    try:
+                        self.refresh(due)
+                    except Exception as e:
+                        # e.g. a failed re-authentication: the sources are retried on their next cadence
+                        print(f"❌ Refresh of {', '.join(due)} failed: {e}")
+                    # Cadences count from the end of the refresh: a slow source never piles up
+                    for source in due:
+                        self.next_refresh[source] = time.monotonic() + self.cadences[source]
+                self._maybe_trigger()
+
+                wake_up = min(self.next_refresh.values()) if self.next_refresh else time.monotonic() + 60
+                if self.on_trigger is not None and self.last_agents_run is not None:
+                    # A pending trigger is due as soon as the minimum interval has passed
+                    interval = self.agents_min_interval if self.pending_trigger else self.agents_interval
+                    wake_up = min(wake_up, self.last_agents_run + interval)
+                self._stop.wait(max(1.0, wake_up - time.monotonic()))
+        except KeyboardInterrupt:
+            pass
+        print("🛑 Refresh daemon stopped.")
+
+    def stop(self):
+        self._stop.set()
@@ -1,25 +1,88 @@
 import requests
 import random
-from dataclasses import dataclass
+import base64
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import List, Optional
 
-BASE_URL = "https://biwenger.as.com/"
+from src.config import GeneralSettings
+from src.data_extraction.cassette import CassetteMiss
+from src.data_extraction.http_client import HttpClient
+
+BASE_URL = GeneralSettings.BIWENGER_BASE_URL
 LOGIN_URL = BASE_URL + 'api/v2/auth/login'
 USER_INFO_URL = BASE_URL + 'api/v2/account'
+TOKEN_STORE_FILE = './data/cache/biwenger_session.json'
 
 
-# NOTA: Aquest codi només està preparat per quan l'usuari té una sola lliga (com és el meu cas), resta pendent
-#       per a gestionar múltiples ligues a get_user_info, ara mateix només retorna la primera lliga
-
 @dataclass
-class PlayerInfo:
-    user_id: int
-    user_name: str
+class LeagueContext:
     league_id: int
     league_name: str
     team_id: int
     team_name: str
     balance: int
 
+@dataclass
+class PlayerInfo:
+    """
+    Biwenger account with one LeagueContext per league the user plays in.
+    The league_* / team_* / balance properties refer to the primary (first) league.
+    """
+    user_id: int
+    user_name: str
+    leagues: List[LeagueContext]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'PlayerInfo':
+        return cls(
+            user_id=data['user_id'],
+            user_name=data['user_name'],
+            leagues=[LeagueContext(**league) for league in data['leagues']]
+        )
+
+    @property
+    def primary(self) -> LeagueContext:
+        return self.leagues[0]
+
+    def with_primary(self, league_id: Optional[int]) -> 'PlayerInfo':
+        """
+        Moves league `league_id` first (None keeps the order returned by Biwenger).
+
+        Raises:
+            ValueError: If the account doesn't play in `league_id`.
+        """
+        if league_id is None:
+            return self
+        if not any(str(league.league_id) == str(league_id) for league in self.leagues):
+            available = ', '.join(f"{league.league_id} ({league.league_name})" for league in self.leagues)
+            raise ValueError(f"LEAGUE_ID {league_id} is not one of the account's leagues: {available}")
+        leagues = sorted(self.leagues, key=lambda league: str(league.league_id) != str(league_id))
+        return PlayerInfo(user_id=self.user_id, user_name=self.user_name, leagues=leagues)
+
+    @property
+    def league_id(self) -> int:
+        return self.primary.league_id
+
+    @property
+    def league_name(self) -> str:
+        return self.primary.league_name
+
+    @property
+    def team_id(self) -> int:
+        return self.primary.team_id
+
+    @property
+    def team_name(self) -> str:
+        return self.primary.team_name
+
+    @property
+    def balance(self) -> int:
+        return self.primary.balance
+
 def get_random_user_agent() -> str:
     """Returns a random User-Agent string."""
     user_agents = [
@@ -52,17 +115,52 @@ def random_headers() -> dict:
     }
 
 
+def token_expiry(token: str, default_ttl: float) -> float:
+    """
+    Returns the expiry (epoch seconds) of a bearer token: the `exp` claim if the token is a JWT,
+    otherwise now + default_ttl.
+    """
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get('exp')
+        if exp:
+            return float(exp)
+    except Exception:
+        pass
+    return time.time() + default_ttl
+
+
 class BiwengerAuth:
     """
     Handles authentication with Biwenger using a persistent session.
+
+    The token, cookies and PlayerInfo are persisted in `token_store` (None disables it) so
+    later runs skip the home page + login round trips while the token is valid. A stored token
+    is refreshed with a fresh login `refresh_margin` seconds before it expires, and any 401 from
+    Biwenger on a reused token triggers a fresh login and a retry of the request.
+    `user_info_ttl` controls how long the stored PlayerInfo (balance!) is trusted; by default
+    the account is re-read on every run.
+    `primary_league_id` selects which of the user's leagues goes first in PlayerInfo.leagues.
     """
-    def __init__(self, email: str, password: str):
+    def __init__(self, email: str, password: str, token_store: str = TOKEN_STORE_FILE,
+                 token_ttl: float = 24 * 3600, refresh_margin: float = 3600, user_info_ttl: float = 0,
+                 primary_league_id: Optional[int] = None):
         self.email = email
         self.password = password
-        self.session = requests.Session()
+        self.primary_league_id = primary_league_id
+        self.session = HttpClient()
         self._setup_headers()
         self.token = None
         self.player_info = None
+        self.token_store = token_store
+        self.token_ttl = token_ttl
+        self.refresh_margin = refresh_margin
+        self.user_info_ttl = user_info_ttl
+        self.token_expires_at = None
+        self.reused_token = False
+        self._relogin_lock = threading.RLock()
+        self.session.hooks['response'].append(self._handle_unauthorized)
 
     def _setup_headers(self):
         """Sets up the base headers for the session to mimic a real browser."""
@@ -82,6 +180,8 @@ class BiwengerAuth:
         # 1. Visit home to initialize cookies (optional but recommended)
         try:
             self.session.get(BASE_URL)
+        except CassetteMiss:
+            raise
         except requests.RequestException as e:
             print(f"Warning: Error connecting to home page: {e}")
 
@@ -99,6 +199,8 @@ class BiwengerAuth:
                 if self.token:
                     # Update session headers with the token
                     self.session.headers.update({"Authorization": f"Bearer {self.token}"})
+                    self.token_expires_at = token_expiry(self.token, self.token_ttl)
+                    self.reused_token = False
                     return self.token
                 else:
                     raise Exception("Login successful but no token found in response.")
@@ -108,11 +210,105 @@ class BiwengerAuth:
         except requests.RequestException as e:
             raise Exception(f"Error during login request: {e}")
 
+    def _save_session(self):
+        """Persists token, cookies and PlayerInfo in the token store (readable only by the owner)."""
+        if not self.token_store or not self.token:
+            return
+        state = {
+            'email': self.email,
+            'token': self.token,
+            'expires_at': self.token_expires_at,
+            'saved_at': time.time(),
+            'cookies': [
+                {'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path}
+                for c in self.session.cookies
+            ],
+            'player_info': asdict(self.player_info) if self.player_info else None
+        }
+        os.makedirs(os.path.dirname(self.token_store) or '.', exist_ok=True)
+        tmp_path = self.token_store + '.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.token_store)
+
+    def _restore_session(self) -> bool:
+        """
+        Loads a stored session if it belongs to this account and is not about to expire.
+
+        Returns:
+            bool: True if the session was restored (no login needed).
+        """
+        if not self.token_store or not os.path.exists(self.token_store):
+            return False
+        try:
+            with open(self.token_store, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except Exception as e:
+            print(f"Warning: Could not read token store: {e}")
+            return False
+
+        if state.get('email') != self.email or not state.get('token'):
+            return False
+        expires_at = state.get('expires_at') or 0
+        if expires_at - time.time() < self.refresh_margin:
+            print("Stored token expired or about to expire, logging in again.")
+            return False
+
+        self.token = state['token']
+        self.token_expires_at = expires_at
+        self.reused_token = True
+        self.session.headers.update({"Authorization": f"Bearer {self.token}"})
+        for cookie in state.get('cookies', []):
+            self.session.cookies.set(cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie['path'])
+
+        user_info_fresh = time.time() - state.get('saved_at', 0) < self.user_info_ttl
+        if state.get('player_info') and user_info_fresh:
+            try:
+                # Stored with the LEAGUE_ID of its run: sorted again against the current one
+                self.player_info = PlayerInfo.from_dict(state['player_info']).with_primary(self.primary_league_id)
+            except (KeyError, TypeError, ValueError):
+                # ValueError: LEAGUE_ID not among the stored leagues, the account is read again
+                self.player_info = None
+        return True
+
+    def _handle_unauthorized(self, response, *args, **kwargs):
+        """
+        Session response hook. If a request made with a reused token gets a 401, logs in again
+        (once, shared by all threads) and resends the request with the new token.
+        """
+        if response.status_code != 401 or response.request.url == LOGIN_URL:
+            return response
+
+        sent_auth = response.request.headers.get('Authorization', '')
+        with self._relogin_lock:
+            if sent_auth == f"Bearer {self.token}":
+                if not self.reused_token:
+                    # A fresh token was rejected: nothing to recover
+                    return response
+                print("Stored token rejected (401), logging in again.")
+                self.login()
+                self._save_session()
+
+        retry = response.request.copy()
+        retry.headers['Authorization'] = f"Bearer {self.token}"
+        return self.session.send(retry, **kwargs)
+
     def get_session(self) -> requests.Session:
         """Returns the active requests.Session object."""
         return self.session
 
-    def get_user_info(self):
+    def get_user_info(self, primary_league_id: Optional[int] = None):
+        """
+        Fetches the account and every league the user plays in.
+
+        Args:
+            primary_league_id (int): League to place first (the primary league). Defaults to
+                                     the order returned by Biwenger.
+
+        Raises:
+            ValueError: If `primary_league_id` is not one of the account's leagues.
+        """
         # Añadimos el token y el referer al header base
         extra_headers = {
             "Authorization": f"Bearer {self.token}",
@@ -125,21 +321,23 @@ class BiwengerAuth:
             user_id = response_json.get('data').get('account').get('id')
             user_name = response_json.get('data').get('account').get('name')
 
-            league_id = response_json.get('data').get('leagues')[0].get('id')
-            league_name = response_json.get('data').get('leagues')[0].get('name')
-            team_id = response_json.get('data').get('leagues')[0].get('user').get('id')
-            team_name = response_json.get('data').get('leagues')[0].get('user').get('name')
-            balance = response_json.get('data').get('leagues')[0].get('user').get('balance')
+            leagues = []
+            for league in response_json.get('data').get('leagues', []):
+                leagues.append(LeagueContext(
+                    league_id=league.get('id'),
+                    league_name=league.get('name'),
+                    team_id=league.get('user').get('id'),
+                    team_name=league.get('user').get('name'),
+                    balance=league.get('user').get('balance')
+                ))
+            if not leagues:
+                raise Exception("The account is not part of any league.")
 
             self.player_info = PlayerInfo(
                 user_id=user_id,
                 user_name=user_name,
-                league_id=league_id,
-                league_name=league_name,
-                team_id=team_id,
-                team_name=team_name,
-                balance=balance
-            )
+                leagues=leagues
+            ).with_primary(primary_league_id)
 
             return self.player_info
 
@@ -148,15 +346,20 @@ class BiwengerAuth:
 
     def run(self):
         """
-        Ejecuta login y obtiene la información del usuario.
+        Ejecuta login (o reutiliza la sesión guardada) y obtiene la información del usuario.
         
         Returns:
             dict: Diccionario con 'token' y 'player_info'
         """
-        token = self.login()
-        print(f"Token obtenido: {token[:20]}...")
-        player_info = self.get_user_info()
+        if self._restore_session():
+            token = self.token
+            print(f"Token reutilizado: {token[:20]}...")
+        else:
+            token = self.login()
+            print(f"Token obtenido: {token[:20]}...")
+
+        player_info = self.player_info or self.get_user_info(primary_league_id=self.primary_league_id)
+        self._save_session()
         print(f"Usuario: {player_info.user_name}")
-        print(f"Liga: {player_info.league_name}")
-        print(f"Equipo: {player_info.team_name}")
-        print(f"Balance: {player_info.balance:,}€")
\ No newline at end of file
+        for league in player_info.leagues:
+            print(f"Liga: {league.league_name} | Equipo: {league.team_name} | Balance: {league.balance:,}€")
\ No newline at end of file
@@ -1,19 +1,26 @@
 import requests
 import pandas as pd
+import numpy as np
+import orjson
 import datetime
 import time
-import random
+import os
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from typing import List, Optional
 
 # Módulos
 from src.data_extraction.auth import random_headers
+from src.data_extraction.cassette import CassetteMiss
+from src.data_extraction.throttle import TokenBucket
 
 # Config
 from src.config import GeneralSettings
 
-LALIGA_INFO_URL = f"https://cf.biwenger.com/api/v2/competitions/la-liga/data?score={GeneralSettings.SCORE_TYPE}"
-JORNADA_URL = 'https://cf.biwenger.com/api/v2/rounds/la-liga'
+LALIGA_INFO_URL = f"{GeneralSettings.BIWENGER_CDN_URL}api/v2/competitions/la-liga/data?score={GeneralSettings.SCORE_TYPE}"
+JORNADA_URL = f"{GeneralSettings.BIWENGER_CDN_URL}api/v2/rounds/la-liga"
 
 # SUMMARY:
 
@@ -32,128 +39,150 @@ class SeasonInfo:
     rounds: List[dict]
     active_events: List[ActiveEvent]
 
+# Campos de cada jugador en el payload de la competición: (campo, valor por defecto, dtype de la columna)
+# dtype None = columna object (listas o textos libres)
+PLAYER_FIELDS = [
+    ('name', '', None),
+    ('slug', '', None),
+    ('teamID', None, 'Int64'),
+    ('position', None, 'Int64'),
+    ('altPositions', None, None),
+    ('price', 0, 'Int64'),
+    ('priceIncrement', 0, 'Int64'),
+    ('status', 'unknown', None),
+    ('statusInfo', None, None),
+    ('fitness', [], None),
+    ('points', 0, 'Int64'),
+    ('pointsHome', None, 'Int64'),
+    ('pointsAway', None, 'Int64'),
+    ('playedHome', None, 'Int64'),
+    ('playedAway', None, 'Int64'),
+]
+
+def _typed_column(values: list, dtype):
+    if dtype is None:
+        column = np.empty(len(values), dtype=object)
+        column[:] = values
+        return column
+    try:
+        return pd.array(values, dtype=dtype)
+    except (TypeError, ValueError):
+        # Valores no enteros (p. ej. decimales): se deja que pandas elija el tipo numérico
+        return pd.to_numeric(pd.Series(values), errors='coerce').array
+
+def players_frame(players: dict) -> pd.DataFrame:
+    """
+    Construye el DataFrame de jugadores columna a columna a partir del dict {id: jugador}
+    del payload. Solo se leen los campos de PLAYER_FIELDS, así que los campos extra que
+    añada Biwenger no cuestan nada más que su decodificación.
+    """
+    records = list(players.values())
+    columns = {'id': np.fromiter((int(player_id) for player_id in players), dtype=np.int64, count=len(records))}
+    for field, default, dtype in PLAYER_FIELDS:
+        columns[field] = _typed_column([player.get(field, default) for player in records], dtype)
+    return pd.DataFrame(columns)
+
+def teams_frame(teams: dict) -> pd.DataFrame:
+    """Construye el DataFrame de equipos (con su próximo partido) a partir del dict {id: equipo} del payload."""
+    # Crear un mapa de ID a Nombre para resolver los nombres de los equipos en los partidos
+    id_to_name = {int(tid): team['name'] for tid, team in teams.items()}
+
+    data_dict = {
+        'id': [],
+        'name': [],
+        'slug': [],
+        'next_game_date': [],
+        'next_game_home': [],
+        'next_game_away': [],
+        'next_game': [],
+        'is_home': []
+    }
+
+    for team_id, team in teams.items():
+        team_int_id = int(team_id)
+        data_dict['id'].append(team_int_id)
+        data_dict['name'].append(team['name'])
+        data_dict['slug'].append(team['slug'])
+
+        # Extraer info del próximo partido si existe
+        next_games = team.get('nextGames', [])
+        if next_games:
+            next_game = next_games[0]
+            data_dict['next_game_date'].append(pd.to_datetime(next_game.get('date'), unit='s'))
+            home_id = next_game.get('home', {}).get('id')
+            away_id = next_game.get('away', {}).get('id')
+
+            home_name = id_to_name.get(home_id, f"ID:{home_id}")
+            away_name = id_to_name.get(away_id, f"ID:{away_id}")
+
+            data_dict['next_game_home'].append(home_name)
+            data_dict['next_game_away'].append(away_name)
+            data_dict['next_game'].append(f"{home_name} - {away_name}")
+            data_dict['is_home'].append(home_id == team_int_id)
+        else:
+            data_dict['next_game_date'].append(None)
+            data_dict['next_game_home'].append(None)
+            data_dict['next_game_away'].append(None)
+            data_dict['next_game'].append(None)
+            data_dict['is_home'].append(None)
+
+    return pd.DataFrame(data_dict)
+
 class LaLigaGeneralData:
     '''
     Extrae los datos generales de la liga (es decir, comunes de Biwenger en todas las ligas, no los de la liga en particular donde participa el usuario):
     - laliga_data: extrae los datos generales de la liga
     - players_info: crea un DataFrame a partir de los datos de jugadores (extraídos en laliga_data)
     - teams_info: crea un DataFrame a partir de los datos de equipos (extraídos en laliga_data)
+
+    Si se proporciona un `http_cache` (HttpCache), las descargas del CDN usan GET condicional.
     '''
-    def __init__(self, session):
+    def __init__(self, session, http_cache=None):
         self.session = session
+        self.http_cache = http_cache
         self._laliga_data()
         self._jornadas_data()
+
+    def _get(self, url, source, headers):
+        if self.http_cache is not None:
+            return self.http_cache.get(self.session, url, source=source, headers=headers)
+        return self.session.get(url, headers=headers)
     
     def _laliga_data(self):
         headers = random_headers()
         headers['Referer'] = "https://biwenger.as.com/peloton/news"
         headers['Authorization'] = None  # Importante: no enviar el token al CDN
         
-        response = self.session.get(LALIGA_INFO_URL, headers=headers)
+        response = self._get(LALIGA_INFO_URL, 'laliga', headers)
         if response.status_code == 200:
-            response_json = response.json()
-            data = response_json.get('data', {})
-            self.players = data.get('players', {})
-            self.teams = data.get('teams', {})
-            self.season_raw = data.get('season', {})
-            self.active_events_raw = data.get('activeEvents', [])
+            self._parse_laliga_payload(response.content)
             return True
         else:
             raise Exception(f"Error: {response.status_code} - {response.text}")
+
+    def _parse_laliga_payload(self, content: bytes):
+        """
+        Decodifica el payload con orjson y construye directamente los DataFrames de jugadores y
+        equipos. El JSON decodificado (miles de jugadores) no se guarda en la instancia: solo
+        se conservan las jornadas y los eventos activos, que son pequeños.
+        """
+        data = orjson.loads(content).get('data') or {}
+        self.df_players = players_frame(data.get('players') or {})
+        self.df_teams = teams_frame(data.get('teams') or {})
+        self.season_raw = {'rounds': (data.get('season') or {}).get('rounds', [])}
+        self.active_events_raw = data.get('activeEvents', [])
+        del data
     
     def players_info(self) -> pd.DataFrame:
-        """Crea un DataFrame a partir de los datos de jugadores"""
-        if not self.players:
+        """Devuelve el DataFrame de jugadores construido al descargar los datos"""
+        if getattr(self, 'df_players', None) is None or self.df_players.empty:
             raise ValueError("Primero debe obtener los datos de laliga_data")
-        
-        data_dict = {
-            'id': [],
-            'name': [],
-            'slug': [],
-            'teamID': [],
-            'position': [],
-            'altPositions': [],
-            'price': [],
-            'priceIncrement': [],
-            'status': [],
-            'statusInfo': [],
-            'fitness': [],
-            'points': [],
-            'pointsHome': [],
-            'pointsAway': [],
-            'playedHome': [],
-            'playedAway': []
-        }
-        
-        for player_id, player in self.players.items():
-            data_dict['id'].append(int(player_id))
-            data_dict['name'].append(player.get('name', ''))
-            data_dict['slug'].append(player.get('slug', ''))
-            data_dict['teamID'].append(player.get('teamID'))
-            data_dict['position'].append(player.get('position'))
-            data_dict['altPositions'].append(player.get('altPositions'))
-            data_dict['price'].append(player.get('price', 0))
-            data_dict['priceIncrement'].append(player.get('priceIncrement', 0))
-            data_dict['status'].append(player.get('status', 'unknown'))
-            data_dict['statusInfo'].append(player.get('statusInfo'))
-            data_dict['fitness'].append(player.get('fitness', []))
-            data_dict['points'].append(player.get('points', 0))
-            data_dict['pointsHome'].append(player.get('pointsHome'))
-            data_dict['pointsAway'].append(player.get('pointsAway'))
-            data_dict['playedHome'].append(player.get('playedHome'))
-            data_dict['playedAway'].append(player.get('playedAway'))
-        
-        self.df_players = pd.DataFrame(data_dict)
         return self.df_players
     
     def teams_info(self) -> pd.DataFrame:
-        """Crea un DataFrame a partir de los datos de equipos"""
-        if not self.teams:
+        """Devuelve el DataFrame de equipos construido al descargar los datos"""
+        if getattr(self, 'df_teams', None) is None or self.df_teams.empty:
             raise ValueError("Primero debe obtener los datos de laliga_data")
-        
-        # Crear un mapa de ID a Nombre para resolver los nombres de los equipos en los partidos
-        id_to_name = {int(tid): team['name'] for tid, team in self.teams.items()}
-        
-        data_dict = {
-            'id': [],
-            'name': [],
-            'slug': [],
-            'next_game_date': [],
-            'next_game_home': [],
-            'next_game_away': [],
-            'next_game': [],
-            'is_home': []
-        }
-        
-        for team_id, team in self.teams.items():
-            team_int_id = int(team_id)
-            data_dict['id'].append(team_int_id)
-            data_dict['name'].append(team['name'])
-            data_dict['slug'].append(team['slug'])
-            
-            # Extraer info del próximo partido si existe
-            next_games = team.get('nextGames', [])
-            if next_games:
-                next_game = next_games[0]
-                data_dict['next_game_date'].append(pd.to_datetime(next_game.get('date'), unit='s'))
-                home_id = next_game.get('home', {}).get('id')
-                away_id = next_game.get('away', {}).get('id')
-                
-                home_name = id_to_name.get(home_id, f"ID:{home_id}")
-                away_name = id_to_name.get(away_id, f"ID:{away_id}")
-                
-                data_dict['next_game_home'].append(home_name)
-                data_dict['next_game_away'].append(away_name)
-                data_dict['next_game'].append(f"{home_name} - {away_name}")
-                data_dict['is_home'].append(home_id == team_int_id)
-            else:
-                data_dict['next_game_date'].append(None)
-                data_dict['next_game_home'].append(None)
-                data_dict['next_game_away'].append(None)
-                data_dict['next_game'].append(None)
-                data_dict['is_home'].append(None)
-        
-        self.df_teams = pd.DataFrame(data_dict)
         return self.df_teams
 
     def season_info(self) -> SeasonInfo:
@@ -185,7 +214,7 @@ class LaLigaGeneralData:
         headers['Referer'] = "https://biwenger.as.com/peloton/news"
         headers['Authorization'] = None
         
-        response = self.session.get(JORNADA_URL, headers=headers)
+        response = self._get(JORNADA_URL, 'rounds', headers)
         if response.status_code == 200:
             response_json = response.json()
             self.next_jornada = response_json.get('data', {}).get('next', {})
@@ -227,17 +256,34 @@ class LaLigaGeneralData:
         self.next_jornada_info()
         print('🟢 Next jornada extracted')
 
-LEAGUE_URL = "https://biwenger.as.com/api/v2/league?include=all,-lastAccess&fields=*,standings,tournaments,group,settings(description)"
-MARKET_URL = "https://biwenger.as.com/api/v2/market"
+LEAGUE_URL = f"{GeneralSettings.BIWENGER_BASE_URL}api/v2/league?include=all,-lastAccess&fields=*,standings,tournaments,group,settings(description)"
+MARKET_URL = f"{GeneralSettings.BIWENGER_BASE_URL}api/v2/market"
+USER_DETAILS_URL = GeneralSettings.BIWENGER_BASE_URL + "api/v2/user/{user_id}?fields=*,account(id),players(id,owner),lineups(round,points,count,position),league(id,name,competition,type,mode,marketMode,scoreID),market,seasons,offers,lastPositions"
 
 class UserLeagueData:
     '''
-    Extrae los datos de la liga del usuario
+    Extrae los datos de la liga del usuario.
+    Los detalles de cada manager se descargan en paralelo con `max_workers` hilos, limitados
+    a `requests_per_second` peticiones por segundo (token bucket) en lugar de pausas fijas.
+    `session` debe ser un HttpClient (p. ej. BiwengerAuth.session): los reintentos de cada
+    manager (`max_retries`) también pasan por el token bucket.
+
+    Si se indica `squads_cache_file`, la extracción de plantillas es incremental: solo se vuelven
+    a descargar los managers cuya huella (clasificación + ventas en mercado) ha cambiado desde la
+    última ejecución. Pasadas `squads_cache_max_age` horas se fuerza una extracción completa.
     '''
-    def __init__(self, session, token: str, league_id: int, user_id: int):
+    def __init__(self, session, token: str, league_id: int, user_id: int,
+                 max_workers: int = 4, requests_per_second: float = 2.0, max_retries: int = 2,
+                 squads_cache_file: str = None, squads_cache_max_age: float = 24):
         self.token = token
+        self.squads_cache_file = squads_cache_file
+        self.squads_cache_max_age = squads_cache_max_age
         self.league_id = league_id
         self.user_id = user_id
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.rate_limiter = TokenBucket(rate=requests_per_second, capacity=max_workers)
+        self.fetch_stats = {}  # {user_id: {'latency': s, 'status': code}}; los reintentos van a http_client.HTTP_METRICS
         self._league_table_data(session)
         self._market_data(session)
 
@@ -349,62 +395,175 @@ class UserLeagueData:
         self.df_league_table = pd.DataFrame(data_dict)
         return self.df_league_table
 
-    def all_teams_details(self, session) -> dict:
-        """Extrae los datos de todos los equipos de la liga de forma individual"""
+    def _fetch_team_details(self, session, user_id):
+        """
+        Descarga el detalle de un manager, reintentando errores de red, 429 y 5xx.
+        Nunca lanza excepciones: devuelve (user_id, None) si falla y registra la latencia
+        (reintentos incluidos) y el último status en self.fetch_stats.
+        """
+        url = USER_DETAILS_URL.format(user_id=user_id)
+        headers = {
+            'authorization': "Bearer " + self.token,
+            'x-league': str(self.league_id),
+            'x-user': str(self.user_id),
+            'referer': "https://biwenger.as.com/league"
+        }
+
+        data = None
+        status = None
+        start = time.perf_counter()
+        try:
+            # HttpClient reintenta errores de red, 429 (respetando Retry-After) y 5xx con backoff
+            response = session.get(url, headers=headers, retries=self.max_retries, rate_limiter=self.rate_limiter)
+            status = response.status_code
+            if status == 200:
+                data = response.json().get('data', {})
+        except CassetteMiss:
+            # Un replay incompleto debe fallar, no quedarse sin un mánager
+            raise
+        except Exception as e:
+            print(f"Error de red con el usuario {user_id}: {e}")
+
+        self.fetch_stats[user_id] = {
+            'latency': time.perf_counter() - start,
+            'status': status
+        }
+        return user_id, data
+
+    def iter_teams_details(self, session, user_ids: list = None):
+        """
+        Genera (user_id, datos) de cada manager de la liga (o solo de `user_ids`) a medida que
+        llegan las respuestas. Un manager que falla no bloquea al resto: simplemente no se genera.
+        """
         if not self.league_info:
             self._league_table_data(session)
-        
-        all_details = {}
+
+        if user_ids is None:
+            user_ids = [user.get('id') for user in self.league_info]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._fetch_team_details, session, user_id) for user_id in user_ids]
+            for future in as_completed(futures):
+                user_id, data = future.result()
+                if data is not None:
+                    print(f"Datos obtenidos para el usuario {user_id}")
+                    yield user_id, data
+                else:
+                    print(f"Error al obtener datos del usuario {user_id}: {self.fetch_stats[user_id]['status']}")
+
+    def all_teams_details(self, session) -> dict:
+        """Extrae los datos de todos los equipos de la liga de forma individual"""
+        return dict(self.iter_teams_details(session))
+
+    def manager_fingerprints(self) -> dict:
+        """
+        Huella de cada manager a partir de datos baratos: tamaño y valor de plantilla de la
+        clasificación y los jugadores que tiene en venta en el mercado. Si no cambia, su
+        plantilla tampoco ha cambiado.
+        """
+        sales_by_user = {}
+        for sale in getattr(self, 'market_sales', []):
+            user = sale.get('user') or {}
+            if user.get('id') is not None:
+                sales_by_user.setdefault(user['id'], []).append((sale.get('player', {}).get('id'), sale.get('price')))
+
+        fingerprints = {}
         for user in self.league_info:
             user_id = user.get('id')
-            
-            # Pausa aleatoria para simular comportamiento humano (entre 1 y 3 segundos)
-            time.sleep(random.uniform(1, 3))
-            
-            # URL detallada con filtros específicos para obtener toda la información relevante
-            url = f"https://biwenger.as.com/api/v2/user/{user_id}?fields=*,account(id),players(id,owner),lineups(round,points,count,position),league(id,name,competition,type,mode,marketMode,scoreID),market,seasons,offers,lastPositions"
-            
-            headers = {
-                'authorization': "Bearer " + self.token,
-                'x-league': str(self.league_id),
-                'x-user': str(self.user_id),
-                'referer': "https://biwenger.as.com/league"
-            }
-            response = session.get(url, headers=headers)
-            if response.status_code == 200:
-                all_details[user_id] = response.json().get('data', {})
-                print(f"Datos obtenidos para el usuario {user_id}")
-            else:
-                print(f"Error al obtener datos del usuario {user_id}: {response.status_code}")
-        
-        return all_details
+            payload = json.dumps([
+                user.get('teamSize'), user.get('teamValue'), user.get('teamValueInc'),
+                sorted(sales_by_user.get(user_id, []))
+            ], default=str)
+            fingerprints[str(user_id)] = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+        return fingerprints
+
+    def _load_squads_cache(self) -> dict:
+        if not self.squads_cache_file or not os.path.exists(self.squads_cache_file):
+            return {}
+        try:
+            with open(self.squads_cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Error al leer la caché de plantillas: {e}")
+            return {}
+        if time.time() - cache.get('full_refresh_at', 0) > self.squads_cache_max_age * 3600:
+            print("🔁 Caché de plantillas caducada, extracción completa.")
+            return {}
+        return cache
+
+    def _save_squads_cache(self, cache: dict):
+        if not self.squads_cache_file:
+            return
+        os.makedirs(os.path.dirname(self.squads_cache_file) or '.', exist_ok=True)
+        tmp_file = self.squads_cache_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False, default=str)
+        os.replace(tmp_file, self.squads_cache_file)
+
+    @staticmethod
+    def _squad_rows(team_id, team_data) -> list:
+        """Filas de league_players para la plantilla de un manager"""
+        team_name = team_data.get('name')
+        rows = []
+        for player in team_data.get('players', []):
+            owner_info = player.get('owner', {})
+            rows.append({
+                'team_id': team_id,
+                'team_name': team_name,
+                'player_id': player.get('id'),
+                'purchase_date': datetime.datetime.fromtimestamp(owner_info.get('date')) if owner_info.get('date') else None,
+                'purchase_price': owner_info.get('price'),
+                'clause': owner_info.get('clause'),
+                'clause_locked_until': datetime.datetime.fromtimestamp(owner_info.get('clauseLockedUntil')) if owner_info.get('clauseLockedUntil') else None,
+                'invested': owner_info.get('invested')
+            })
+        return rows
 
     def league_players_info(self, session) -> pd.DataFrame:
-        """Extrae la información de todos los jugadores de todos los equipos de la liga"""
-        all_teams_details = self.all_teams_details(session)
-        
-        players_list = []
-        for team_id, team_data in all_teams_details.items():
-            team_name = team_data.get('name')
-            players = team_data.get('players', [])
-            
-            for player in players:
-                player_id = player.get('id')
-                owner_info = player.get('owner', {})
-                
-                player_entry = {
-                    'team_id': team_id,
-                    'team_name': team_name,
-                    'player_id': player_id,
-                    'purchase_date': datetime.datetime.fromtimestamp(owner_info.get('date')) if owner_info.get('date') else None,
-                    'purchase_price': owner_info.get('price'),
-                    'clause': owner_info.get('clause'),
-                    'clause_locked_until': datetime.datetime.fromtimestamp(owner_info.get('clauseLockedUntil')) if owner_info.get('clauseLockedUntil') else None,
-                    'invested': owner_info.get('invested')
-                }
-                players_list.append(player_entry)
-        
+        """
+        Extrae la información de todos los jugadores de todos los equipos de la liga.
+        En modo incremental (`squads_cache_file`) reutiliza las plantillas cuya huella no ha
+        cambiado y solo descarga el resto.
+        """
+        if not self.league_info:
+            self._league_table_data(session)
+
+        cache = self._load_squads_cache()
+        cached_managers = cache.get('managers', {})
+        fingerprints = self.manager_fingerprints()
+
+        user_ids = [user.get('id') for user in self.league_info]
+        stale_ids = [uid for uid in user_ids if cached_managers.get(str(uid), {}).get('fingerprint') != fingerprints[str(uid)]]
+        if cached_managers:
+            print(f"🔎 {len(stale_ids)}/{len(user_ids)} managers con cambios desde la última extracción.")
+
+        managers = {}
+        stale_set = set(stale_ids)
+        for user_id in user_ids:
+            if user_id not in stale_set:
+                managers[str(user_id)] = cached_managers[str(user_id)]
+
+        for team_id, team_data in self.iter_teams_details(session, stale_ids):
+            managers[str(team_id)] = {
+                'fingerprint': fingerprints[str(team_id)],
+                'players': self._squad_rows(team_id, team_data)
+            }
+
+        # Si un manager con cambios ha fallado, se mantiene su plantilla anterior (sin actualizar la huella)
+        for user_id in stale_ids:
+            if str(user_id) not in managers and str(user_id) in cached_managers:
+                print(f"⚠️ Usando la plantilla anterior del usuario {user_id}.")
+                managers[str(user_id)] = {'fingerprint': None, 'players': cached_managers[str(user_id)]['players']}
+
+        players_list = [row for user_id in user_ids for row in managers.get(str(user_id), {}).get('players', [])]
         self.df_league_players = pd.DataFrame(players_list)
+        for col in ['purchase_date', 'clause_locked_until']:
+            if col in self.df_league_players.columns:
+                self.df_league_players[col] = pd.to_datetime(self.df_league_players[col])
+
+        self._save_squads_cache({
+            'full_refresh_at': cache.get('full_refresh_at', time.time()),
+            'managers': managers
+        })
         return self.df_league_players
 
     def run(self, session):
@@ -417,6 +576,8 @@ class UserLeagueData:
         try:
             df_league = self.league_table()
             print(f"✅ League table extracted: {len(df_league)} usuarios")
+        except CassetteMiss:
+            raise
         except:
              df_league = pd.DataFrame()
              print("⚠️ No hay datos de la clasificación.")
@@ -425,6 +586,8 @@ class UserLeagueData:
         try:
             df_sales = self.market_sales_info()
             print(f"✅ Market sales extracted: {len(df_sales)} ventas")
+        except CassetteMiss:
+            raise
         except:
              df_sales = pd.DataFrame()
              print("⚠️ No hay datos de ventas en mercado.")
@@ -433,6 +596,8 @@ class UserLeagueData:
         try:
             df_offers = self.market_offers_info()
             print(f"✅ Market offers extracted: {len(df_offers)} ofertas")
+        except CassetteMiss:
+            raise
         except:
              df_offers = pd.DataFrame()
              print("⚠️ No hay datos de ofertas en mercado.")
@@ -442,6 +607,8 @@ class UserLeagueData:
             print("⏳ Extrayendo detalles de todos los equipos (esto puede tardar)...")
             df_league_players = self.league_players_info(session)
             print(f"✅ League players extracted: {len(df_league_players)} jugadores en total")
+        except CassetteMiss:
+            raise
         except Exception as e:
              df_league_players = pd.DataFrame()
              print(f"⚠️ Error al extraer jugadores de la liga: {e}")
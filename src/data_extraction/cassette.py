@@ -0,0 +1,197 @@
+"""
+Record/replay of the HTTP traffic of the extractors.
+
+A cassette is a gzip-compressed JSON file with every request/response exchanged by the
+HttpClients (BiwengerAuth, LaLigaGeneralData, UserLeagueData, ComuniateData, JornadaPerfectaData
+and EuroClubIndexData all use one) while it is active:
+
+- record: requests go to the network and each response is appended to the cassette. Conditional
+  headers (If-None-Match / If-Modified-Since) are dropped so full bodies are recorded and the
+  cassette doesn't depend on the local HttpCache.
+- replay: nothing leaves the machine. Each request is answered with the next recorded response
+  for the same method + URL + body (falling back to method + URL, e.g. for a login with other
+  credentials); a request never recorded raises CassetteMiss. Rate limits and retry backoff are
+  disabled, and `latency` optionally injects delay: None (none), a number of seconds, or
+  'recorded' (the latency measured while recording).
+
+Cassettes contain account data (login response, squads): keep them out of version control.
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from src.data_extraction.throttle import set_pacing
+
+CASSETTE_DIR = './data/cache/cassettes'
+MODES = ('live', 'record', 'replay')
+_CONDITIONAL_HEADERS = ('If-None-Match', 'If-Modified-Since')
+
+
+class CassetteMiss(requests.ConnectionError):
+    """
+    Raised in replay mode for a request the cassette doesn't contain. The extractors re-raise it
+    past their error handling: a replay is either complete or fails, never silently partial.
+    """
+
+
+def _normalize_url(url: str) -> str:
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ''))
+
+
+def _body_hash(body) -> Optional[str]:
+    if not body:
+        return None
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return hashlib.sha1(body).hexdigest()
+
+
+class Cassette:
+    """
+    Args:
+        path (str): Cassette file (.json.gz).
+        mode (str): 'record' or 'replay'.
+        latency: Replay delay, see the module docstring.
+    """
+    def __init__(self, path: str, mode: str, latency: Union[None, float, str] = None):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown cassette mode '{mode}'. Options: record, replay")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.interactions = []
+        self._lock = threading.Lock()
+        self._exact = {}  # (method, url, body_hash) -> [interaction indexes]
+        self._by_url = {}  # (method, url) -> [interaction indexes]
+        self._served = {}  # lookup key -> times served
+        if mode == 'replay':
+            self.load()
+
+    def load(self):
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            self.interactions = json.load(f)['interactions']
+        for i, interaction in enumerate(self.interactions):
+            request = interaction['request']
+            self._exact.setdefault((request['method'], request['url'], request['body_sha1']), []).append(i)
+            self._by_url.setdefault((request['method'], request['url']), []).append(i)
+        print(f"📼 Replaying {len(self.interactions)} HTTP interactions from {self.path}")
+
+    def save(self) -> str:
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with self._lock:
+            content = {'version': 1, 'interactions': list(self.interactions)}
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(content, f)
+        os.replace(tmp_path, self.path)
+        print(f"📼 Recorded {len(content['interactions'])} HTTP interactions to {self.path}")
+        return self.path
+
+    def record(self, request: requests.PreparedRequest, response: requests.Response, elapsed: float):
+        interaction = {
+            'request': {
+                'method': request.method,
+                'url': _normalize_url(request.url),
+                'body_sha1': _body_hash(request.body)
+            },
+            'response': {
+                'status': response.status_code,
+                'reason': response.reason,
+                'url': response.url,
+                'encoding': response.encoding,
+                'headers': dict(response.headers),
+                'body': base64.b64encode(response.content).decode('ascii')
+            },
+            'elapsed': elapsed
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def _next(self, index: dict, key) -> Optional[dict]:
+        # Repeated requests get the recorded responses in order; the last one is served again once exhausted
+        positions = index.get(key)
+        if not positions:
+            return None
+        with self._lock:
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+        return self.interactions[positions[min(served, len(positions) - 1)]]
+
+    def play(self, request: requests.PreparedRequest) -> dict:
+        url = _normalize_url(request.url)
+        interaction = (self._next(self._exact, (request.method, url, _body_hash(request.body)))
+                       or self._next(self._by_url, (request.method, url)))
+        if interaction is None:
+            raise CassetteMiss(f"{request.method} {url} is not in cassette {self.path}", request=request)
+
+        if self.latency == 'recorded':
+            time.sleep(interaction['elapsed'])
+        elif self.latency:
+            time.sleep(float(self.latency))
+        return interaction
+
+
+class CassetteAdapter(HTTPAdapter):
+    """Transport adapter that records through the network or replays from a Cassette."""
+    def __init__(self, cassette: Cassette):
+        super().__init__()
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        if self.cassette.mode == 'replay':
+            return self._build(request, self.cassette.play(request)['response'])
+
+        for header in _CONDITIONAL_HEADERS:
+            request.headers.pop(header, None)
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        self.cassette.record(request, response, time.perf_counter() - start)
+        return response
+
+    def _build(self, request, recorded: dict) -> requests.Response:
+        response = requests.Response()
+        response.status_code = recorded['status']
+        response.reason = recorded.get('reason')
+        response.headers = CaseInsensitiveDict(recorded['headers'])
+        # The body is stored decoded: it must not be decompressed again
+        for header in ('Content-Encoding', 'Transfer-Encoding'):
+            response.headers.pop(header, None)
+        response._content = base64.b64decode(recorded['body'])
+        response.encoding = recorded.get('encoding')
+        response.url = recorded.get('url') or request.url
+        response.request = request
+        response.connection = self
+        return response
+
+
+_ACTIVE = {'cassette': None}
+
+
+def use_cassette(path: str, mode: str = 'replay', latency: Union[None, float, str] = None) -> Optional[Cassette]:
+    """
+    Activates a cassette for every HttpClient created from now on ('live' deactivates it).
+    Replay disables the pacing sleeps (rate limits and retry backoff).
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown HTTP mode '{mode}'. Options: {', '.join(MODES)}")
+    cassette = Cassette(path, mode, latency) if mode != 'live' else None
+    _ACTIVE['cassette'] = cassette
+    set_pacing(mode != 'replay')
+    return cassette
+
+
+def active_cassette() -> Optional[Cassette]:
+    return _ACTIVE['cassette']
@@ -1,14 +1,17 @@
 import requests
 import pandas as pd
-import re
-import time
-import random
 import os
+import json
+import hashlib
 import feedparser
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from dateutil import parser as date_parser
-from bs4 import BeautifulSoup
 from src.data_extraction.auth import get_random_user_agent
+from src.data_extraction.cassette import CassetteMiss
+from src.data_extraction.http_client import HttpClient
+from src.data_extraction.throttle import TokenBucket
+from src.data_extraction.html_parsers import get_comuniate_parser
+from src.data_extraction.news_index import NEWS_COLUMNS, clean_news
 
 class ComuniateData:
     """
@@ -16,14 +19,27 @@ class ComuniateData:
     """
     AJAX_URL = "https://www.comuniate.com/ajax/pintar_alineacion.php"
     BASE_URL = "https://www.comuniate.com/"
+    LINEUP_CACHE_FILE = "./data/cache/comuniate_lineups.json"
 
-    def __init__(self, session=None):
+    def __init__(self, session=None, max_workers: int = 4, requests_per_second: float = 1.0, cache_file: str = LINEUP_CACHE_FILE,
+                 html_parser: str = 'lxml'):
         """
-        Inicializa la clase con una sesión de requests opcional.
+        Inicializa la clase con una sesión opcional (HttpClient).
+
+        Args:
+            max_workers (int): Peticiones simultáneas a Comuniate.
+            requests_per_second (float): Límite de cortesía con comuniate.com (compartido por todos los hilos).
+            cache_file (str): JSON con el hash del HTML de cada equipo y su alineación ya parseada.
+                              None desactiva la caché.
+            html_parser (str): 'lxml' (por defecto, si está instalado) o 'bs4'. Ambos producen el mismo DataFrame.
         """
-        self.session = session or requests.Session()
+        self.session = session or HttpClient()
         self.id_jornada = None
         self.teams_map = {} # {id_equipo: nombre_equipo}
+        self.max_workers = max_workers
+        self.rate_limiter = TokenBucket(rate=requests_per_second, capacity=max_workers)
+        self.cache_file = cache_file
+        self.html_parser = get_comuniate_parser(html_parser)
 
     def initialize_session(self):
         """
@@ -54,29 +70,13 @@ class ComuniateData:
             response.raise_for_status()
             html = response.text
             
-            # 1. Extraer el número de jornada desde div.fuente_alternativa > span.success
-            soup = BeautifulSoup(html, 'html.parser')
-            fuente_alternativa = soup.find('div', class_='fuente_alternativa')
-            if fuente_alternativa:
-                span_jornada = fuente_alternativa.find('span', class_='success')
-                if span_jornada:
-                    self.id_jornada = int(span_jornada.get_text(strip=True))
-                    print(f"📅 Jornada detectada: {self.id_jornada}")
-                else:
-                    raise Exception("❌ No se encontró el span.success con la jornada.")
-            else:
-                raise Exception("❌ No se encontró el elemento 'fuente_alternativa' para la jornada.")
-                
-            # 2. Extraer mapeo de equipos desde div#fila-escudos
-            fila_escudos = soup.find('div', id='fila-escudos')
-            if fila_escudos:
-                enlaces = fila_escudos.find_all('a', class_='enlace-escudos')
-                for a in enlaces:
-                    id_equipo = a.get('data-id-equipo')
-                    img = a.find('img')
-                    if id_equipo and img:
-                        nombre = img.get('alt', '').replace("Alineación y plantilla de ", "").strip()
-                        self.teams_map[int(id_equipo)] = nombre
+            # Jornada (div.fuente_alternativa > span.success) y equipos (div#fila-escudos)
+            jornada, teams_map = self.html_parser.parse_league_page(html)
+            self.id_jornada = jornada
+            print(f"📅 Jornada detectada: {self.id_jornada}")
+
+            if teams_map is not None:
+                self.teams_map.update(teams_map)
                 print(f"✅ Mapeo de equipos cargado ({len(self.teams_map)} equipos).")
             else:
                 print("⚠️ No se encontró el elemento #fila-escudos.")
@@ -119,95 +119,75 @@ class ComuniateData:
             'modo': modo
         }
 
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                response = self.session.post(self.AJAX_URL, headers=headers, data=payload)
-                response.raise_for_status()
-                return response.text
-            except requests.exceptions.RequestException as e:
-                print(f"⚠️ Intento {attempt + 1}/{max_retries} fallido para equipo {id_equipo}: {e}")
-                if attempt < max_retries - 1:
-                    wait_time = random.uniform(2, 5) * (attempt + 1)
-                    print(f"⏳ Reintentando en {wait_time:.2f}s...")
-                    time.sleep(wait_time)
-                else:
-                    print(f"❌ Error persistente tras {max_retries} intentos.")
-                    return None
+        try:
+            # Los reintentos (con backoff y Retry-After) los hace el HttpClient, pasando por el límite de cortesía
+            response = self.session.post(self.AJAX_URL, headers=headers, data=payload, retries=2,
+                                         rate_limiter=self.rate_limiter)
+            response.raise_for_status()
+            return response.text
+        except CassetteMiss:
+            # Un replay incompleto debe fallar, no quedarse sin la alineación del equipo
+            raise
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Error persistente para equipo {id_equipo}: {e}")
+            return None
 
     def parse_lineup_html(self, html_content: str) -> pd.DataFrame:
         """
-        Parsea el HTML de la alineación y extrae la información de cada jugador.
+        Parsea el HTML de la alineación y extrae la información de cada jugador
+        con el parser configurado (ver html_parsers).
         
         Returns:
             pd.DataFrame: DataFrame con las columnas [posicion, nombre, suplente, titularidad, apercibido, duda]
         """
         if not html_content:
             return None
-        
-        soup = BeautifulSoup(html_content, 'html.parser')
-        players_data = []
-
-        # Mapeo de IDs de contenedores a nombres de posición
-        position_map = {
-            'portero': 'Portero',
-            'defensas': 'Defensa',
-            'medios': 'Centrocampista',
-            'delanteros': 'Delantero'
-        }
+        return pd.DataFrame(self.html_parser.parse_lineup(html_content))
 
-        for container_id, pos_name in position_map.items():
-            container = soup.find('div', id=container_id)
-            if not container:
-                continue
-            
-            # Buscamos cada bloque de jugador
-            players = container.find_all('div', class_='jugador_campo')
-            for p in players:
-                # 1. Nombre y Suplente (Alternativo)
-                nombre_div = p.find('div', class_='nombre_jugador')
-                nombre = ""
-                suplente = None
-                
-                if nombre_div:
-                    # El nombre suele ser el primer texto o lo que no es div alternativo
-                    alternativo_div = nombre_div.find('div', class_='alternativo')
-                    if alternativo_div:
-                        suplente = alternativo_div.get_text(strip=True)
-                        # Extraemos el texto del padre quitando el del hijo para obtener solo el nombre del titular
-                        nombre = nombre_div.get_text(strip=True).replace(suplente, "").strip()
-                    else:
-                        nombre = nombre_div.get_text(strip=True)
-
-                # 2. Titularidad (%)
-                titularidad = "100%" # Por defecto si no hay icono_porcentaje
-                porcentaje_div = p.find('div', class_='icono_porcentaje')
-                if porcentaje_div:
-                    titularidad = porcentaje_div.get_text(strip=True)
-
-                # 3. Apercibido
-                apercibido = None
-                apercibido_div = p.find('div', class_='apercibido')
-                if apercibido_div:
-                    apercibido = apercibido_div.get_text(strip=True)
-
-                # 4. Duda
-                duda = p.find('div', class_='duda') is not None
-                
-                players_data.append({
-                    'posicion': pos_name,
-                    'nombre': nombre,
-                    'suplente': suplente,
-                    'titularidad': titularidad,
-                    'apercibido': apercibido,
-                    'duda': duda
-                })
-
-        return pd.DataFrame(players_data)
+    def _load_lineup_cache(self) -> dict:
+        """Carga la caché {id_equipo: {'hash', 'jornada', 'players'}} de la ejecución anterior."""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Error al leer la caché de alineaciones: {e}")
+            return {}
+
+    def _save_lineup_cache(self, cache: dict):
+        if not self.cache_file:
+            return
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        tmp_file = self.cache_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(tmp_file, self.cache_file)
+
+    def _lineup_from_html(self, html: str, jornada: int, team_id: int, cache: dict):
+        """
+        Devuelve (DataFrame, reutilizado). Si el hash del HTML coincide con el de la caché
+        para la misma jornada, se reutiliza la alineación parseada sin volver a parsear.
+        """
+        html_hash = hashlib.sha1(html.encode('utf-8')).hexdigest()
+        cached = cache.get(str(team_id))
+        if cached and cached.get('hash') == html_hash and cached.get('jornada') == jornada:
+            return pd.DataFrame(cached['players']), True
+
+        df = self.parse_lineup_html(html)
+        if df is not None and not df.empty:
+            cache[str(team_id)] = {
+                'hash': html_hash,
+                'jornada': jornada,
+                'players': df.to_dict(orient='records')
+            }
+        return df, False
 
     def extract_all_lineups(self, id_jornada: int = None, max_teams: int = None, output_file: str = None):
         """
-        Extrae y parsea todas las alineaciones de la liga secuencialmente.
+        Extrae y parsea todas las alineaciones de la liga en paralelo (`max_workers` hilos
+        limitados por `rate_limiter`). Las alineaciones cuyo HTML no ha cambiado desde la
+        última ejecución no se vuelven a parsear.
         
         Args:
             id_jornada (int): ID de la jornada. Si es None, usa el detectado.
@@ -217,10 +197,10 @@ class ComuniateData:
         Returns:
             pd.DataFrame: DataFrame consolidado.
         """
-        jornada = id_jornada or self.id_jornada
         if not self.teams_map:
             print("📢 Cargando datos de la liga antes de la extracción masiva...")
             self.load_league_data()
+        jornada = id_jornada or self.id_jornada
             
         all_players = []
         teams_to_process = list(self.teams_map.items())
@@ -230,32 +210,57 @@ class ComuniateData:
         if output_file and os.path.exists(output_file):
             try:
                 existing_df = pd.read_csv(output_file)
-                if 'id_equipo_comuniate' in existing_df.columns:
+                # Solo se reanuda un archivo de la misma jornada: las alineaciones de otra ya no valen
+                same_jornada = ('id_jornada_comuniate' in existing_df.columns
+                                and existing_df['id_jornada_comuniate'].astype(str).eq(str(jornada)).all())
+                if not same_jornada:
+                    os.remove(output_file)
+                    print(f"🗑️ Archivo existente de otra jornada descartado (jornada actual: {jornada}).")
+                elif 'id_equipo_comuniate' in existing_df.columns:
                     processed_teams = set(existing_df['id_equipo_comuniate'].unique())
+                    all_players.append(existing_df)
                     print(f"🔄 Detectado archivo existente. {len(processed_teams)} equipos ya procesados.")
             except Exception as e:
                 print(f"⚠️ Error al leer archivo existente: {e}")
         
         if max_teams:
             teams_to_process = teams_to_process[:max_teams]
-            
-        print(f"🚀 Iniciando extracción masiva para {len(teams_to_process)} equipos...")
-        
-        for i, (team_id, team_name) in enumerate(teams_to_process):
+
+        pending_teams = []
+        for team_id, team_name in teams_to_process:
             if team_id in processed_teams:
                 print(f"⏭️ Saltando {team_name} (ya procesado).")
-                continue
-
-            print(f"📦 [{i+1}/{len(teams_to_process)}] Extrayendo: {team_name}...")
+            else:
+                pending_teams.append((team_id, team_name))
+        teams_to_process = pending_teams
             
-            html = self.get_probable_lineup(id_jornada=jornada, id_equipo=team_id)
-            if html:
-                df = self.parse_lineup_html(html)
+        print(f"🚀 Iniciando extracción masiva para {len(teams_to_process)} equipos...")
+        cache = self._load_lineup_cache()
+        reused = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.get_probable_lineup, id_jornada=jornada, id_equipo=team_id): (team_id, team_name)
+                for team_id, team_name in teams_to_process
+            }
+            # Los resultados se procesan en el hilo principal: parseo, caché y CSV sin condiciones de carrera
+            for i, future in enumerate(as_completed(futures)):
+                team_id, team_name = futures[future]
+                print(f"📦 [{i+1}/{len(teams_to_process)}] Recibido: {team_name}...")
+
+                html = future.result()
+                if not html:
+                    print(f"❌ Error al obtener HTML de {team_name}.")
+                    continue
+
+                df, from_cache = self._lineup_from_html(html, jornada, team_id, cache)
+                reused += from_cache
                 if df is not None and not df.empty:
                     df['equipo'] = team_name
                     df['id_equipo_comuniate'] = team_id
+                    df['id_jornada_comuniate'] = jornada
                     all_players.append(df)
-                    
+
                     # Guardado incremental
                     if output_file:
                         # Escribir header solo si el archivo no existe
@@ -264,18 +269,11 @@ class ComuniateData:
                         print(f"💾 Guardado incremental en {output_file}")
                 else:
                     print(f"⚠️ No se pudo parsear la alineación de {team_name}.")
-            else:
-                print(f"❌ Error al obtener HTML de {team_name}.")
-            
-            if i < len(teams_to_process) - 1:
-                wait = random.uniform(1, 2)
-                print(f"💤 Esperando {wait:.2f} segundos...")
-                time.sleep(wait)
-        
-        # Si se usó archivo, recargarlo completo para devolver el total real
-        if output_file and os.path.exists(output_file):
-            return pd.read_csv(output_file)
-            
+
+        self._save_lineup_cache(cache)
+        if reused:
+            print(f"♻️ {reused} alineaciones sin cambios reutilizadas de la caché.")
+
         if all_players:
             master_df = pd.concat(all_players, ignore_index=True)
             print(f"✅ Extracción completada. Total jugadores: {len(master_df)}")
@@ -313,23 +311,32 @@ class ComuniateData:
 class JornadaPerfectaData:
     """
     Clase para interactuar con JornadaPerfecta.com y extraer noticias vía RSS.
+
+    Args:
+        news_index (NewsIndex): Índice persistente de noticias. Si se indica, run() solo devuelve
+            las noticias nuevas desde la última ejecución.
     """
     FEED_URL = "https://www.jornadaperfecta.com/feed/"
 
-    def __init__(self, session=None):
-        self.session = session or requests.Session()
+    def __init__(self, session=None, http_cache=None, news_index=None):
+        self.session = session or HttpClient()
+        self.http_cache = http_cache
+        self.news_index = news_index
 
     def fetch_news(self) -> pd.DataFrame:
         """
         Obtiene las últimas noticias del feed RSS de Jornada Perfecta.
         
         Returns:
-            pd.DataFrame: DataFrame con las noticias [title, link, published, summary, tags]
+            pd.DataFrame: DataFrame con las noticias [id, title, link, published, summary, tags]
         """
         try:
             # Aunque feedparser puede manejar URLs, usamos requests para mayor control (User-Agent, etc.)
             headers = {'User-Agent': get_random_user_agent()}
-            response = self.session.get(self.FEED_URL, headers=headers)
+            if self.http_cache is not None:
+                response = self.http_cache.get(self.session, self.FEED_URL, source='news', headers=headers)
+            else:
+                response = self.session.get(self.FEED_URL, headers=headers)
             response.raise_for_status()
             
             feed = feedparser.parse(response.content)
@@ -338,6 +345,8 @@ class JornadaPerfectaData:
             for entry in feed.entries:
                 tags = [tag.term for tag in entry.get('tags', [])]
                 news_items.append({
+                    # guid del feed (o el enlace si no lo tiene): clave del índice de noticias
+                    'id': entry.get('id') or entry.get('link'),
                     'title': entry.get('title'),
                     'link': entry.get('link'),
                     'published': entry.get('published'),
@@ -348,6 +357,8 @@ class JornadaPerfectaData:
             df = pd.DataFrame(news_items)
             print(f"✅ Se han obtenido {len(df)} noticias de Jornada Perfecta.")
             return df
+        except CassetteMiss:
+            raise
         except Exception as e:
             print(f"⚠️ Error al obtener el feed de Jornada Perfecta: {e}")
             return pd.DataFrame()
@@ -362,51 +373,21 @@ class JornadaPerfectaData:
         if df.empty:
             return df
 
-        clean_data = []
-        for _, row in df.iterrows():
-            # 1. Limpiar fecha (Día y Hora corta)
-            try:
-                dt = date_parser.parse(row['published'])
-                clean_date = dt.strftime("%Y-%m-%d %H:%M")
-            except:
-                clean_date = row['published']
-
-            # 2. Limpiar summary (quitar HTML y espacios extra)
-            summary = row['summary']
-            if summary:
-                # Quitar etiquetas HTML
-                summary = re.sub(r'<[^>]+>', '', summary)
-                # Normalizar espacios y saltos de línea
-                summary = ' '.join(summary.split())
-                # Truncar si es excesivo (opcional, pero ayuda a tokens)
-                if len(summary) > 300:
-                    summary = summary[:297] + "..."
-
-            # 3. Limpiar tags (unirlos en string)
-            tags = row['tags']
-            if isinstance(tags, list):
-                tags_str = ', '.join(tags)
-            else:
-                tags_str = ""
-
-            clean_data.append({
-                'fecha': clean_date,
-                'titulo': row['title'],
-                'resumen': summary,
-                'tags': tags_str
-            })
-
-        return pd.DataFrame(clean_data)
+        # Limpieza vectorizada (fecha corta, resumen sin HTML y truncado, tags unidos)
+        return clean_news(df)[NEWS_COLUMNS]
 
     def run(self) -> pd.DataFrame:
         """
         Método maestro que combina la obtención y limpieza de noticias.
+        Con un news_index solo se limpian y devuelven las noticias que no se habían visto.
         
         Returns:
             pd.DataFrame: DataFrame optimizado para LLMs.
         """
         print("🎬 Iniciando extracción y limpieza de noticias de Jornada Perfecta...")
         df_raw = self.fetch_news()
+        if self.news_index is not None:
+            return self.news_index.ingest(df_raw)
         return self.get_clean_news(df_raw)
 
 class EuroClubIndexData:
@@ -416,8 +397,9 @@ class EuroClubIndexData:
     API_URL = "https://www.euroclubindex.com/wp-json/happyhorizon/v1/get-module-match-odds/"
     REFERER_URL = "https://www.euroclubindex.com/match-odds/"
 
-    def __init__(self, session=None):
-        self.session = session or requests.Session()
+    def __init__(self, session=None, http_cache=None):
+        self.session = session or HttpClient()
+        self.http_cache = http_cache
 
     def get_match_odds(self, league_id: int = 67) -> pd.DataFrame:
         """
@@ -445,7 +427,10 @@ class EuroClubIndexData:
             }
 
             print(f"🌍 Consultando EuroClubIndex para liga {league_id}...")
-            response = self.session.get(self.API_URL, headers=headers, params=params)
+            if self.http_cache is not None:
+                response = self.http_cache.get(self.session, self.API_URL, source='odds', headers=headers, params=params)
+            else:
+                response = self.session.get(self.API_URL, headers=headers, params=params)
             response.raise_for_status()
             
             data = response.json()
@@ -473,6 +458,8 @@ class EuroClubIndexData:
             print(f"✅ Se han obtenido {len(df)} partidos con probabilidades.")
             return df
 
+        except CassetteMiss:
+            raise
         except Exception as e:
             print(f"❌ Error al obtener datos de EuroClubIndex: {e}")
             return pd.DataFrame()
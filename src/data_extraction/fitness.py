@@ -0,0 +1,84 @@
+"""
+Numeric form of PLAYER_FITNESS.
+
+Biwenger gives each player's last matches as a list mixing points and statuses, most recent
+first: [7, 'injured', None, 'doubt', 2]. At ingestion (pipeline.tables_columns) the list is
+unpacked once into a fixed-width matrix, players x FITNESS_WIDTH matches, stored as columns:
+
+- FITNESS_POINTS_<i>: points of the i-th most recent match (0.0 when not played, NaN otherwise).
+- FITNESS_STATUS_<i>: status code of the slot (PLAYED, NOT_PLAYED, INJURED, SANCTIONED, DOUBT
+  or EMPTY for unknown tokens and players with fewer matches).
+
+Form metrics are then masked NumPy reductions over the matrix instead of a Python loop per player.
+"""
+
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+FITNESS_WIDTH = 5
+# Weight of each older match in the decayed momentum (1, 0.75, 0.56, ...)
+MOMENTUM_DECAY = 0.75
+
+PLAYED, NOT_PLAYED, INJURED, SANCTIONED, DOUBT, EMPTY = range(6)
+# None (called up, didn't play) counts as a 0; injuries, suspensions and doubts are skipped
+STATUS_CODES = {'discarded': NOT_PLAYED, 'injured': INJURED, 'sanctioned': SANCTIONED, 'doubt': DOUBT}
+
+_STATUS_LOOKUP = {None: NOT_PLAYED, **STATUS_CODES}
+_NUMBERS = (int, float, np.int64, np.float64)
+
+FITNESS_POINTS_COLUMNS = [f'FITNESS_POINTS_{i}' for i in range(1, FITNESS_WIDTH + 1)]
+FITNESS_STATUS_COLUMNS = [f'FITNESS_STATUS_{i}' for i in range(1, FITNESS_WIDTH + 1)]
+
+
+def fitness_matrix(fitness: pd.Series, width: int = FITNESS_WIDTH):
+    """
+    Unpacks fitness lists (see schemas.parse_list) into matrices.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: points (float64) and status codes (int8), players x width.
+    """
+    lists = [items[:width] if isinstance(items, list) else [] for items in fitness]
+    lengths = np.fromiter(map(len, lists), dtype=np.int64, count=len(lists))
+    flat = list(chain.from_iterable(lists))
+
+    # One pass over the items (a few per player), the rest is array work
+    values = np.fromiter((x if type(x) in _NUMBERS else np.nan for x in flat), dtype=np.float64, count=len(flat))
+    status = np.fromiter((PLAYED if type(x) in _NUMBERS else _STATUS_LOOKUP.get(x, EMPTY) if x is None or type(x) is str
+                          else EMPTY for x in flat), dtype=np.int8, count=len(flat))
+    status[(status == PLAYED) & np.isnan(values)] = NOT_PLAYED
+    values[status == NOT_PLAYED] = 0.0
+
+    rows = np.repeat(np.arange(len(lists)), lengths)
+    cols = np.arange(len(flat)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    points = np.full((len(lists), width), np.nan)
+    codes = np.full((len(lists), width), EMPTY, dtype=np.int8)
+    points[rows, cols] = values
+    codes[rows, cols] = status
+    return points, codes
+
+
+def fitness_columns(fitness: pd.Series, width: int = FITNESS_WIDTH) -> pd.DataFrame:
+    """FITNESS_POINTS_<i> and FITNESS_STATUS_<i> columns, aligned with `fitness`."""
+    points, codes = fitness_matrix(fitness, width)
+    df_points = pd.DataFrame(points, columns=FITNESS_POINTS_COLUMNS[:width], index=fitness.index)
+    df_status = pd.DataFrame(codes, columns=FITNESS_STATUS_COLUMNS[:width], index=fitness.index)
+    return pd.concat([df_points, df_status], axis=1)
+
+
+def momentum(points: np.ndarray, codes: np.ndarray, weights: np.ndarray = None) -> np.ndarray:
+    """
+    (Weighted) mean of the counted matches (PLAYED and NOT_PLAYED) of each player; 0.0 for
+    players without any.
+    """
+    counted = (codes == PLAYED) | (codes == NOT_PLAYED)
+    w = np.where(counted, 1.0 if weights is None else weights, 0.0)
+    total = w.sum(axis=1)
+    sums = (np.where(counted, points, 0.0) * w).sum(axis=1)
+    return np.divide(sums, total, out=np.zeros(len(points)), where=total > 0)
+
+
+def decay_weights(width: int = FITNESS_WIDTH, decay: float = MOMENTUM_DECAY) -> np.ndarray:
+    """Most recent match first: 1, decay, decay**2, ..."""
+    return decay ** np.arange(width)
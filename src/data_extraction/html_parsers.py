@@ -0,0 +1,220 @@
+"""
+HTML parsers for the Comuniate pages.
+
+Two interchangeable backends extract the same records:
+
+- SoupComuniateParser: BeautifulSoup with the pure-Python 'html.parser' (the original implementation).
+- LxmlComuniateParser: libxml2 tree plus precompiled XPath queries. Several times faster; used by
+  default when lxml is installed.
+
+Both return plain Python structures; ComuniateData builds the DataFrames.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+# Lineup containers: div id -> position name
+POSITION_MAP = {
+    'portero': 'Portero',
+    'defensas': 'Defensa',
+    'medios': 'Centrocampista',
+    'delanteros': 'Delantero'
+}
+TEAM_ALT_PREFIX = "Alineación y plantilla de "
+
+
+class SoupComuniateParser:
+    name = 'bs4'
+
+    def parse_lineup(self, html: str) -> List[dict]:
+        """Returns one dict per player: posicion, nombre, suplente, titularidad, apercibido, duda."""
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html, 'html.parser')
+        players_data = []
+
+        for container_id, pos_name in POSITION_MAP.items():
+            container = soup.find('div', id=container_id)
+            if not container:
+                continue
+
+            for p in container.find_all('div', class_='jugador_campo'):
+                # 1. Name and substitute (alternativo)
+                nombre_div = p.find('div', class_='nombre_jugador')
+                nombre = ""
+                suplente = None
+
+                if nombre_div:
+                    alternativo_div = nombre_div.find('div', class_='alternativo')
+                    if alternativo_div:
+                        suplente = alternativo_div.get_text(strip=True)
+                        # Parent text minus the child's: only the starter's name
+                        nombre = nombre_div.get_text(strip=True).replace(suplente, "").strip()
+                    else:
+                        nombre = nombre_div.get_text(strip=True)
+
+                # 2. Starter probability, 100% when there is no icono_porcentaje
+                porcentaje_div = p.find('div', class_='icono_porcentaje')
+                titularidad = porcentaje_div.get_text(strip=True) if porcentaje_div else "100%"
+
+                # 3. Booking warning
+                apercibido_div = p.find('div', class_='apercibido')
+                apercibido = apercibido_div.get_text(strip=True) if apercibido_div else None
+
+                players_data.append({
+                    'posicion': pos_name,
+                    'nombre': nombre,
+                    'suplente': suplente,
+                    'titularidad': titularidad,
+                    'apercibido': apercibido,
+                    # 4. Doubt
+                    'duda': p.find('div', class_='duda') is not None
+                })
+
+        return players_data
+
+    def parse_league_page(self, html: str) -> Tuple[int, Optional[Dict[int, str]]]:
+        """
+        Returns (jornada, {id_equipo: nombre}) from the home page. The teams map is None
+        if the shields row is missing.
+
+        Raises:
+            ValueError: If the jornada cannot be found.
+        """
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html, 'html.parser')
+        fuente_alternativa = soup.find('div', class_='fuente_alternativa')
+        if not fuente_alternativa:
+            raise ValueError("❌ No se encontró el elemento 'fuente_alternativa' para la jornada.")
+        span_jornada = fuente_alternativa.find('span', class_='success')
+        if not span_jornada:
+            raise ValueError("❌ No se encontró el span.success con la jornada.")
+        jornada = int(span_jornada.get_text(strip=True))
+
+        fila_escudos = soup.find('div', id='fila-escudos')
+        if not fila_escudos:
+            return jornada, None
+        teams_map = {}
+        for a in fila_escudos.find_all('a', class_='enlace-escudos'):
+            id_equipo = a.get('data-id-equipo')
+            img = a.find('img')
+            if id_equipo and img:
+                teams_map[int(id_equipo)] = img.get('alt', '').replace(TEAM_ALT_PREFIX, "").strip()
+        return jornada, teams_map
+
+
+def _has_class(name: str) -> str:
+    # XPath 1.0 equivalent of a class token match (what class_= does in BeautifulSoup)
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+class LxmlComuniateParser:
+    name = 'lxml'
+
+    def __init__(self):
+        from lxml import etree, html as lxml_html
+
+        self._fromstring = lxml_html.fromstring
+        self._containers = {
+            container_id: etree.XPath(f"(//div[@id='{container_id}'])[1]")
+            for container_id in POSITION_MAP
+        }
+        self._players = etree.XPath(f".//div[{_has_class('jugador_campo')}]")
+        self._nombre = etree.XPath(f"(.//div[{_has_class('nombre_jugador')}])[1]")
+        self._alternativo = etree.XPath(f"(.//div[{_has_class('alternativo')}])[1]")
+        self._porcentaje = etree.XPath(f"(.//div[{_has_class('icono_porcentaje')}])[1]")
+        self._apercibido = etree.XPath(f"(.//div[{_has_class('apercibido')}])[1]")
+        self._duda = etree.XPath(f"boolean(.//div[{_has_class('duda')}])")
+        self._jornada_box = etree.XPath(f"(//div[{_has_class('fuente_alternativa')}])[1]")
+        self._jornada_span = etree.XPath(f"(.//span[{_has_class('success')}])[1]")
+        self._escudos = etree.XPath("(//div[@id='fila-escudos'])[1]")
+        self._enlaces = etree.XPath(f".//a[{_has_class('enlace-escudos')}]")
+        self._img = etree.XPath("(.//img)[1]")
+        self._texts = etree.XPath(".//text()")
+
+    @staticmethod
+    def _first(query, node):
+        found = query(node)
+        return found[0] if found else None
+
+    def _text(self, node) -> str:
+        # Same as BeautifulSoup's get_text(strip=True): every text node stripped and joined
+        return "".join(t.strip() for t in self._texts(node) if t.strip())
+
+    def parse_lineup(self, html: str) -> List[dict]:
+        """Same output as SoupComuniateParser.parse_lineup."""
+        root = self._fromstring(html)
+        players_data = []
+
+        for container_id, pos_name in POSITION_MAP.items():
+            container = self._first(self._containers[container_id], root)
+            if container is None:
+                continue
+
+            for p in self._players(container):
+                nombre = ""
+                suplente = None
+                nombre_div = self._first(self._nombre, p)
+                if nombre_div is not None:
+                    alternativo_div = self._first(self._alternativo, nombre_div)
+                    if alternativo_div is not None:
+                        suplente = self._text(alternativo_div)
+                        nombre = self._text(nombre_div).replace(suplente, "").strip()
+                    else:
+                        nombre = self._text(nombre_div)
+
+                porcentaje_div = self._first(self._porcentaje, p)
+                apercibido_div = self._first(self._apercibido, p)
+
+                players_data.append({
+                    'posicion': pos_name,
+                    'nombre': nombre,
+                    'suplente': suplente,
+                    'titularidad': self._text(porcentaje_div) if porcentaje_div is not None else "100%",
+                    'apercibido': self._text(apercibido_div) if apercibido_div is not None else None,
+                    'duda': self._duda(p)
+                })
+
+        return players_data
+
+    def parse_league_page(self, html: str) -> Tuple[int, Optional[Dict[int, str]]]:
+        """Same output (and errors) as SoupComuniateParser.parse_league_page."""
+        root = self._fromstring(html)
+        fuente_alternativa = self._first(self._jornada_box, root)
+        if fuente_alternativa is None:
+            raise ValueError("❌ No se encontró el elemento 'fuente_alternativa' para la jornada.")
+        span_jornada = self._first(self._jornada_span, fuente_alternativa)
+        if span_jornada is None:
+            raise ValueError("❌ No se encontró el span.success con la jornada.")
+        jornada = int(self._text(span_jornada))
+
+        fila_escudos = self._first(self._escudos, root)
+        if fila_escudos is None:
+            return jornada, None
+        teams_map = {}
+        for a in self._enlaces(fila_escudos):
+            id_equipo = a.get('data-id-equipo')
+            img = self._first(self._img, a)
+            if id_equipo and img is not None:
+                teams_map[int(id_equipo)] = img.get('alt', '').replace(TEAM_ALT_PREFIX, "").strip()
+        return jornada, teams_map
+
+
+HTML_PARSERS = {
+    'lxml': LxmlComuniateParser,
+    'bs4': SoupComuniateParser,
+}
+
+
+def get_comuniate_parser(name: str = 'lxml'):
+    """
+    Returns a parser instance by name ('lxml' or 'bs4'). lxml is optional: without it the
+    BeautifulSoup parser is used.
+    """
+    if name not in HTML_PARSERS:
+        raise ValueError(f"Unknown HTML parser '{name}'. Options: {', '.join(HTML_PARSERS)}")
+    try:
+        return HTML_PARSERS[name]()
+    except ImportError:
+        print(f"⚠️ HTML parser '{name}' not available (missing dependency), using 'bs4'.")
+        return SoupComuniateParser()
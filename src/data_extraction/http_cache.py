@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+CACHE_DIR = "./data/cache/http"
+
+
+class HttpCache:
+    """
+    On-disk HTTP cache based on conditional GETs.
+
+    Each response is stored with its ETag / Last-Modified validators. The next request for the
+    same URL sends If-None-Match / If-Modified-Since and, on a 304, the stored body is served
+    as a regular 200 `requests.Response`, so callers don't need to know about the cache.
+
+    A per-source TTL (seconds) skips the request entirely while the stored copy is fresh.
+    Hit/miss and bytes-saved counters are kept per source in `stats`.
+    """
+    def __init__(self, cache_dir: str = CACHE_DIR, ttl: dict = None, default_ttl: float = 0):
+        self.cache_dir = cache_dir
+        self.ttl = ttl or {}
+        self.default_ttl = default_ttl
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def _key(self, url: str, params: dict = None) -> str:
+        if params:
+            url = f"{url}?{urlencode(sorted(params.items()))}"
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def _paths(self, key: str):
+        base = os.path.join(self.cache_dir, key)
+        return base + ".json", base + ".body"
+
+    def _load(self, key: str):
+        meta_path, body_path = self._paths(key)
+        if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+            return None, None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+            return meta, body
+        except Exception as e:
+            print(f"⚠️ Warning: Corrupted cache entry {key}: {e}")
+            return None, None
+
+    def _store(self, key: str, response: requests.Response):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        meta_path, body_path = self._paths(key)
+        meta = {
+            'url': response.url,
+            'stored_at': time.time(),
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'encoding': response.encoding,
+            'headers': dict(response.headers)
+        }
+        # Body first: a meta file always points to a complete body
+        self._atomic_write(body_path, response.content)
+        self._atomic_write(meta_path, json.dumps(meta).encode('utf-8'))
+
+    @staticmethod
+    def _atomic_write(path: str, content: bytes):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def _count(self, source: str, event: str, saved_bytes: int = 0):
+        with self._lock:
+            source_stats = self.stats.setdefault(source, {'hits': 0, 'revalidated': 0, 'misses': 0, 'bytes_saved': 0})
+            source_stats[event] += 1
+            source_stats['bytes_saved'] += saved_bytes
+
+    @staticmethod
+    def _from_cache(url: str, meta: dict, body: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response._content = body
+        response.headers = CaseInsensitiveDict(meta.get('headers', {}))
+        response.encoding = meta.get('encoding')
+        response.url = meta.get('url') or url
+        return response
+
+    def get(self, session, url: str, source: str, headers: dict = None, params: dict = None, **kwargs) -> requests.Response:
+        """
+        Performs a cached GET with `session`.
+
+        Args:
+            source (str): Name used for the TTL override and the stats (e.g. 'laliga', 'news').
+
+        Returns:
+            requests.Response: Either the live response or the stored body as a 200 response.
+        """
+        key = self._key(url, params)
+        meta, body = self._load(key)
+        ttl = self.ttl.get(source, self.default_ttl)
+
+        if meta is not None and ttl and time.time() - meta['stored_at'] < ttl:
+            self._count(source, 'hits', len(body))
+            return self._from_cache(url, meta, body)
+
+        request_headers = dict(headers or {})
+        if meta is not None:
+            if meta.get('etag'):
+                request_headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                request_headers['If-Modified-Since'] = meta['last_modified']
+
+        response = session.get(url, headers=request_headers, params=params, **kwargs)
+
+        if response.status_code == 304 and meta is not None:
+            self._count(source, 'revalidated', len(body))
+            meta['stored_at'] = time.time()
+            self._atomic_write(self._paths(key)[0], json.dumps(meta).encode('utf-8'))
+            return self._from_cache(url, meta, body)
+
+        self._count(source, 'misses')
+        if response.status_code == 200:
+            self._store(key, response)
+        return response
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {}
+
+    def print_stats(self, file=None):
+        """Prints hits (fresh by TTL), revalidations (304), misses and bytes saved per source."""
+        if not self.stats:
+            return
+        print("\n🗄️ HTTP cache:", file=file)
+        for source, s in sorted(self.stats.items()):
+            print(f"   • {source:<10} hits={s['hits']} 304={s['revalidated']} misses={s['misses']} "
+                  f"saved={s['bytes_saved'] / 1024:.1f} KB", file=file)
@@ -0,0 +1,281 @@
+"""
+Shared HTTP client of the extractors.
+
+HttpClient is a `requests.Session` (so cookies, default headers, response hooks and HttpCache keep
+working unchanged) whose requests all get:
+
+- Connect/read timeouts: a hung socket fails the request instead of stalling the extraction DAG.
+- Retries of network errors, 429 and 5xx with full-jitter exponential backoff, honouring the
+  Retry-After header (seconds or HTTP date).
+- A circuit breaker per host: after `failure_threshold` consecutive failures the host is skipped
+  for `reset_timeout` seconds (CircuitOpenError) instead of piling up timeouts.
+- Metrics per endpoint (method + host + path, with numeric ids as '{id}'): latency histogram,
+  bytes received, status codes, retries and errors. `HTTP_METRICS` is shared by every client and
+  dumped by the pipeline after each run.
+- Record/replay of the traffic when a cassette is active (see cassette.py).
+
+Callers keep handling the final response themselves: after the retries the last response is
+returned as is, and only network errors are raised.
+"""
+
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from src.config import GeneralSettings
+from src.data_extraction.cassette import CassetteAdapter, CassetteMiss, active_cassette
+from src.data_extraction.storage import rooted
+from src.data_extraction.throttle import pacing_enabled
+
+# Upper bounds (ms) of the latency histogram buckets; the last one catches everything slower
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, float('inf'))
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+METRICS_DIR = './data/cache/http_metrics'
+_ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+def endpoint_key(method: str, url: str) -> str:
+    """'GET https://biwenger.as.com/api/v2/user/123?x=1' -> 'GET biwenger.as.com/api/v2/user/{id}'"""
+    parts = urlsplit(url)
+    return f"{method.upper()} {parts.netloc}{_ID_SEGMENT.sub('/{id}', parts.path)}"
+
+
+def retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """Seconds requested by the Retry-After header (delta-seconds or HTTP date), or None."""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker of one host.
+    closed -> (failure_threshold failures) -> open -> (reset_timeout) -> half-open: one trial
+    request closes it again if it succeeds or reopens it if it fails.
+    """
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        return 'half-open' if time.monotonic() - self.opened_at >= self.reset_timeout else 'open'
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class HttpMetrics:
+    """Thread-safe per-endpoint request metrics."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints = {}
+
+    def _endpoint(self, key: str) -> dict:
+        return self.endpoints.setdefault(key, {
+            'requests': 0, 'errors': 0, 'retries': 0, 'bytes': 0,
+            'latency_sum_ms': 0.0, 'latency_max_ms': 0.0,
+            'histogram': [0] * len(LATENCY_BUCKETS_MS), 'status': {}
+        })
+
+    def record(self, key: str, latency: float, status: int = None, size: int = 0, retry: bool = False):
+        """Records one attempt (`status` None = network error)."""
+        latency_ms = latency * 1000
+        bucket = next(i for i, bound in enumerate(LATENCY_BUCKETS_MS) if latency_ms <= bound)
+        with self._lock:
+            e = self._endpoint(key)
+            e['requests'] += 1
+            e['retries'] += int(retry)
+            e['bytes'] += size
+            e['latency_sum_ms'] += latency_ms
+            e['latency_max_ms'] = max(e['latency_max_ms'], latency_ms)
+            e['histogram'][bucket] += 1
+            if status is None:
+                e['errors'] += 1
+            else:
+                e['status'][str(status)] = e['status'].get(str(status), 0) + 1
+
+    @staticmethod
+    def percentile(e: dict, q: float) -> float:
+        """Upper bound (ms) of the histogram bucket holding the q-quantile."""
+        target = q * e['requests']
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, e['histogram']):
+            seen += count
+            if count and seen >= target:
+                return min(bound, e['latency_max_ms'])
+        return e['latency_max_ms']
+
+    def reset(self):
+        with self._lock:
+            self.endpoints = {}
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return json.loads(json.dumps(self.endpoints))
+
+    def dump(self, path: str) -> str:
+        """Writes the metrics (plus the bucket bounds) as JSON and returns the path."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        content = {
+            'latency_buckets_ms': [str(b) if b == float('inf') else b for b in LATENCY_BUCKETS_MS],
+            'endpoints': self.snapshot()
+        }
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(content, f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+    def print_summary(self, file=None):
+        endpoints = self.snapshot()
+        if not endpoints:
+            return
+        print("\n📡 HTTP requests:", file=file)
+        for key, e in sorted(endpoints.items(), key=lambda item: -item[1]['latency_sum_ms']):
+            status = ' '.join(f"{code}×{n}" for code, n in sorted(e['status'].items()))
+            errors = f" errors={e['errors']}" if e['errors'] else ""
+            retries = f" retries={e['retries']}" if e['retries'] else ""
+            print(f"   • {key:<60} n={e['requests']:<4} p50≤{self.percentile(e, 0.5):.0f}ms "
+                  f"p95≤{self.percentile(e, 0.95):.0f}ms max={e['latency_max_ms']:.0f}ms "
+                  f"{e['bytes'] / 1024:.1f} KB [{status}]{retries}{errors}", file=file)
+
+
+HTTP_METRICS = HttpMetrics()
+_BREAKERS = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def circuit_breaker(host: str) -> CircuitBreaker:
+    """Breaker of `host`, shared by every HttpClient."""
+    with _BREAKERS_LOCK:
+        if host not in _BREAKERS:
+            _BREAKERS[host] = CircuitBreaker()
+        return _BREAKERS[host]
+
+
+class HttpClient(requests.Session):
+    """
+    Args:
+        timeout (tuple): Default (connect, read) timeout in seconds.
+        max_retries (int): Default retries of network errors, 429 and 5xx (0 disables them).
+        backoff (float): Base of the exponential backoff in seconds (attempt n waits up to backoff * 2**n).
+        max_backoff (float): Cap of any wait, Retry-After included.
+        metrics (HttpMetrics): Defaults to the shared HTTP_METRICS.
+
+    Per request, `retries=` overrides max_retries and `rate_limiter=` (TokenBucket) is acquired
+    before every attempt, retries included.
+    """
+    def __init__(self, timeout: tuple = None, max_retries: int = None, backoff: float = 1.0, max_backoff: float = 30,
+                 metrics: HttpMetrics = None):
+        super().__init__()
+        self.timeout = timeout or (GeneralSettings.HTTP_CONNECT_TIMEOUT, GeneralSettings.HTTP_READ_TIMEOUT)
+        self.max_retries = GeneralSettings.HTTP_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.metrics = metrics or HTTP_METRICS
+        cassette = active_cassette()
+        if cassette is not None:
+            adapter = CassetteAdapter(cassette)
+            self.mount('http://', adapter)
+            self.mount('https://', adapter)
+
+    def _wait(self, attempt: int, response: requests.Response = None) -> float:
+        retry_after = retry_after_seconds(response) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def request(self, method, url, *args, retries: int = None, rate_limiter=None, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        retries = self.max_retries if retries is None else retries
+        key = endpoint_key(method, url)
+        breaker = circuit_breaker(urlsplit(url).netloc)
+
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError(f"Circuit open for {urlsplit(url).netloc}, skipping {key}")
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+
+            start = time.perf_counter()
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except CassetteMiss:
+                raise
+            except requests.RequestException:
+                self.metrics.record(key, time.perf_counter() - start, retry=attempt > 0)
+                breaker.record_failure()
+                if attempt >= retries:
+                    raise
+                response = None
+            else:
+                size = len(response.content) if not kwargs.get('stream') else 0
+                self.metrics.record(key, time.perf_counter() - start, response.status_code, size, retry=attempt > 0)
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                    return response
+
+            if pacing_enabled():
+                time.sleep(self._wait(attempt, response))
+            attempt += 1
+
+
+def dump_run_metrics(run_id: str = None, metrics: HttpMetrics = HTTP_METRICS, root: str = None) -> str:
+    """
+    Writes the metrics of a run to <root>/<run_id>.json (UTC timestamp when no run id).
+    `root` defaults to METRICS_DIR under the current data root (see storage.set_data_root).
+    """
+    run_id = run_id or datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    return metrics.dump(os.path.join(root or rooted(METRICS_DIR), f'{run_id}.json'))
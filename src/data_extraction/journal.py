@@ -0,0 +1,151 @@
+"""
+Crash-safe journal of the extraction sources.
+
+Each source (laliga, user_league, comuniate, ...) is journaled as soon as it finishes:
+
+    ./data/cache/journal/
+        laliga/players.parquet, teams.parquet, ...     # tables of the source
+        laliga.done.json                               # completion marker
+        user_league/<league_id>/league_players.parquet
+        comuniate.partial.csv                          # progress of a source still running
+        comuniate.partial.meta.json                    # ...and when it started
+
+The marker is written last (temp file + rename), so a source only counts as finished if all its
+tables are on disk. It stores the fingerprint of the inputs the source depends on (score type,
+leagues, ...) and its completion time: a rerun after a failure reuses the sources whose marker
+matches and is younger than the source's max age, and extracts only the rest.
+
+The journal is cleared once a run completes.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Optional
+
+import pandas as pd
+
+from src.data_extraction.storage import DataStore
+
+JOURNAL_DIR = './data/cache/journal'
+
+
+def fingerprint(*inputs) -> str:
+    """Stable hash of the (JSON-serializable) inputs of a source."""
+    return hashlib.sha1(json.dumps(inputs, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class ExtractionJournal:
+    """
+    Args:
+        root (str): Folder of the journal.
+        max_age (dict): Seconds a finished source stays reusable, per source.
+        default_max_age (float): Max age of the sources not in `max_age`.
+    """
+    def __init__(self, root: str = JOURNAL_DIR, max_age: dict = None, default_max_age: float = 6 * 3600):
+        self.root = root
+        self.max_age = max_age or {}
+        self.default_max_age = default_max_age
+
+    def _marker_path(self, source: str) -> str:
+        return os.path.join(self.root, f'{source}.done.json')
+
+    def _store(self, source: str, folder: str = None) -> DataStore:
+        root = os.path.join(self.root, source, folder) if folder else os.path.join(self.root, source)
+        return DataStore(root, csv_export=False)
+
+    def partial_path(self, source: str, extension: str = '.csv') -> str:
+        """
+        Path where a source can keep its progress while running (e.g. Comuniate's incremental CSV).
+        The partial's start time is kept next to it: one older than the source's max age (or
+        without a start time) is discarded, so only a recent interrupted run is resumed.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, f'{source}.partial{extension}')
+        meta_path = os.path.join(self.root, f'{source}.partial.meta.json')
+
+        started_at = None
+        if os.path.exists(meta_path):
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    started_at = json.load(f).get('started_at')
+            except Exception as e:
+                print(f"⚠️ Warning: Corrupted partial metadata for {source}: {e}")
+
+        max_age = self.max_age.get(source, self.default_max_age)
+        if os.path.exists(path) and (started_at is None or time.time() - started_at > max_age):
+            print(f"🗑️ Discarding the stale partial progress of {source}.")
+            os.remove(path)
+            started_at = None
+        if started_at is None or not os.path.exists(path):
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump({'source': source, 'started_at': time.time()}, f)
+        return path
+
+    def load(self, source: str, inputs_fingerprint: str) -> Optional[dict]:
+        """
+        Returns the tables of a finished source, or None if it never finished, its inputs
+        changed or it is older than its max age.
+        """
+        marker_path = self._marker_path(source)
+        if not os.path.exists(marker_path):
+            return None
+        try:
+            with open(marker_path, 'r', encoding='utf-8') as f:
+                marker = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Warning: Corrupted journal marker for {source}: {e}")
+            return None
+
+        max_age = self.max_age.get(source, self.default_max_age)
+        if marker.get('fingerprint') != inputs_fingerprint or time.time() - marker.get('completed_at', 0) > max_age:
+            return None
+
+        try:
+            tables = {}
+            for name in marker['tables']:
+                folder, _, table = name.rpartition('/')
+                df = self._store(source, folder).load(table)
+                if folder:
+                    tables.setdefault(folder, {})[table] = df
+                else:
+                    tables[table] = df
+            return tables
+        except FileNotFoundError as e:
+            print(f"⚠️ Warning: Journal of {source} is incomplete ({e}), extracting it again.")
+            return None
+
+    def save(self, source: str, inputs_fingerprint: str, tables: dict):
+        """
+        Saves the tables of a finished source and then its completion marker.
+        `tables` maps names to DataFrames, or to dicts of DataFrames (one folder per key).
+        """
+        marker_path = self._marker_path(source)
+        if os.path.exists(marker_path):
+            os.remove(marker_path)
+
+        names = []
+        for name, value in tables.items():
+            if isinstance(value, pd.DataFrame):
+                self._store(source).save(name, value)
+                names.append(name)
+            else:
+                for table, df in value.items():
+                    self._store(source, str(name)).save(table, df)
+                    names.append(f'{name}/{table}')
+
+        marker = {'source': source, 'fingerprint': inputs_fingerprint, 'completed_at': time.time(), 'tables': names}
+        tmp_path = marker_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(marker, f)
+        os.replace(tmp_path, marker_path)
+
+        for filename in os.listdir(self.root):
+            if filename.startswith(f'{source}.partial'):
+                os.remove(os.path.join(self.root, filename))
+
+    def clear(self):
+        """Removes the whole journal (called once a run has been saved)."""
+        shutil.rmtree(self.root, ignore_errors=True)
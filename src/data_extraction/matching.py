@@ -0,0 +1,257 @@
+"""
+Fuzzy name matching between sources (Comuniate, odds) and the Biwenger tables.
+
+Every query is scored against its candidates in one batched similarity matrix
+(`rapidfuzz.process.cdist`, native code, optionally multi-threaded) instead of one
+`thefuzz.process.extractOne` Python loop per name. The scorer is the one extractOne uses by
+default (WRatio), on names with the accents stripped on both sides, lowercased and reduced to
+alphanumeric text (`process_name`). Ties resolve to the first candidate.
+
+Queries with initials ('Ó. Muñoz') are also scored in initials form against the candidates
+written the same way ('o munoz' vs 'o munoz' for 'Óscar Muñoz', 'a munoz' for 'Adrián Muñoz'),
+keeping the best of both scores: plain WRatio prefers 'Adrián Muñoz' (85.5 vs 79.2).
+
+Player names are matched within their team only: queries are grouped by team once and each group
+is scored against that team's roster (a ~25 x ~25 matrix per team rather than every player of the
+competition).
+
+AliasIndex persists the resolutions, so a run only fuzzy matches the names it hasn't seen before.
+"""
+
+import hashlib
+import threading
+import unicodedata
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process, utils
+
+from src.data_extraction.storage import DataStore
+
+SCORER = fuzz.WRatio
+NO_MATCH = -1
+
+
+def process_name(name) -> str:
+    """'Ó. Muñoz' -> 'o munoz': accents stripped, lowercased, alphanumeric words. Non-strings -> ''."""
+    if not isinstance(name, str):
+        return ''
+    decomposed = unicodedata.normalize('NFKD', name)
+    return utils.default_process(''.join(c for c in decomposed if not unicodedata.combining(c)))
+
+
+def initials_form(processed: str) -> str:
+    """'oscar munoz' -> 'o munoz': every word but the last reduced to its initial."""
+    words = processed.split()
+    return ' '.join([w[0] for w in words[:-1]] + words[-1:])
+
+
+def has_initials(processed: str) -> bool:
+    return any(len(w) == 1 for w in processed.split())
+
+
+def best_matches(queries, choices, score_cutoff: float = 0, workers: int = 1):
+    """
+    Best choice of each query.
+
+    Args:
+        queries (list): Names to match (non-strings never match).
+        choices (list): Candidate names.
+        score_cutoff (float): Minimum score (0-100) of a match.
+        workers (int): Threads of the similarity matrix (-1: all cores).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Position in `choices` of the best match of each query
+        (NO_MATCH when none reaches the cutoff) and its score.
+    """
+    queries = [process_name(q) for q in queries]
+    choices = [process_name(c) for c in choices]
+    if not queries or not choices:
+        return np.full(len(queries), NO_MATCH), np.zeros(len(queries))
+
+    scores = process.cdist(queries, choices, scorer=SCORER, workers=workers)
+    # 'o munoz' only tells 'Óscar Muñoz' from 'Adrián Muñoz' when both are in initials form
+    abbreviated = [i for i, q in enumerate(queries) if has_initials(q)]
+    if abbreviated:
+        initials = process.cdist([initials_form(queries[i]) for i in abbreviated], [initials_form(c) for c in choices],
+                                 scorer=SCORER, workers=workers)
+        scores[abbreviated] = np.maximum(scores[abbreviated], initials)
+    best = scores.argmax(axis=1)
+    best_scores = scores[np.arange(len(queries)), best].astype(float)
+    best = np.where((best_scores > 0) & (best_scores >= score_cutoff), best, NO_MATCH)
+    return best, np.where(best == NO_MATCH, 0.0, best_scores)
+
+
+def match_names(queries, choices, score_cutoff: float = 0) -> dict:
+    """{query: best choice} of the distinct `queries` (None when no choice reaches the cutoff)."""
+    queries = list(pd.unique(pd.Series(queries, dtype=object)))
+    choices = list(choices)
+    best, _ = best_matches(queries, choices, score_cutoff)
+    return {q: (choices[i] if i != NO_MATCH else None) for q, i in zip(queries, best)}
+
+
+def _match_blocked(names: pd.Series, blocks: pd.Series, candidates: pd.DataFrame, score_cutoff: float = 0,
+                   workers: int = 1) -> pd.DataFrame:
+    """
+    Best match of each name among the candidates of its block (candidates [ID, NAME, BLOCK]).
+    Returns [ID, NAME, MATCH_SCORE] aligned with `names`.
+    """
+    ids = np.full(len(names), np.nan)
+    matched = np.full(len(names), None, dtype=object)
+    match_scores = np.zeros(len(names))
+
+    positions = pd.Series(np.arange(len(names)), index=pd.Index(blocks.to_numpy(), name='BLOCK'))
+    block_candidates = {block: group for block, group in candidates.groupby('BLOCK', sort=False)}
+    for block, rows in positions.groupby(level=0, sort=False):
+        block_roster = block_candidates.get(block)
+        if block_roster is None:
+            continue
+        rows = rows.to_numpy()
+        best, scores = best_matches(names.iloc[rows].tolist(), block_roster['NAME'].tolist(), score_cutoff, workers)
+        found = best != NO_MATCH
+        ids[rows[found]] = block_roster['ID'].to_numpy()[best[found]]
+        matched[rows[found]] = block_roster['NAME'].to_numpy()[best[found]]
+        match_scores[rows] = scores
+
+    return pd.DataFrame({'ID': ids, 'NAME': matched, 'MATCH_SCORE': match_scores}, index=names.index)
+
+
+def match_players(names: pd.Series, teams: pd.Series, roster: pd.DataFrame, score_cutoff: float = 0,
+                  workers: int = 1) -> pd.DataFrame:
+    """
+    Matches player names against the roster of their team.
+
+    Args:
+        names (pd.Series): Player names to match.
+        teams (pd.Series): Team of each name, as in roster['TEAM_NAME'] (NaN never matches).
+        roster (pd.DataFrame): Candidates [PLAYER_ID, PLAYER_NAME, TEAM_NAME].
+
+    Returns:
+        pd.DataFrame: Aligned with `names`: [PLAYER_ID, PLAYER_NAME, MATCH_SCORE] of the best
+        match (NaN / None / 0 when there is none).
+    """
+    candidates = roster.rename(columns={'PLAYER_ID': 'ID', 'PLAYER_NAME': 'NAME', 'TEAM_NAME': 'BLOCK'})
+    matches = _match_blocked(names, teams, candidates, score_cutoff, workers)
+    return matches.rename(columns={'ID': 'PLAYER_ID', 'NAME': 'PLAYER_NAME'})
+
+
+def candidates_fingerprint(names) -> str:
+    return hashlib.sha1('\x1f'.join(sorted(map(str, names))).encode('utf-8')).hexdigest()[:16]
+
+
+class AliasIndex:
+    """
+    Persistent (source, external name, team) -> Biwenger ID resolutions, in the 'name_aliases' table.
+
+    `resolve` only runs the fuzzy matching for names not resolved before. A cached resolution is
+    reused while its target is still a candidate of the same team (a transferred player is matched
+    again); a name that matched nothing is retried only when the team's candidates change.
+    Matches scoring below `review_score` are flagged NEEDS_REVIEW. A wrong match can be fixed by
+    editing TARGET_ID / TARGET_NAME in the table: resolutions are never re-scored.
+
+    Args:
+        root (str): Folder of the table (saved with the configured storage backend).
+                    None follows the current data root (see storage.set_data_root).
+        review_score (float): Score (0-100) below which a match is flagged for review.
+    """
+    TABLE = 'name_aliases'
+    COLUMNS = ['SOURCE', 'EXTERNAL_NAME', 'TEAM', 'TARGET_ID', 'TARGET_NAME', 'MATCH_SCORE', 'NEEDS_REVIEW',
+               'CANDIDATES', 'FIRST_SEEN', 'LAST_SEEN']
+    KEY = ['SOURCE', 'EXTERNAL_NAME', 'TEAM']
+
+    def __init__(self, root: str = None, review_score: float = 85):
+        self.store = DataStore(root, csv_export=False)
+        self.review_score = review_score
+        self._index = None
+        self._lock = threading.Lock()
+
+    @property
+    def index(self) -> pd.DataFrame:
+        if self._index is None:
+            try:
+                index = self.store.load(self.TABLE, dtype={'EXTERNAL_NAME': str, 'TEAM': str, 'CANDIDATES': str},
+                                        parse_dates=['FIRST_SEEN', 'LAST_SEEN'])
+                # CSV reads the empty team of team-level names as NaN and loses the timezone
+                index['TEAM'] = index['TEAM'].fillna('')
+                for col in ('FIRST_SEEN', 'LAST_SEEN'):
+                    if index[col].dt.tz is None:
+                        index[col] = index[col].dt.tz_localize('UTC')
+                self._index = index
+            except FileNotFoundError:
+                self._index = pd.DataFrame(columns=self.COLUMNS)
+        return self._index
+
+    def resolve(self, source: str, names: pd.Series, candidates: pd.DataFrame, id_col: str, name_col: str,
+                teams: pd.Series = None, team_col: str = None, score_cutoff: float = 0) -> pd.DataFrame:
+        """
+        Resolves external names to candidates' IDs, fuzzy matching only the unresolved ones.
+
+        Args:
+            source (str): Namespace of the names (e.g. 'comuniate', 'odds_team').
+            names (pd.Series): External names.
+            candidates (pd.DataFrame): Biwenger rows with `id_col`, `name_col` (and `team_col`).
+            teams (pd.Series): Team of each name as in candidates[team_col]: names are only matched
+                               within their team. None matches against every candidate.
+            score_cutoff (float): Minimum score of a match.
+
+        Returns:
+            pd.DataFrame: Aligned with `names`: [ID, NAME, MATCH_SCORE] (NaN / None / 0 if unresolved).
+        """
+        keys = pd.DataFrame({'EXTERNAL_NAME': names.to_numpy(),
+                             'TEAM': teams.to_numpy() if teams is not None else ''}, index=names.index)
+        roster = pd.DataFrame({
+            'ID': candidates[id_col].astype(float).to_numpy(),
+            'NAME': candidates[name_col].to_numpy(),
+            'BLOCK': candidates[team_col].to_numpy() if team_col else ''
+        }).dropna(subset=['NAME', 'BLOCK'])
+        fingerprints = roster.groupby('BLOCK')['NAME'].agg(candidates_fingerprint).rename('CURRENT_CANDIDATES')
+
+        distinct = keys[keys['EXTERNAL_NAME'].map(lambda n: isinstance(n, str)) & keys['TEAM'].notna()].drop_duplicates()
+        with self._lock:
+            cached = self.index[self.index['SOURCE'] == source].astype({'TARGET_ID': float})
+        lookup = (distinct.merge(cached, on=['EXTERNAL_NAME', 'TEAM'], how='left')
+                  .merge(fingerprints, left_on='TEAM', right_index=True, how='left')
+                  .merge(roster.rename(columns={'ID': 'TARGET_ID', 'NAME': 'CURRENT_NAME', 'BLOCK': 'TEAM'}),
+                         on=['TARGET_ID', 'TEAM'], how='left'))
+        hit = lookup['CURRENT_NAME'].notna() | (lookup['SOURCE'].notna() & lookup['TARGET_ID'].isna()
+                                                  & (lookup['CANDIDATES'].fillna('') == lookup['CURRENT_CANDIDATES'].fillna('')))
+
+        now = pd.Timestamp(datetime.now(timezone.utc))
+        hits = lookup[hit].assign(TARGET_NAME=lambda df: df['CURRENT_NAME'], LAST_SEEN=now)
+        misses = lookup[~hit]
+        matches = _match_blocked(misses['EXTERNAL_NAME'], misses['TEAM'], roster, score_cutoff)
+        new = misses[['EXTERNAL_NAME', 'TEAM', 'CURRENT_CANDIDATES']].assign(
+            SOURCE=source,
+            TARGET_ID=matches['ID'].to_numpy(),
+            TARGET_NAME=matches['NAME'].to_numpy(),
+            MATCH_SCORE=matches['MATCH_SCORE'].to_numpy(),
+            NEEDS_REVIEW=matches['ID'].notna().to_numpy() & (matches['MATCH_SCORE'].to_numpy() < self.review_score),
+            CANDIDATES=misses['CURRENT_CANDIDATES'],
+            FIRST_SEEN=pd.to_datetime(misses['FIRST_SEEN'], utc=True).fillna(now),
+            LAST_SEEN=now
+        )
+        resolved = pd.concat([df for df in (hits, new) if not df.empty] or [new], ignore_index=True)[self.COLUMNS]
+        with self._lock:
+            others = self.index[~self.index.set_index(self.KEY).index.isin(resolved.set_index(self.KEY).index)]
+            self._index = pd.concat([df for df in (others, resolved) if not df.empty] or [resolved], ignore_index=True)
+
+        n_review = int(new['NEEDS_REVIEW'].sum())
+        review = f", {n_review} to review in '{self.TABLE}'" if n_review else ""
+        print(f"   🔗 {source}: {len(hits)} names resolved from the alias cache, {len(new)} fuzzy matched{review}")
+
+        aligned = keys.merge(resolved[['EXTERNAL_NAME', 'TEAM', 'TARGET_ID', 'TARGET_NAME', 'MATCH_SCORE']],
+                             on=['EXTERNAL_NAME', 'TEAM'], how='left')
+        return pd.DataFrame({
+            'ID': aligned['TARGET_ID'].to_numpy(dtype=float),
+            'NAME': aligned['TARGET_NAME'].to_numpy(),
+            'MATCH_SCORE': aligned['MATCH_SCORE'].fillna(0.0).to_numpy(dtype=float)
+        }, index=names.index)
+
+    def needs_review(self) -> pd.DataFrame:
+        """Resolutions flagged as low confidence, lowest score first."""
+        return self.index[self.index['NEEDS_REVIEW'].astype(bool)].sort_values('MATCH_SCORE')
+
+    def save(self):
+        with self._lock:
+            self.store.save(self.TABLE, self._index if self._index is not None else self.index)
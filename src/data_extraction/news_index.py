@@ -0,0 +1,139 @@
+"""
+Persistent index of the Jornada Perfecta news.
+
+The RSS feed always returns its latest N entries, most of them already seen in previous runs.
+NewsIndex keeps every entry seen (keyed by its guid, or its link when the feed has no guid) in
+the 'news_index' table, so each run only cleans and reports the entries that are new:
+
+- `ingest(df_raw)`: adds the new entries of a feed download and returns them cleaned
+  (the "since last run" view the agents receive).
+- `save()`: persists the index. The pipeline calls it once the run's tables are saved, so the
+  entries of a failed run are reported again by the next one.
+- `window(days)`: the indexed entries published in the last `days` days.
+
+The index itself is a rolling window: entries older than `window_days`, or beyond the newest
+`max_items`, are dropped when it is saved, so it stays bounded however long the pipeline runs.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from src.data_extraction.storage import DataStore
+
+NEWS_TIMEZONE = 'Europe/Madrid'
+# RFC 822 dates of the RSS feed (e.g. 'Tue, 14 Oct 2026 09:30:00 +0000')
+RSS_DATE_FORMAT = '%a, %d %b %Y %H:%M:%S %z'
+SUMMARY_MAX_LENGTH = 300
+# Columns of the table the agents receive (same as the former full-feed table)
+NEWS_COLUMNS = ['fecha', 'titulo', 'resumen', 'tags']
+
+
+def _parse_published(published: pd.Series) -> pd.Series:
+    """Vectorized RSS date parsing to UTC; entries with another date format fall back to pandas' parser."""
+    parsed = pd.to_datetime(published, format=RSS_DATE_FORMAT, errors='coerce', utc=True)
+    missing = parsed.isna() & published.notna()
+    if missing.any():
+        parsed[missing] = pd.to_datetime(published[missing], format='mixed', errors='coerce', utc=True)
+    return parsed
+
+
+def clean_news(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cleans raw feed entries for LLM consumption (token savings): short local date, summary without
+    HTML and extra whitespace (truncated to SUMMARY_MAX_LENGTH) and tags joined into a string.
+    Keeps 'id' and the UTC 'published' datetime for the index.
+    """
+    published = _parse_published(df['published'])
+    fecha = published.dt.tz_convert(NEWS_TIMEZONE).dt.strftime('%Y-%m-%d %H:%M')
+
+    summary = (df['summary'].fillna('')
+               .str.replace(r'<[^>]+>', '', regex=True)
+               .str.split().str.join(' '))
+    too_long = summary.str.len() > SUMMARY_MAX_LENGTH
+    summary = summary.where(~too_long, summary.str[:SUMMARY_MAX_LENGTH - 3] + '...')
+
+    tags = df['tags'].map(lambda t: ', '.join(t) if isinstance(t, list) else '')
+
+    return pd.DataFrame({
+        'id': df['id'].fillna(df['link']),
+        'published': published,
+        # Unparseable dates are kept as published by the feed
+        'fecha': fecha.fillna(df['published']),
+        'titulo': df['title'],
+        'resumen': summary.where(df['summary'].notna(), None),
+        'tags': tags
+    })
+
+
+class NewsIndex:
+    """
+    Args:
+        root (str): Folder of the 'news_index' table (saved with the configured storage backend).
+                    None follows the current data root (see storage.set_data_root).
+        window_days (int): Days an entry stays in the index after being published.
+        max_items (int): Maximum entries kept (the newest ones).
+    """
+    TABLE = 'news_index'
+
+    def __init__(self, root: str = None, window_days: int = 14, max_items: int = 500):
+        self.store = DataStore(root, csv_export=False)
+        self.window_days = window_days
+        self.max_items = max_items
+        self._index = None
+
+    @property
+    def index(self) -> pd.DataFrame:
+        if self._index is None:
+            try:
+                self._index = self.store.load(self.TABLE, parse_dates=['published', 'first_seen'])
+                # CSV loses the timezone and reads empty tags as NaN
+                for col in ('published', 'first_seen'):
+                    if self._index[col].dt.tz is None:
+                        self._index[col] = self._index[col].dt.tz_localize('UTC')
+                self._index['tags'] = self._index['tags'].fillna('')
+            except FileNotFoundError:
+                self._index = pd.DataFrame(columns=['id', 'first_seen'] + ['published'] + NEWS_COLUMNS)
+        return self._index
+
+    def ingest(self, df_raw: pd.DataFrame) -> pd.DataFrame:
+        """
+        Adds the entries of `df_raw` (as returned by JornadaPerfectaData.fetch_news) not indexed yet.
+        The index is only updated in memory until `save()`.
+
+        Returns:
+            pd.DataFrame: The new entries, cleaned, newest first [fecha, titulo, resumen, tags].
+        """
+        if df_raw.empty:
+            return pd.DataFrame(columns=NEWS_COLUMNS)
+
+        keys = df_raw['id'].fillna(df_raw['link'])
+        df_new = df_raw[~keys.isin(self.index['id']) & ~keys.duplicated()]
+
+        now = pd.Timestamp(datetime.now(timezone.utc))
+        fresh = clean_news(df_new).sort_values('published', ascending=False, na_position='last')
+        fresh.insert(1, 'first_seen', now)
+
+        index = pd.concat([fresh, self.index], ignore_index=True) if not self.index.empty else fresh
+        self._index = self._trim(index, now)
+        # Entries already out of the window are not news
+        fresh = fresh[fresh['id'].isin(self._index['id'])]
+
+        print(f"📰 {len(fresh)} new of {len(df_raw)} news entries ({len(self._index)} indexed).")
+        return fresh[NEWS_COLUMNS].reset_index(drop=True)
+
+    def save(self):
+        self.store.save(self.TABLE, self.index)
+
+    def _trim(self, index: pd.DataFrame, now: pd.Timestamp) -> pd.DataFrame:
+        # Entries without a parseable date age from when they were first seen
+        age_from = index['published'].fillna(index['first_seen'])
+        index = index[age_from >= now - timedelta(days=self.window_days)]
+        return index.sort_values('first_seen', ascending=False, kind='stable').head(self.max_items).reset_index(drop=True)
+
+    def window(self, days: int = None) -> pd.DataFrame:
+        """Indexed entries published in the last `days` days (defaults to the whole window), newest first."""
+        since = pd.Timestamp(datetime.now(timezone.utc)) - timedelta(days=days or self.window_days)
+        age_from = self.index['published'].fillna(self.index['first_seen'])
+        df = self.index[age_from >= since].sort_values('published', ascending=False, na_position='last')
+        return df[NEWS_COLUMNS].reset_index(drop=True)
@@ -1,279 +1,576 @@
 import pandas as pd
 from dotenv import load_dotenv
-import os
 import io
+import os
+import shutil
+import sys
+import time
 from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Tuple
 
 # Imports for data extraction
-from src.data_extraction.auth import BiwengerAuth
+from src.data_extraction.auth import TOKEN_STORE_FILE, BiwengerAuth
 from src.data_extraction.biwenger_data import LaLigaGeneralData, UserLeagueData
 from src.data_extraction.external_data import ComuniateData, JornadaPerfectaData, EuroClubIndexData
+from src.data_extraction.cassette import active_cassette, use_cassette
+from src.data_extraction.fitness import fitness_columns
+from src.data_extraction.http_cache import CACHE_DIR, HttpCache
+from src.data_extraction.http_client import HTTP_METRICS, dump_run_metrics
+from src.data_extraction.journal import JOURNAL_DIR, ExtractionJournal, fingerprint
+from src.data_extraction.news_index import NewsIndex
+from src.data_extraction.schemas import SCHEMAS
+from src.data_extraction.snapshots import SNAPSHOT_DIR, SnapshotStore
+from src.data_extraction.storage import DATA_DIR, DataStore, data_root, rooted, set_data_root
 
 # Config
-from src.config import Credentials
+from src.config import Credentials, GeneralSettings
 
-def print_step(step_number, message, status="running"):
+def print_step(step_number, message, status="running", file=None):
     """
     Helper to print structured step messages.
     Status can be 'running', 'done', 'error'.
     """
     if status == "running":
-        print(f"\n🚀 STEP {step_number}: {message}...")
+        print(f"\n🚀 STEP {step_number}: {message}...", file=file)
     elif status == "done":
-        print(f"✅ STEP {step_number}: Done.")
+        print(f"✅ STEP {step_number}: Done.", file=file)
     elif status == "error":
-        print(f"❌ STEP {step_number}: Error!")
+        print(f"❌ STEP {step_number}: Error!", file=file)
+
+@dataclass
+class PipelineStep:
+    """
+    A node of the extraction DAG.
+    `func` receives a dict with the results of the already finished steps (keyed by step name).
+    """
+    name: str
+    number: float
+    message: str
+    func: Callable[[dict], object]
+    depends_on: Tuple[str, ...] = ()
+
+@dataclass
+class StepTiming:
+    name: str
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+def _run_timed(step: PipelineStep, results: dict):
+    start = time.perf_counter()
+    result = step.func(results)
+    return result, start, time.perf_counter()
+
+def run_step_dag(steps: List[PipelineStep], max_workers: int = 4, file=None) -> Tuple[dict, Dict[str, StepTiming]]:
+    """
+    Runs the steps respecting their dependencies. Every step whose dependencies are finished
+    is submitted to a thread pool, so independent steps (e.g. external sources) overlap.
+    The first failing step cancels the pending ones and its exception is re-raised.
+
+    Returns:
+        tuple: (results by step name, StepTiming by step name)
+    """
+    by_name = {step.name: step for step in steps}
+    for step in steps:
+        for dep in step.depends_on:
+            if dep not in by_name:
+                raise ValueError(f"Step '{step.name}' depends on unknown step '{dep}'")
+
+    results = {}
+    timings = {}
+    pending = [step.name for step in steps]
+    running = {}
+    origin = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            ready = [name for name in pending if all(dep in results for dep in by_name[name].depends_on)]
+            for name in ready:
+                pending.remove(name)
+                step = by_name[name]
+                print_step(step.number, step.message, file=file)
+                running[executor.submit(_run_timed, step, dict(results))] = step
+
+            if not running:
+                raise ValueError(f"Dependency cycle between steps: {', '.join(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                step = running.pop(future)
+                try:
+                    result, start, end = future.result()
+                except Exception:
+                    print_step(step.number, step.message, status="error", file=file)
+                    for other in running:
+                        other.cancel()
+                    raise
+                results[step.name] = result
+                timings[step.name] = StepTiming(step.name, start - origin, end - origin)
+                print_step(step.number, step.message, status="done", file=file)
+
+    return results, timings
+
+def critical_path(steps: List[PipelineStep], timings: Dict[str, StepTiming]) -> List[str]:
+    """
+    Returns the chain of steps that determined the total wall time: starting from the step
+    that finished last, walks back through the dependency that finished latest.
+    """
+    if not timings:
+        return []
+    by_name = {step.name: step for step in steps}
+    current = max(timings.values(), key=lambda t: t.end).name
+    path = [current]
+    while by_name[current].depends_on:
+        current = max(by_name[current].depends_on, key=lambda dep: timings[dep].end)
+        path.append(current)
+    return path[::-1]
+
+def print_step_timings(steps: List[PipelineStep], timings: Dict[str, StepTiming], file=None):
+    """Prints the wall time of each step and the critical path of the run."""
+    print("\n⏱️ Step timings:", file=file)
+    for step in steps:
+        timing = timings.get(step.name)
+        if timing:
+            print(f"   • {step.name:<14} {timing.duration:7.2f}s  (start +{timing.start:.2f}s)", file=file)
+
+    path = critical_path(steps, timings)
+    total = max(t.end for t in timings.values()) if timings else 0.0
+    path_time = sum(timings[name].duration for name in path)
+    print(f"   🧭 Critical path: {' → '.join(path)} ({path_time:.2f}s of {total:.2f}s wall time)", file=file)
+
+# Conditional-GET cache for the Biwenger CDN and the third-party feeds.
+# Set a TTL (seconds) per source to skip the request while the stored copy is fresh, e.g. {'odds': 3600}.
+HTTP_CACHE = HttpCache(ttl={})
+SNAPSHOT_STORE = SnapshotStore(keep_last=GeneralSettings.SNAPSHOT_KEEP_LAST, keep_daily=GeneralSettings.SNAPSHOT_KEEP_DAILY)
+# Finished sources of an interrupted run, reused by the next one while younger than their max age
+# (seconds, per source, e.g. {'odds': 3600}).
+JOURNAL = ExtractionJournal(max_age={}, default_max_age=GeneralSettings.JOURNAL_MAX_AGE)
+# News already seen in previous runs; the 'news' table only gets the new ones
+NEWS_INDEX = NewsIndex(window_days=GeneralSettings.NEWS_WINDOW_DAYS, max_items=GeneralSettings.NEWS_MAX_ITEMS)
+# Bump when the tables a source returns change, so older journals are not reused
+JOURNAL_VERSION = 1
+
+def _use_scratch_data_root(root: str):
+    """
+    Cassette runs (record / replay) work on an empty scratch data root instead of ./data: the
+    tables, snapshots, journal, news index, name aliases and the HTTP / squad / lineup caches
+    start empty every run and are never read from or written to the live data. The recorded
+    traffic is therefore that of a cold start, and two replays of a cassette issue the same
+    requests and give the same result.
+    """
+    global HTTP_CACHE, SNAPSHOT_STORE, JOURNAL, NEWS_INDEX
+    scratch = os.path.abspath(root)
+    if scratch == os.path.abspath(DATA_DIR) or os.path.abspath(GeneralSettings.HTTP_CASSETTE).startswith(scratch + os.sep):
+        raise ValueError(f"HTTP_CASSETTE_DATA_DIR ({root}) must not be the data folder nor contain the cassette.")
+    shutil.rmtree(root, ignore_errors=True)
+    set_data_root(root)
+
+    HTTP_CACHE = HttpCache(cache_dir=rooted(CACHE_DIR), ttl=HTTP_CACHE.ttl)
+    SNAPSHOT_STORE = SnapshotStore(root=rooted(SNAPSHOT_DIR), keep_last=SNAPSHOT_STORE.keep_last,
+                                   keep_daily=SNAPSHOT_STORE.keep_daily)
+    JOURNAL = ExtractionJournal(root=rooted(JOURNAL_DIR), max_age=JOURNAL.max_age, default_max_age=JOURNAL.default_max_age)
+    NEWS_INDEX = NewsIndex(window_days=NEWS_INDEX.window_days, max_items=NEWS_INDEX.max_items)
+    print(f"📂 Cassette run ({active_cassette().mode}): data root {root}")
+
+def _authenticate(results):
+    # With a cassette the login is always part of the traffic (no stored token)
+    auth = BiwengerAuth(email=Credentials.BIWENGER_USERNAME, password=Credentials.BIWENGER_PASSWORD,
+                        primary_league_id=GeneralSettings.LEAGUE_ID,
+                        token_store=None if active_cassette() else TOKEN_STORE_FILE)
+    auth.run()
+    return auth
+
+def _save_user_info(results):
+    auth = results['auth']
+    if auth.player_info:
+        # One row per league; the primary league goes first (agents read the first row)
+        df_user_info = pd.DataFrame([{
+            'user_id': auth.player_info.user_id,
+            'user_name': auth.player_info.user_name,
+            'league_id': league.league_id,
+            'league_name': league.league_name,
+            'team_id': league.team_id,
+            'team_name': league.team_name,
+            'balance': league.balance
+        } for league in auth.player_info.leagues])
+        DataStore().save('user_info', df_user_info)
+        return df_user_info
+
+def _laliga_tables(laliga_data):
+    season_info = laliga_data.season_info()
+
+    # Convert List[ActiveEvent] dataclasses to DataFrame
+    active_events_list = []
+    for event in season_info.active_events:
+        active_events_list.append({
+            'id': event.id,
+            'name': event.name,
+            'status': event.status,
+            'end': event.end,
+            'type': event.type
+        })
+
+    return {
+        'players': laliga_data.df_players,
+        'teams': laliga_data.df_teams,
+        'next_jornada': laliga_data.df_next_jornada,
+        'rounds': pd.DataFrame(season_info.rounds),
+        'active_events': pd.DataFrame(active_events_list)
+    }
+
+def _league_tables(user_league_data):
+    return {
+        'league_players': user_league_data.df_league_players,
+        'league_teams': user_league_data.df_league_table,
+        'market_offers': user_league_data.df_market_offers,
+        'market_sales': user_league_data.df_market_sales
+    }
+
+def _extract_laliga(results):
+    laliga_data = LaLigaGeneralData(results['auth'].session, http_cache=HTTP_CACHE)
+    laliga_data.run()
+    return _laliga_tables(laliga_data)
+
+def _extract_user_league(results):
+    """
+    Runs UserLeagueData for every league of the account concurrently, over the same
+    authenticated session. Squads are refreshed incrementally: only managers whose
+    standings/market fingerprint changed are downloaded again.
+    Returns {league_id: {table: DataFrame}} (ids as str) with the primary league first.
+    """
+    auth = results['auth']
+    leagues = auth.player_info.leagues
+
+    def extract(league):
+        user_league_data = UserLeagueData(session=auth.session, token=auth.token, league_id=league.league_id, user_id=league.team_id,
+                                          squads_cache_file=os.path.join(data_root(), 'cache', f'league_{league.league_id}_squads.json'))
+        user_league_data.run(auth.session)
+        return _league_tables(user_league_data)
+
+    with ThreadPoolExecutor(max_workers=len(leagues)) as executor:
+        extracted = list(executor.map(extract, leagues))
+    return {str(league.league_id): tables for league, tables in zip(leagues, extracted)}
+
+# External sources get their own session: they don't need the Biwenger login and
+# ComuniateData rewrites the session headers.
+def _extract_comuniate(results):
+    # Teams already downloaded by an interrupted run are kept in the journal's partial CSV
+    return ComuniateData(cache_file=rooted(ComuniateData.LINEUP_CACHE_FILE)).run(output_file=JOURNAL.partial_path('comuniate'))
+
+def _extract_news(results):
+    return JornadaPerfectaData(http_cache=HTTP_CACHE, news_index=NEWS_INDEX).run()
+
+def _extract_odds(results):
+    return EuroClubIndexData(http_cache=HTTP_CACHE).run()
+
+def _save_league_tables(league_id, tables: dict):
+    league_store = DataStore(os.path.join(data_root(), 'leagues', str(league_id)))
+    for name, df in tables.items():
+        league_store.save(name, df)
+
+def _save_extracted_data(results):
+    """
+    Saves the current tables in ./data and, if GeneralSettings.SNAPSHOTS is set, a snapshot of
+    the run partitioned by source. Returns the snapshot id (None when snapshots are disabled).
+    """
+    leagues_data = results['user_league']
 
-def extract_and_save_data():
+    # The primary league feeds the agents from the data root (./data); every league is also kept in leagues/<id>
+    primary_league_id, primary_league_tables = next(iter(leagues_data.items()))
+
+    # (source, table, df)
+    tables = [('laliga', name, df) for name, df in results['laliga'].items()]
+    tables += [
+        ('comuniate', 'comuniate', results['comuniate']),
+        ('news', 'news', results['news']),
+        ('odds', 'odds', results['odds']),
+    ]
+    tables += [(f'league_{primary_league_id}', name, df) for name, df in primary_league_tables.items()]
+
+    store = DataStore()
+    run_id = SNAPSHOT_STORE.begin_run() if GeneralSettings.SNAPSHOTS else None
+    for source, name, df in tables:
+        store.save(name, df)
+        if run_id:
+            SNAPSHOT_STORE.save(run_id, source, name, df)
+    if run_id and results.get('user_info') is not None:
+        SNAPSHOT_STORE.save(run_id, 'biwenger', 'user_info', results['user_info'])
+
+    for league_id, league_tables in leagues_data.items():
+        _save_league_tables(league_id, league_tables)
+        for name, df in league_tables.items():
+            if run_id and league_id != primary_league_id:
+                SNAPSHOT_STORE.save(run_id, f'league_{league_id}', name, df, key=f'league_{league_id}/{name}')
+
+    # The news index is only persisted once the run's tables are: a failed run reports its news again
+    NEWS_INDEX.save()
+
+    if run_id:
+        SNAPSHOT_STORE.commit_run(run_id)
+    return run_id
+
+EXTRACTION_STEPS = [
+    PipelineStep('auth', 1, "Authenticating with Biwenger", _authenticate),
+    PipelineStep('user_info', 1.5, "Saving User Info metadata", _save_user_info, ('auth',)),
+    PipelineStep('laliga', 2, "Extracting LaLiga General Data (Players, Teams, Next Match, Season)", _extract_laliga, ('auth',)),
+    PipelineStep('user_league', 3, "Extracting User League Data (Table, Market, My Players)", _extract_user_league, ('auth',)),
+    PipelineStep('comuniate', 4, "Extracting External Data: Comuniate (Lineups & Status)", _extract_comuniate),
+    PipelineStep('news', 5, "Extracting External Data: Jornada Perfecta (News)", _extract_news),
+    PipelineStep('odds', 6, "Extracting External Data: EuroClubIndex (Odds)", _extract_odds),
+    PipelineStep('save', 7, "Saving extracted data", _save_extracted_data,
+                 ('user_info', 'laliga', 'user_league', 'comuniate', 'news', 'odds')),
+]
+
+# Inputs each journaled source depends on: a finished source is reused only if they didn't change.
+# 'news' is not journaled: its table is the diff against NEWS_INDEX, which is only saved with the
+# run, so a resumed run downloads the feed again (one request) and ingests it into the index.
+JOURNALED_SOURCES = {
+    'laliga': lambda results: fingerprint(JOURNAL_VERSION, GeneralSettings.SCORE_TYPE),
+    'user_league': lambda results: fingerprint(
+        JOURNAL_VERSION, GeneralSettings.SCORE_TYPE, results['auth'].player_info.user_id,
+        [(league.league_id, league.team_id) for league in results['auth'].player_info.leagues]
+    ),
+    'comuniate': lambda results: fingerprint(JOURNAL_VERSION),
+    'odds': lambda results: fingerprint(JOURNAL_VERSION),
+}
+
+# Tables a multi-table source can't be without (the rest, e.g. market offers, may be empty)
+REQUIRED_TABLES = {
+    'laliga': ('players', 'teams'),
+    'user_league': ('league_teams', 'league_players'),
+}
+
+def _is_degraded(source: str, output) -> bool:
+    """True for the empty results the extractors return after swallowing an error."""
+    if isinstance(output, pd.DataFrame):
+        return output.empty
+    # user_league returns {league_id: {table: df}}
+    groups = list(output.values()) if source == 'user_league' else [output]
+    return not groups or any(tables.get(name) is None or tables[name].empty
+                             for tables in groups for name in REQUIRED_TABLES.get(source, ()))
+
+def _journaled(step: PipelineStep, inputs_fingerprint: Callable[[dict], str], resumed: list) -> PipelineStep:
+    """
+    Wraps a step so its tables are taken from the journal when a previous (failed) run already
+    finished it with the same inputs, and journaled as soon as it finishes otherwise.
+    """
+    def func(results):
+        key = inputs_fingerprint(results)
+        tables = JOURNAL.load(step.name, key)
+        if tables is not None:
+            resumed.append(step.name)
+            # Single-table sources are journaled as {source: df}
+            return tables[step.name] if list(tables) == [step.name] else tables
+        output = step.func(results)
+        if _is_degraded(step.name, output):
+            # An extractor that swallowed an error returns empty tables: retry it on the next run
+            print(f"⚠️ {step.name} returned no data, not journaled.")
+        else:
+            JOURNAL.save(step.name, key, {step.name: output} if isinstance(output, pd.DataFrame) else output)
+        return output
+    return replace(step, func=func)
+
+def extract_and_save_data(max_workers: int = 4):
     """
     Simulates the data extraction process from main.ipynb.
-    Authenticates with Biwenger and fetches all required data, saving it to CSVs.
+    Authenticates with Biwenger and fetches all required data, saving it with the DataStore
+    (plus a versioned snapshot of the run, see snapshots.SnapshotStore).
+
+    Every source is journaled as soon as it finishes (see journal.ExtractionJournal): if the run
+    fails, the next one only extracts the sources that are missing or stale.
+
+    The steps run as a DAG (see EXTRACTION_STEPS): the external sources (Comuniate,
+    Jornada Perfecta, EuroClubIndex) don't depend on the Biwenger login, so they overlap
+    with it and with each other on a pool of `max_workers` threads.
+
+    With HTTP_MODE=record/replay the HTTP traffic is recorded to / replayed from the HTTP_CASSETTE
+    cassette (see cassette.py) on an empty scratch data root (HTTP_CASSETTE_DATA_DIR): no journal,
+    index or cache of ./data is used or updated, so every source is extracted.
     """
     load_dotenv()
+    if GeneralSettings.HTTP_MODE != 'live' and active_cassette() is None:
+        use_cassette(GeneralSettings.HTTP_CASSETTE, GeneralSettings.HTTP_MODE, GeneralSettings.HTTP_REPLAY_LATENCY)
+    cassette = active_cassette()
+    if cassette is not None:
+        _use_scratch_data_root(GeneralSettings.HTTP_CASSETTE_DATA_DIR)
 
     # Suppress output from imported modules to reduce noise
     f = io.StringIO()
-    
-    try:
-        # Authentication
-        print_step(1, "Authenticating with Biwenger")
-        with redirect_stdout(f):
-            auth = BiwengerAuth(email=Credentials.BIWENGER_USERNAME, password=Credentials.BIWENGER_PASSWORD)
-            auth.run()
-        
-        # Save User Info/Metadata
-        print_step(1.5, "Saving User Info metadata")
-        if auth.player_info:
-            # Convert dataclass to dict
-            user_info_dict = {
-                'user_id': [auth.player_info.user_id],
-                'user_name': [auth.player_info.user_name],
-                'league_id': [auth.player_info.league_id],
-                'league_name': [auth.player_info.league_name],
-                'team_id': [auth.player_info.team_id],
-                'team_name': [auth.player_info.team_name],
-                'balance': [auth.player_info.balance]
-            }
-            df_user_info = pd.DataFrame(user_info_dict)
-            os.makedirs('./data', exist_ok=True)
-            df_user_info.to_csv('./data/user_info.csv', index=False)
-
-        # LaLiga General Data
-        print_step(2, "Extracting LaLiga General Data (Players, Teams, Next Match, Season)")
-        with redirect_stdout(f):
-            laliga_data = LaLigaGeneralData(auth.session)
-            laliga_data.run()
-            season_info = laliga_data.season_info()
-
-        # Fantasy League Data
-        print_step(3, "Extracting User League Data (Table, Market, My Players)")
-        with redirect_stdout(f):
-            user_league_data = UserLeagueData(session=auth.session, token=auth.token, league_id=auth.player_info.league_id, user_id=auth.player_info.team_id)
-            user_league_data.run(auth.session)
+    console = sys.stdout
 
-        # External Data Breakdown
-        print_step(4, "Extracting External Data: Comuniate (Lineups & Status)")
-        with redirect_stdout(f):
-            comuniate = ComuniateData(session=auth.session)
-            df_comuniate = comuniate.run()
+    HTTP_METRICS.reset()
+    HTTP_CACHE.reset_stats()
+    resumed = []
+    steps = [_journaled(step, JOURNALED_SOURCES[step.name], resumed) if step.name in JOURNALED_SOURCES and cassette is None else step
+             for step in EXTRACTION_STEPS]
 
-        print_step(5, "Extracting External Data: Jornada Perfecta (News)")
+    try:
         with redirect_stdout(f):
-            jp = JornadaPerfectaData(session=auth.session)
-            df_news = jp.run()
+            results, timings = run_step_dag(steps, max_workers=max_workers, file=console)
+        # The run is saved: the next one starts from scratch
+        JOURNAL.clear()
 
-        print_step(6, "Extracting External Data: EuroClubIndex (Odds)")
-        with redirect_stdout(f):
-            eci = EuroClubIndexData(session=auth.session)
-            df_odds = eci.run()
-
-        # Saving to CSVs
-        print_step(7, "Saving extracted data to CSVs")
-        os.makedirs('./data', exist_ok=True)
-        
-        laliga_data.df_players.to_csv('./data/players.csv', index=False)
-        laliga_data.df_teams.to_csv('./data/teams.csv', index=False)
-        laliga_data.df_next_jornada.to_csv('./data/next_jornada.csv', index=False)
-        
-        # Save Season info
-        pd.DataFrame(season_info.rounds).to_csv('./data/rounds.csv', index=False)
-        
-        # Convert List[ActiveEvent] dataclasses to DataFrame
-        active_events_list = []
-        for event in season_info.active_events:
-            active_events_list.append({
-                'id': event.id,
-                'name': event.name,
-                'status': event.status,
-                'end': event.end,
-                'type': event.type
-            })
-        pd.DataFrame(active_events_list).to_csv('./data/active_events.csv', index=False)
-
-        user_league_data.df_league_players.to_csv('./data/league_players.csv', index=False)
-        user_league_data.df_league_table.to_csv('./data/league_teams.csv', index=False)
-        user_league_data.df_market_offers.to_csv('./data/market_offers.csv', index=False)
-        user_league_data.df_market_sales.to_csv('./data/market_sales.csv', index=False)
-
-        df_comuniate.to_csv('./data/comuniate.csv', index=False)
-        df_news.to_csv('./data/news.csv', index=False)
-        df_odds.to_csv('./data/odds.csv', index=False)
-        
+        if resumed:
+            print(f"♻️ Resumed from the journal of the previous run: {', '.join(resumed)}")
+        print_step_timings(steps, timings)
+        HTTP_CACHE.print_stats()
+        HTTP_METRICS.print_summary()
+        print(f"📡 HTTP metrics saved: {dump_run_metrics(results.get('save'))}")
+        if results.get('save'):
+            print(f"📸 Snapshot saved: {results['save']}")
         print("✅ Data extraction pipeline completed successfully.")
-        
+        return results.get('save')
+
     except Exception as e:
         print(f"❌ Error during extraction: {e}")
         print("--- Detailed Logs ---")
         print(f.getvalue())
+        HTTP_METRICS.print_summary()
+        dump_run_metrics()
         raise e
 
-def import_data():
+    finally:
+        if cassette is not None and cassette.mode == 'record':
+            cassette.save()
+
+def import_data(snapshot: str = None):
     """
-    Reads the CSV files generated by extraction.
+    Reads the tables generated by extraction from the configured storage backend, or from a
+    previous run when `snapshot` is given (run id, prefix of one, or 'latest').
+    Tables registered in schemas.SCHEMAS only materialize their registered columns (and, for
+    CSV, are read with their dtypes and dates); the rest are loaded as stored.
     """
-    print_step(8, "Importing data from CSVs")
-    files = {
-        'players': './data/players.csv',
-        'teams': './data/teams.csv',
-        'next_match': './data/next_jornada.csv',
-        'league_players': './data/league_players.csv',
-        'league_teams': './data/league_teams.csv',
-        'market_offers': './data/market_offers.csv',
-        'market_sales': './data/market_sales.csv',
-        'comuniate': './data/comuniate.csv',
-        'news': './data/news.csv',
-        'odds': './data/odds.csv',
-        'user_info': './data/user_info.csv',
-        'rounds': './data/rounds.csv',
-        'active_events': './data/active_events.csv'
-    }
-    
+    print_step(8, "Importing data")
+    tables = {schema.key: schema.table for schema in SCHEMAS.values()}
+    tables.update({'news': 'news', 'user_info': 'user_info'})
+
+    if snapshot is not None:
+        entry = SNAPSHOT_STORE.resolve(snapshot)
+        print(f"   📸 Loading snapshot {entry['run_id']}")
+        load = lambda table, **options: SNAPSHOT_STORE.load(entry, table, **options)
+    else:
+        load = DataStore().load
+
     imported_data = {}
-    for name, path in files.items():
-        if os.path.exists(path):
-            try:
-                if os.path.getsize(path) < 5: 
-                     pass
-
-                imported_data[name] = pd.read_csv(path)
-            except pd.errors.EmptyDataError:
-                print(f"⚠️ Warning: {name} ({path}) is empty. Creating empty DataFrame.")
-                imported_data[name] = pd.DataFrame() 
-            except Exception as e:
-                print(f"⚠️ Warning: Could not read {path}. Error: {e}")
-                imported_data[name] = pd.DataFrame()
-        else:
-            print(f"⚠️ Warning: File {path} not found.")
+    for name, table in tables.items():
+        schema = SCHEMAS.get(name)
+        options = {'columns': schema.source_columns, **schema.csv_options()} if schema is not None else {}
+        try:
+            imported_data[name] = load(table, **options)
+        except FileNotFoundError as e:
+            print(f"⚠️ Warning: File {e} not found.")
+            imported_data[name] = pd.DataFrame()
+        except Exception as e:
+            print(f"⚠️ Warning: Could not read {table}. Error: {e}")
             imported_data[name] = pd.DataFrame()
             
     return imported_data
 
 def tables_columns(data):
+    """
+    Normalizes every registered table with its schema (parse, cast and rename to the canonical
+    column names) and adds the derived player averages and fitness matrix.
+    """
     print_step(9, "Renaming columns and normalizing data")
-    rename_maps = {
-        'players': {
-            'id': 'PLAYER_ID', 'name': 'PLAYER_NAME', 'slug': 'PLAYER_SLUG',
-            'teamID': 'PLAYER_TEAM_ID', 'position': 'PLAYER_POSITION',
-            'altPositions': 'PLAYER_ALT_POSITIONS', 'price': 'PLAYER_PRICE',
-            'priceIncrement': 'PLAYER_PRICE_INCREMENT', 'status': 'PLAYER_STATUS',
-            'statusInfo': 'PLAYER_STATUS_INFO', 'fitness': 'PLAYER_FITNESS',
-            'points': 'PLAYER_POINTS', 'pointsHome': 'PLAYER_POINTS_HOME',
-            'pointsAway': 'PLAYER_POINTS_AWAY', 'playedHome': 'PLAYER_PLAYED_HOME',
-            'playedAway': 'PLAYER_PLAYED_AWAY'
-        },
-        'teams': {
-            'id': 'TEAM_ID', 'name': 'TEAM_NAME', 'slug': 'TEAM_SLUG',
-            'next_game_date': 'TEAM_NEXT_GAME_DATE', 'next_game_home': 'TEAM_NEXT_GAME_HOME',
-            'next_game_away': 'TEAM_NEXT_GAME_AWAY', 'next_game': 'TEAM_NEXT_GAME',
-            'is_home': 'TEAM_IS_HOME'
-        },
-        'next_match': {
-            'jornada': 'NEXT_MATCH_JORNADA', 'fecha': 'NEXT_MATCH_FECHA',
-            'local': 'NEXT_MATCH_LOCAL', 'visitante': 'NEXT_MATCH_VISITANTE',
-            'partido': 'NEXT_MATCH_PARTIDO', 'estadio': 'NEXT_MATCH_ESTADIO',
-            'status': 'NEXT_MATCH_STATUS'
-        },
-        'league_players': {
-            'team_id': 'BIWPLAYER_TEAM_ID', 'team_name': 'BIWPLAYER_TEAM_NAME',
-            'player_id': 'BIWPLAYER_ID', 'purchase_date': 'BIWPLAYER_PURCHASE_DATE',
-            'purchase_price': 'BIWPLAYER_PURCHASE_PRICE', 'clause': 'BIWPLAYER_CLAUSE',
-            'clause_locked_until': 'BIWPLAYER_CLAUSE_LOCKED_UNTIL', 'invested': 'BIWPLAYER_INVESTED'
-        },
-        'league_teams': {
-            'id': 'BIWTEAM_ID', 'name': 'BIWTEAM_NAME', 'points': 'BIWTEAM_POINTS',
-            'position': 'BIWTEAM_POSITION', 'teamSize': 'BIWTEAM_TEAM_SIZE',
-            'teamValue': 'BIWTEAM_TEAM_VALUE', 'teamValueInc': 'BIWTEAM_TEAM_VALUE_INC'
-        },
-        'market_offers': {
-            'offer_id': 'MARKET_OFFER_ID', 'amount': 'MARKET_OFFER_AMOUNT',
-            'created': 'MARKET_OFFER_CREATED', 'until': 'MARKET_OFFER_UNTIL',
-            'status': 'MARKET_OFFER_STATUS', 'type': 'MARKET_OFFER_TYPE',
-            'from_id': 'MARKET_OFFER_FROM_ID', 'from_name': 'MARKET_OFFER_FROM_NAME',
-            'requested_player_id': 'MARKET_OFFER_REQUESTED_PLAYER_ID'
-        },
-        'market_sales': {
-            'player_id': 'MARKET_SALE_PLAYER_ID', 'price': 'MARKET_SALE_PRICE',
-            'date': 'MARKET_SALE_DATE', 'until': 'MARKET_SALE_UNTIL',
-            'user_id': 'MARKET_SALE_USER_ID', 'user_name': 'MARKET_SALE_USER_NAME',
-            'clause': 'MARKET_SALE_CLAUSE'
-        },
-        'comuniate': {
-            'posicion': 'COMUNIATE_POSITION', 'nombre': 'COMUNIATE_NAME',
-            'suplente': 'COMUNIATE_SUPPLENT', 'titularidad': 'COMUNIATE_STARTER',
-            'apercibido': 'COMUNIATE_CAUTIONED', 'duda': 'COMUNIATE_DOUBT',
-            'equipo': 'COMUNIATE_TEAM', 'id_equipo_comuniate': 'COMUNIATE_TEAM_ID'
-        },
-        'odds': {
-            'fecha': 'ODDS_FECHA', 'local': 'ODDS_LOCAL', 'visitante': 'ODDS_VISITANTE',
-            '1': 'ODDS_1', 'X': 'ODDS_X', '2': 'ODDS_2',
-            'home_goals': 'ODDS_HOME_GOALS', 'away_goals': 'ODDS_AWAY_GOALS'
-        },
-        'rounds': {
-            'id': 'ROUND_ID', 'name': 'ROUND_NAME', 'short': 'ROUND_SHORT',
-            'status': 'ROUND_STATUS', 'type': 'ROUND_TYPE'
-        },
-        'active_events': {
-            'id': 'EVENT_ID', 'name': 'EVENT_NAME', 'status': 'EVENT_STATUS',
-            'end': 'EVENT_END', 'type': 'EVENT_TYPE'
-        }
-    }
-
-    for key, mapping in rename_maps.items():
-        if key in data and not data[key].empty:
-            data[key] = data[key].rename(columns=mapping)
+    for key, schema in SCHEMAS.items():
+        if key in data:
+            data[key] = schema.normalize(data[key])
 
     # Specific calculations for players
     if 'players' in data and not data['players'].empty:
         dfp = data['players']
-        total_played = dfp['PLAYER_PLAYED_HOME'] + dfp['PLAYER_PLAYED_AWAY']
+        # Nullable Int64 -> float64: missing stats give NaN averages, as in the rest of df_master
+        points_home = dfp['PLAYER_POINTS_HOME'].astype('float64')
+        points_away = dfp['PLAYER_POINTS_AWAY'].astype('float64')
+        played_home = dfp['PLAYER_PLAYED_HOME'].astype('float64')
+        played_away = dfp['PLAYER_PLAYED_AWAY'].astype('float64')
+
         # Avoid division by zero
-        total_played = total_played.replace(0, 1) 
-        
-        data['players']['AVG_POINTS'] = (dfp['PLAYER_POINTS_HOME'] + dfp['PLAYER_POINTS_AWAY']) / total_played
-        
-        played_home = dfp['PLAYER_PLAYED_HOME'].replace(0, 1)
-        played_away = dfp['PLAYER_PLAYED_AWAY'].replace(0, 1)
+        total_played = (played_home + played_away).replace(0, 1)
+
+        data['players']['AVG_POINTS'] = (points_home + points_away) / total_played
+        data['players']['AVG_POINTS_HOME'] = points_home / played_home.replace(0, 1)
+        data['players']['AVG_POINTS_AWAY'] = points_away / played_away.replace(0, 1)
 
-        data['players']['AVG_POINTS_HOME'] = dfp['PLAYER_POINTS_HOME'] / played_home
-        data['players']['AVG_POINTS_AWAY'] = dfp['PLAYER_POINTS_AWAY'] / played_away
+        # Last matches as a fixed-width numeric matrix (FITNESS_POINTS_<i> / FITNESS_STATUS_<i>)
+        if 'PLAYER_FITNESS' in dfp.columns:
+            fitness = fitness_columns(dfp['PLAYER_FITNESS'])
+            data['players'] = pd.concat([data['players'].drop(columns=fitness.columns, errors='ignore'), fitness], axis=1)
 
     return data
 
-def get_data(extract: bool = True):
+def get_data(extract: bool = True, max_workers: int = 4, snapshot: str = None):
     """
     Orchestrates the data pipeline.
     
     Args:
         extract (bool): If True, runs the data extraction process. 
-                        If False, skips extraction and loads data from existing CSVs.
+                        If False, skips extraction and loads the previously saved tables.
+        max_workers (int): Threads used to run independent extraction steps concurrently.
+        snapshot (str): Loads a previous run (run id, prefix of one such as '20261014', or
+                        'latest') instead of the current tables. Use with extract=False.
     
     Returns:
         dict: The processed data dictionary with normalized column names.
+
+    Raises:
+        ValueError: If `snapshot` is combined with extract=True.
     """
+    if extract and snapshot is not None:
+        raise ValueError("snapshot loads a previous run: use it with extract=False.")
     if extract:
-        extract_and_save_data()
+        extract_and_save_data(max_workers=max_workers)
     
-    data = import_data()
+    data = import_data(snapshot=snapshot)
     data = tables_columns(data)
     
     return data
+
+# Extractors of each source for partial refreshes (see src/daemon.py). Comuniate runs without the
+# journal's partial CSV: a refresh always starts from the lineup cache, never from a stale resume file.
+SOURCE_EXTRACTORS = {
+    'laliga': _extract_laliga,
+    'user_league': _extract_user_league,
+    'comuniate': lambda results: ComuniateData(cache_file=rooted(ComuniateData.LINEUP_CACHE_FILE)).run(),
+    'news': _extract_news,
+    'odds': _extract_odds,
+}
+# Stored table name -> key in the imported data (e.g. 'next_jornada' -> 'next_match')
+TABLE_KEYS = {schema.table: key for key, schema in SCHEMAS.items()}
+
+def refresh_source(source: str, results: dict) -> dict:
+    """
+    Extracts a single source, saves its tables and returns them normalized, keyed as in import_data.
+    'user_league' also re-reads the account (user_info: balances change with every sale or
+    purchase) and keeps every league in leagues/<id>; only the primary league is returned.
+
+    Args:
+        source (str): One of SOURCE_EXTRACTORS.
+        results (dict): Results of the steps the source depends on ({'auth': BiwengerAuth} for the
+                        Biwenger sources).
+    """
+    if source == 'user_league':
+        auth = results['auth']
+        auth.get_user_info(primary_league_id=auth.primary_league_id)
+        _save_user_info(results)
+
+    output = SOURCE_EXTRACTORS[source](results)
+    if source == 'user_league':
+        for league_id, league_tables in output.items():
+            _save_league_tables(league_id, league_tables)
+        output = next(iter(output.values()))
+    tables = output if isinstance(output, dict) else {source: output}
+
+    store = DataStore()
+    data = {}
+    for name, df in tables.items():
+        store.save(name, df)
+        data[TABLE_KEYS.get(name, name)] = df
+    if source == 'news':
+        NEWS_INDEX.save()
+    return tables_columns(data)
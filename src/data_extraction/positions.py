@@ -0,0 +1,86 @@
+"""
+Position eligibility as a bitmask.
+
+A player can be lined up in their PLAYER_POSITION and in any of their PLAYER_ALT_POSITIONS. Both
+are encoded once (the "positions" feature of df_master) in a small integer column, POSITION_MASK, with
+one bit per position:
+
+    GK = 1, DF = 2, MF = 4, FW = 8        e.g. a DF who can also play FW -> 2 | 8 = 10
+
+"Players eligible for MF" is then a single vectorized AND over the column (`eligible`) and the
+eligible players of each position in a squad one AND per position (`eligible_counts`).
+"""
+
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+# Biwenger position codes (5 = coach, never eligible)
+POSITION_NAMES = {1: 'GK', 2: 'DF', 3: 'MF', 4: 'FW'}
+POSITION_BITS = {name: 1 << (code - 1) for code, name in POSITION_NAMES.items()}
+POSITION_MASK = 'POSITION_MASK'
+
+_BIT_LOOKUP = {**{code: POSITION_BITS[name] for code, name in POSITION_NAMES.items()}, **POSITION_BITS}
+
+
+def _bit(position) -> int:
+    if isinstance(position, str):
+        position = position.strip()
+    try:
+        return _BIT_LOOKUP.get(position, 0)
+    except TypeError:
+        # Unhashable or missing values (pd.NA) are never eligible
+        return 0
+
+
+def _items(positions) -> list:
+    # Lists of codes (ingestion) or "DF, FW" strings (df_master after the feature engineering)
+    if isinstance(positions, (list, tuple, np.ndarray)):
+        return list(positions)
+    if isinstance(positions, str):
+        return positions.split(',')
+    return []
+
+
+def position_mask(positions: pd.Series, alt_positions: pd.Series = None) -> np.ndarray:
+    """
+    Eligibility bitmask of each player.
+
+    Args:
+        positions (pd.Series): Primary position, as a Biwenger code (1-4) or name ('GK').
+        alt_positions (pd.Series): Alternative positions: lists of codes or names, or "DF, FW" strings.
+
+    Returns:
+        np.ndarray: uint8 bitmask aligned with `positions` (0: not eligible anywhere).
+    """
+    mask = np.fromiter(map(_bit, positions), dtype=np.uint8, count=len(positions))
+    if alt_positions is not None:
+        lists = [_items(items) for items in alt_positions]
+        lengths = np.fromiter(map(len, lists), dtype=np.int64, count=len(lists))
+        flat = list(chain.from_iterable(lists))
+        bits = np.fromiter(map(_bit, flat), dtype=np.uint8, count=len(flat))
+        np.bitwise_or.at(mask, np.repeat(np.arange(len(lists)), lengths), bits)
+    return mask
+
+
+def _masks(df: pd.DataFrame) -> np.ndarray:
+    # df_master saved before POSITION_MASK existed is encoded on the fly
+    if POSITION_MASK in df.columns:
+        return df[POSITION_MASK].to_numpy(dtype=np.uint8)
+    if 'PLAYER_POSITION' not in df.columns:
+        return np.zeros(len(df), dtype=np.uint8)
+    return position_mask(df['PLAYER_POSITION'], df.get('PLAYER_ALT_POSITIONS'))
+
+
+def eligible(df: pd.DataFrame, position: str) -> pd.Series:
+    """Boolean mask of the players of `df` that can be lined up as `position` ('GK', 'DF', 'MF' or 'FW')."""
+    if position not in POSITION_BITS:
+        raise ValueError(f"Unknown position '{position}'. Options: {', '.join(POSITION_BITS)}")
+    return pd.Series((_masks(df) & POSITION_BITS[position]) != 0, index=df.index)
+
+
+def eligible_counts(df: pd.DataFrame) -> dict:
+    """{position: players of `df` eligible for it}. A versatile player counts in each of their positions."""
+    masks = _masks(df)
+    return {name: int(np.count_nonzero(masks & bit)) for name, bit in POSITION_BITS.items()}
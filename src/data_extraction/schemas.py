@@ -0,0 +1,322 @@
+"""
+Schema registry of the extracted tables.
+
+Each TableSchema lists, per column, the name written by the extractors (`source`), the
+canonical name used by the agents (`name`), its dtype, whether it may hold nulls and an
+optional vectorized parser. The registry drives ingestion:
+
+- `import_data` only materializes the registered columns and, for CSV tables, passes the
+  dtypes and date columns to the reader so nothing is inferred.
+- `TableSchema.normalize` parses, fills, casts and renames once, so the later steps
+  (matching, consolidation, feature engineering) receive clean, typed columns.
+
+Tables without a schema (news, user_info) are loaded as stored.
+"""
+
+import ast
+from dataclasses import dataclass
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_numeric_dtype
+
+TIMEZONE = 'Europe/Madrid'
+
+
+# ----------------------------------------------------------------------
+# Vectorized parsers
+# ----------------------------------------------------------------------
+
+def parse_percentage(s: pd.Series) -> pd.Series:
+    """'80%' / '80' / 80 / 0.8 -> 0.8. Text that is not a number becomes NaN."""
+    if is_numeric_dtype(s) and not is_bool_dtype(s):
+        values = s.astype('float64')
+        return values.where(values <= 1, values / 100)
+    text = s.astype('string').str.replace('%', '', regex=False).str.strip()
+    return (pd.to_numeric(text, errors='coerce') / 100).astype('float64')
+
+
+def parse_datetime(s: pd.Series, tz: str = None) -> pd.Series:
+    """Epoch seconds, ISO strings or datetimes -> datetime64 (converted to `tz` when given)."""
+    if is_numeric_dtype(s) and not is_bool_dtype(s):
+        parsed = pd.to_datetime(s, unit='s', errors='coerce', utc=tz is not None)
+    elif is_datetime64_any_dtype(s):
+        parsed = s
+        if tz is not None and parsed.dt.tz is None:
+            parsed = parsed.dt.tz_localize(tz)
+    else:
+        # utc=True accepts strings with different offsets (e.g. across a DST change)
+        parsed = pd.to_datetime(s, errors='coerce', utc=tz is not None)
+    return parsed.dt.tz_convert(tz) if tz is not None else parsed
+
+
+def parse_madrid_datetime(s: pd.Series) -> pd.Series:
+    return parse_datetime(s, TIMEZONE)
+
+
+def parse_bool(s: pd.Series) -> pd.Series:
+    """True/False, 'True'/'False', 1/0 -> nullable boolean."""
+    if is_bool_dtype(s):
+        return s.astype('boolean')
+    text = s.astype('string').str.strip().str.lower()
+    return text.map({'true': True, 'false': False, '1': True, '0': False, '1.0': True, '0.0': False}).astype('boolean')
+
+
+def _literal_list(value):
+    if isinstance(value, list):
+        return value
+    if isinstance(value, (tuple, np.ndarray)):
+        return list(value)
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith('['):
+            try:
+                return list(ast.literal_eval(value))
+            except (ValueError, SyntaxError):
+                return []
+        # Comma separated form ("2, 4")
+        return [int(x) for x in value.split(',') if x.strip().isdigit()]
+    return []
+
+
+def parse_list(s: pd.Series) -> pd.Series:
+    """
+    Lists (Parquet/Arrow), their text form ("[7, 'injured', None]", from CSV) or nulls -> Python lists.
+    Missing values become empty lists.
+    """
+    if s.map(type).eq(list).all():
+        return s
+    return s.map(_literal_list)
+
+
+def parse_int_list(s: pd.Series) -> pd.Series:
+    """Like parse_list, keeping only the integer items (e.g. alternative positions)."""
+    return parse_list(s).map(lambda items: [int(x) for x in items if isinstance(x, (int, float)) and not pd.isna(x)])
+
+
+# ----------------------------------------------------------------------
+# Registry
+# ----------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Column:
+    """
+    Args:
+        source (str): Column name as written by the extractor.
+        name (str): Canonical column name.
+        dtype (str): 'Int64', 'float64', 'boolean', 'object', 'datetime' or 'list'.
+        nullable (bool): If False, nulls are replaced by `default`.
+        parser (Callable): Vectorized function Series -> Series applied before the cast.
+        default: Fill value of non-nullable columns.
+    """
+    source: str
+    name: str
+    dtype: str
+    nullable: bool = True
+    parser: Callable[[pd.Series], pd.Series] = None
+    default: object = None
+
+
+def _cast(s: pd.Series, dtype: str) -> pd.Series:
+    if dtype == 'Int64':
+        if s.dtype != 'Int64':
+            s = pd.to_numeric(s, errors='coerce').astype('Int64')
+        return s
+    if dtype == 'float64':
+        return pd.to_numeric(s, errors='coerce').astype('float64')
+    if dtype == 'boolean':
+        return parse_bool(s)
+    if dtype == 'datetime':
+        return s if is_datetime64_any_dtype(s) else parse_datetime(s)
+    if dtype == 'list':
+        return parse_list(s)
+    return s.astype('object').where(s.notna(), None)
+
+
+@dataclass(frozen=True)
+class TableSchema:
+    """
+    Args:
+        key (str): Key of the table in the `data` dictionary.
+        table (str): Name of the stored table (see storage.DataStore).
+        columns (tuple): Column definitions.
+    """
+    key: str
+    table: str
+    columns: Tuple[Column, ...]
+
+    @property
+    def source_columns(self) -> list:
+        return [col.source for col in self.columns]
+
+    @property
+    def rename_map(self) -> dict:
+        return {col.source: col.name for col in self.columns}
+
+    def csv_options(self) -> dict:
+        """
+        Reader hints for CSV tables: text and float columns are read with their final dtype and
+        datetimes are parsed by the reader. Int64/boolean columns are left to the parser because
+        older files may hold '123.0' or empty cells.
+        """
+        dtype = {}
+        parse_dates = []
+        for col in self.columns:
+            if col.dtype == 'float64' and col.parser is None:
+                dtype[col.source] = 'float64'
+            elif col.dtype in ('object', 'list'):
+                dtype[col.source] = 'object'
+            elif col.dtype == 'datetime' and col.parser is None:
+                parse_dates.append(col.source)
+        return {'dtype': dtype, 'parse_dates': parse_dates}
+
+    def normalize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns the registered columns parsed, filled, cast and renamed to their canonical names.
+        Columns missing from `df` are skipped; a column already under its canonical name is
+        accepted as well, so normalizing twice is harmless. Rows with a null in a non-nullable
+        column without default (the IDs) are dropped.
+        """
+        if df is None or df.empty:
+            return pd.DataFrame() if df is None else df
+
+        columns = {}
+        required = []
+        for col in self.columns:
+            if col.source in df.columns:
+                s = df[col.source]
+            elif col.name in df.columns:
+                s = df[col.name]
+            else:
+                continue
+            if col.parser is not None:
+                s = col.parser(s)
+            if not col.nullable and col.default is not None:
+                s = s.fillna(col.default)
+            elif not col.nullable:
+                required.append(col.name)
+            columns[col.name] = _cast(s, col.dtype)
+        normalized = pd.DataFrame(columns, index=df.index)
+        return normalized.dropna(subset=required) if required else normalized
+
+
+def _schema(key: str, table: str, *columns: Column) -> TableSchema:
+    return TableSchema(key, table, tuple(columns))
+
+
+# Amounts that reach df_master through left joins are float64: missing rows become NaN and
+# comparisons such as `MARKET_SALE_PRICE > 0` stay plain booleans.
+SCHEMAS: Dict[str, TableSchema] = {schema.key: schema for schema in [
+    _schema('players', 'players',
+        Column('id', 'PLAYER_ID', 'Int64', nullable=False),
+        Column('name', 'PLAYER_NAME', 'object'),
+        Column('slug', 'PLAYER_SLUG', 'object'),
+        Column('teamID', 'PLAYER_TEAM_ID', 'Int64'),
+        Column('position', 'PLAYER_POSITION', 'Int64', nullable=False, default=0),
+        Column('altPositions', 'PLAYER_ALT_POSITIONS', 'list', parser=parse_int_list),
+        Column('price', 'PLAYER_PRICE', 'Int64', nullable=False, default=0),
+        Column('priceIncrement', 'PLAYER_PRICE_INCREMENT', 'Int64', nullable=False, default=0),
+        Column('status', 'PLAYER_STATUS', 'object', nullable=False, default='unknown'),
+        Column('statusInfo', 'PLAYER_STATUS_INFO', 'object'),
+        Column('fitness', 'PLAYER_FITNESS', 'list', parser=parse_list),
+        Column('points', 'PLAYER_POINTS', 'Int64', nullable=False, default=0),
+        Column('pointsHome', 'PLAYER_POINTS_HOME', 'Int64'),
+        Column('pointsAway', 'PLAYER_POINTS_AWAY', 'Int64'),
+        Column('playedHome', 'PLAYER_PLAYED_HOME', 'Int64'),
+        Column('playedAway', 'PLAYER_PLAYED_AWAY', 'Int64'),
+    ),
+    _schema('teams', 'teams',
+        Column('id', 'TEAM_ID', 'Int64', nullable=False),
+        Column('name', 'TEAM_NAME', 'object'),
+        Column('slug', 'TEAM_SLUG', 'object'),
+        Column('next_game_date', 'TEAM_NEXT_GAME_DATE', 'datetime'),
+        Column('next_game_home', 'TEAM_NEXT_GAME_HOME', 'object'),
+        Column('next_game_away', 'TEAM_NEXT_GAME_AWAY', 'object'),
+        Column('next_game', 'TEAM_NEXT_GAME', 'object'),
+        Column('is_home', 'TEAM_IS_HOME', 'boolean', parser=parse_bool),
+    ),
+    _schema('next_match', 'next_jornada',
+        Column('jornada', 'NEXT_MATCH_JORNADA', 'object'),
+        Column('fecha', 'NEXT_MATCH_FECHA', 'datetime', parser=parse_madrid_datetime),
+        Column('local', 'NEXT_MATCH_LOCAL', 'object'),
+        Column('visitante', 'NEXT_MATCH_VISITANTE', 'object'),
+        Column('partido', 'NEXT_MATCH_PARTIDO', 'object'),
+        Column('estadio', 'NEXT_MATCH_ESTADIO', 'object'),
+        Column('status', 'NEXT_MATCH_STATUS', 'object'),
+    ),
+    _schema('league_players', 'league_players',
+        Column('team_id', 'BIWPLAYER_TEAM_ID', 'Int64'),
+        Column('team_name', 'BIWPLAYER_TEAM_NAME', 'object'),
+        Column('player_id', 'BIWPLAYER_ID', 'Int64'),
+        Column('purchase_date', 'BIWPLAYER_PURCHASE_DATE', 'datetime'),
+        Column('purchase_price', 'BIWPLAYER_PURCHASE_PRICE', 'float64'),
+        Column('clause', 'BIWPLAYER_CLAUSE', 'float64'),
+        Column('clause_locked_until', 'BIWPLAYER_CLAUSE_LOCKED_UNTIL', 'datetime'),
+        Column('invested', 'BIWPLAYER_INVESTED', 'float64'),
+    ),
+    _schema('league_teams', 'league_teams',
+        Column('id', 'BIWTEAM_ID', 'Int64'),
+        Column('name', 'BIWTEAM_NAME', 'object'),
+        Column('points', 'BIWTEAM_POINTS', 'Int64'),
+        Column('position', 'BIWTEAM_POSITION', 'Int64'),
+        Column('teamSize', 'BIWTEAM_TEAM_SIZE', 'Int64'),
+        Column('teamValue', 'BIWTEAM_TEAM_VALUE', 'float64'),
+        Column('teamValueInc', 'BIWTEAM_TEAM_VALUE_INC', 'float64'),
+    ),
+    _schema('market_offers', 'market_offers',
+        Column('offer_id', 'MARKET_OFFER_ID', 'Int64'),
+        Column('amount', 'MARKET_OFFER_AMOUNT', 'float64'),
+        Column('created', 'MARKET_OFFER_CREATED', 'datetime'),
+        Column('until', 'MARKET_OFFER_UNTIL', 'datetime'),
+        Column('status', 'MARKET_OFFER_STATUS', 'object'),
+        Column('type', 'MARKET_OFFER_TYPE', 'object'),
+        Column('from_id', 'MARKET_OFFER_FROM_ID', 'Int64'),
+        Column('from_name', 'MARKET_OFFER_FROM_NAME', 'object'),
+        Column('requested_player_id', 'MARKET_OFFER_REQUESTED_PLAYER_ID', 'Int64'),
+    ),
+    _schema('market_sales', 'market_sales',
+        Column('player_id', 'MARKET_SALE_PLAYER_ID', 'Int64'),
+        Column('price', 'MARKET_SALE_PRICE', 'float64'),
+        Column('date', 'MARKET_SALE_DATE', 'datetime'),
+        Column('until', 'MARKET_SALE_UNTIL', 'datetime'),
+        Column('user_id', 'MARKET_SALE_USER_ID', 'Int64'),
+        Column('user_name', 'MARKET_SALE_USER_NAME', 'object'),
+        Column('clause', 'MARKET_SALE_CLAUSE', 'float64'),
+    ),
+    _schema('comuniate', 'comuniate',
+        Column('posicion', 'COMUNIATE_POSITION', 'object'),
+        Column('nombre', 'COMUNIATE_NAME', 'object'),
+        # Comuniate shows the alternative as a name: only numeric values are kept (0.0 otherwise)
+        Column('suplente', 'COMUNIATE_SUPPLENT', 'float64', nullable=False, parser=parse_percentage, default=0.0),
+        Column('titularidad', 'COMUNIATE_STARTER', 'float64', nullable=False, parser=parse_percentage, default=0.0),
+        Column('apercibido', 'COMUNIATE_CAUTIONED', 'object'),
+        Column('duda', 'COMUNIATE_DOUBT', 'boolean', parser=parse_bool),
+        Column('equipo', 'COMUNIATE_TEAM', 'object'),
+        Column('id_equipo_comuniate', 'COMUNIATE_TEAM_ID', 'object'),
+    ),
+    _schema('odds', 'odds',
+        Column('fecha', 'ODDS_FECHA', 'datetime', parser=parse_datetime),
+        Column('local', 'ODDS_LOCAL', 'object'),
+        Column('visitante', 'ODDS_VISITANTE', 'object'),
+        Column('1', 'ODDS_1', 'float64'),
+        Column('X', 'ODDS_X', 'float64'),
+        Column('2', 'ODDS_2', 'float64'),
+        Column('home_goals', 'ODDS_HOME_GOALS', 'float64'),
+        Column('away_goals', 'ODDS_AWAY_GOALS', 'float64'),
+    ),
+    _schema('rounds', 'rounds',
+        Column('id', 'ROUND_ID', 'Int64'),
+        Column('name', 'ROUND_NAME', 'object'),
+        Column('short', 'ROUND_SHORT', 'object'),
+        Column('status', 'ROUND_STATUS', 'object'),
+        Column('type', 'ROUND_TYPE', 'object'),
+    ),
+    _schema('active_events', 'active_events',
+        Column('id', 'EVENT_ID', 'Int64'),
+        Column('name', 'EVENT_NAME', 'object'),
+        Column('status', 'EVENT_STATUS', 'object'),
+        Column('end', 'EVENT_END', 'datetime'),
+        Column('type', 'EVENT_TYPE', 'object'),
+    ),
+]}
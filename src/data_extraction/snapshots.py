@@ -0,0 +1,202 @@
+"""
+Versioned snapshots of the extraction runs.
+
+Every run of the pipeline is written to its own partition, besides the current tables in ./data:
+
+    ./data/snapshots/
+        manifest.json                          # index of every run (sorted by run id)
+        run=20261018T093000Z/
+            manifest.json                      # tables, sources and row counts of the run
+            source=laliga/players.parquet
+            source=league_1234/league_players.parquet
+            ...
+
+Run ids are UTC timestamps, so they sort chronologically and a range of runs is selected from the
+index alone: loading one historical run never lists or opens the others.
+
+Retention keeps the last `keep_last` runs plus the latest run of each of the last `keep_daily`
+days (and always the run being committed); the rest are deleted when a run is committed.
+Uncommitted partitions are only deleted once older than ABANDONED_RUN_AGE: until then they may
+belong to a run another process is still writing.
+"""
+
+import json
+import os
+import shutil
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from src.config import GeneralSettings
+from src.data_extraction.storage import DataStore
+
+SNAPSHOT_DIR = './data/snapshots'
+RUN_ID_FORMAT = '%Y%m%dT%H%M%SZ'
+# Seconds after which an uncommitted run partition is considered crashed and deleted
+ABANDONED_RUN_AGE = 6 * 3600
+
+
+def _atomic_write_json(path: str, content: dict):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(content, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class SnapshotStore:
+    """
+    Args:
+        root (str): Folder of the snapshots.
+        backend (str): Storage backend of new runs (see storage.DataStore). Defaults to GeneralSettings.DATA_BACKEND;
+            each run records its own, so changing it doesn't break older snapshots.
+        keep_last (int): Most recent runs always kept.
+        keep_daily (int): Days for which the latest run of the day is kept. 0 disables it.
+    """
+    def __init__(self, root: str = SNAPSHOT_DIR, backend: str = None, keep_last: int = 10, keep_daily: int = 30):
+        self.root = root
+        self.backend = backend or GeneralSettings.DATA_BACKEND
+        self.keep_last = keep_last
+        self.keep_daily = keep_daily
+        self._lock = threading.Lock()
+        self._pending = {}  # {run_id: {key: {'source', 'name', 'rows'}}}
+
+    @property
+    def index_file(self) -> str:
+        return os.path.join(self.root, 'manifest.json')
+
+    def _run_dir(self, run_id: str) -> str:
+        return os.path.join(self.root, f'run={run_id}')
+
+    def _load_index(self) -> dict:
+        if not os.path.exists(self.index_file):
+            return {'runs': []}
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def begin_run(self) -> str:
+        """Creates the partition of a new run and returns its id."""
+        now = datetime.now(timezone.utc)
+        run_id = now.strftime(RUN_ID_FORMAT)
+        while os.path.exists(self._run_dir(run_id)):
+            now += timedelta(seconds=1)
+            run_id = now.strftime(RUN_ID_FORMAT)
+        os.makedirs(self._run_dir(run_id))
+        self._pending[run_id] = {}
+        return run_id
+
+    def save(self, run_id: str, source: str, name: str, df: pd.DataFrame, key: str = None):
+        """
+        Saves table `name` of `source` (e.g. 'laliga', 'league_1234', 'odds') into the run.
+
+        Args:
+            key (str): Name of the table in the manifest. Defaults to `name`; tables of secondary
+                leagues use '<source>/<name>' so they don't shadow the primary league.
+        """
+        store = DataStore(os.path.join(self._run_dir(run_id), f'source={source}'), self.backend, csv_export=False)
+        store.save(name, df)
+        with self._lock:
+            self._pending[run_id][key or name] = {'source': source, 'name': name, 'rows': len(df)}
+
+    def commit_run(self, run_id: str) -> dict:
+        """
+        Writes the manifest of the run, adds it to the index and applies the retention policy.
+        A run only becomes visible once committed.
+        """
+        entry = {
+            'run_id': run_id,
+            'created_at': datetime.strptime(run_id, RUN_ID_FORMAT).replace(tzinfo=timezone.utc).isoformat(),
+            'backend': self.backend,
+            'tables': self._pending.pop(run_id, {})
+        }
+        _atomic_write_json(os.path.join(self._run_dir(run_id), 'manifest.json'), entry)
+
+        index = self._load_index()
+        index['runs'] = sorted([r for r in index['runs'] if r['run_id'] != run_id] + [entry], key=lambda r: r['run_id'])
+        index['runs'] = self._apply_retention(index['runs'], run_id)
+        _atomic_write_json(self.index_file, index)
+        return entry
+
+    def _apply_retention(self, runs: list, current: str) -> list:
+        keep = {r['run_id'] for r in runs[-self.keep_last:]} if self.keep_last else set()
+        # The run being committed is returned to the caller: it must stay loadable
+        keep.add(current)
+        if self.keep_daily:
+            since = (datetime.now(timezone.utc) - timedelta(days=self.keep_daily)).strftime(RUN_ID_FORMAT)
+            latest_of_day = {}
+            for r in runs:
+                if r['run_id'] >= since:
+                    latest_of_day[r['run_id'][:8]] = r['run_id']
+            keep.update(latest_of_day.values())
+
+        kept = []
+        for r in runs:
+            if r['run_id'] in keep:
+                kept.append(r)
+            else:
+                shutil.rmtree(self._run_dir(r['run_id']), ignore_errors=True)
+
+        # Partitions of runs that crashed before being committed (recent ones may be another process' run in progress)
+        committed = {r['run_id'] for r in kept} | set(self._pending)
+        abandoned_before = (datetime.now(timezone.utc) - timedelta(seconds=ABANDONED_RUN_AGE)).strftime(RUN_ID_FORMAT)
+        for folder in os.listdir(self.root):
+            run_id = folder[len('run='):]
+            if folder.startswith('run=') and run_id not in committed and run_id < abandoned_before:
+                shutil.rmtree(os.path.join(self.root, folder), ignore_errors=True)
+        return kept
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def runs(self, start: str = None, end: str = None) -> list:
+        """
+        Returns the committed runs (oldest first) between `start` and `end`, both inclusive.
+        Bounds are run ids or any prefix of one: '20261014' selects the whole day.
+        """
+        selected = []
+        for r in self._load_index()['runs']:
+            run_id = r['run_id']
+            if start and run_id[:len(start)] < start:
+                continue
+            if end and run_id[:len(end)] > end:
+                break
+            selected.append(r)
+        return selected
+
+    def resolve(self, snapshot: str) -> dict:
+        """
+        Returns the index entry of `snapshot`: a run id, a prefix of one (the latest matching run
+        is used, e.g. '20261014') or 'latest'.
+
+        Raises:
+            KeyError: If no committed run matches.
+        """
+        if snapshot == 'latest':
+            runs = self.runs()
+            if not runs:
+                raise KeyError("No snapshots have been saved yet")
+            return runs[-1]
+        matches = self.runs(snapshot, snapshot)
+        if not matches:
+            raise KeyError(f"Snapshot '{snapshot}' not found in {self.root}")
+        # A prefix matching several runs selects the latest one
+        return matches[-1]
+
+    def load(self, entry: dict, key: str, **load_options) -> pd.DataFrame:
+        """
+        Loads table `key` of run `entry` (see DataStore.load for `load_options`).
+
+        Raises:
+            FileNotFoundError: If the run didn't save the table.
+        """
+        table = entry['tables'].get(key)
+        if table is None:
+            raise FileNotFoundError(f"{key} (snapshot {entry['run_id']})")
+        folder = os.path.join(self._run_dir(entry['run_id']), f"source={table['source']}")
+        store = DataStore(folder, entry.get('backend', self.backend), csv_export=False)
+        return store.load(table['name'], **load_options)
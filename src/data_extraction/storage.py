@@ -0,0 +1,218 @@
+"""
+Storage layer for the ./data tables.
+
+Tables are saved and loaded by name (e.g. 'players', 'user_info') through a DataStore, which
+delegates to a backend:
+
+- ParquetBackend: keeps the schema (ints, datetimes, list columns), supports column projection
+  and memory-mapped reads.
+- ArrowIpcBackend: Arrow IPC (Feather v2) files, read through a memory map. The fastest to load.
+- CsvBackend: the historical format. Types are inferred on every read.
+
+Any backend can additionally export each table as CSV for inspection.
+"""
+
+import json
+import os
+
+import pandas as pd
+
+from src.config import GeneralSettings
+
+DATA_DIR = './data'
+# Root the default stores use: DATA_DIR, or the scratch folder of a cassette run (see pipeline)
+_DATA_ROOT = {'root': DATA_DIR}
+# Schema metadata key listing the columns stored as JSON text (mixed-type lists such as PLAYER_FITNESS)
+JSON_COLUMNS_KEY = b'fantasy_crew_json_columns'
+
+
+def data_root() -> str:
+    return _DATA_ROOT['root']
+
+
+def set_data_root(root: str):
+    """Points every store created without an explicit root (DataStore(), load_table) at `root`."""
+    _DATA_ROOT['root'] = root
+
+
+def rooted(path: str) -> str:
+    """A path under DATA_DIR (e.g. './data/cache/http') moved under the current data root."""
+    return os.path.join(data_root(), os.path.relpath(path, DATA_DIR))
+
+
+def _to_arrow_table(df: pd.DataFrame):
+    """
+    Converts a DataFrame to an Arrow table. Object columns Arrow cannot type (lists mixing
+    numbers and strings, e.g. [7, 'injured', None]) are stored as JSON text and listed in the
+    schema metadata so they are decoded back to Python objects on read.
+    """
+    import pyarrow as pa
+
+    df = df.reset_index(drop=True)
+    json_columns = []
+    for col in df.columns:
+        if df[col].dtype == object:
+            try:
+                pa.array(df[col], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                json_columns.append(col)
+
+    if json_columns:
+        df = df.copy()
+        for col in json_columns:
+            df[col] = df[col].map(lambda v: None if v is None else json.dumps(v, default=str))
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[JSON_COLUMNS_KEY] = json.dumps(json_columns).encode('utf-8')
+    return table.replace_schema_metadata(metadata)
+
+
+def _from_arrow_table(table) -> pd.DataFrame:
+    """Converts an Arrow table back to pandas, restoring list and JSON-encoded columns as Python lists."""
+    import pyarrow as pa
+
+    metadata = table.schema.metadata or {}
+    json_columns = json.loads(metadata.get(JSON_COLUMNS_KEY, b'[]'))
+    list_columns = [field.name for field in table.schema
+                    if pa.types.is_list(field.type) or pa.types.is_large_list(field.type)]
+
+    df = table.to_pandas()
+    for col in list_columns:
+        # Arrow returns numpy arrays per row; the rest of the code expects lists
+        df[col] = df[col].map(lambda v: v.tolist() if hasattr(v, 'tolist') else v)
+    for col in json_columns:
+        if col in df.columns:
+            df[col] = df[col].map(lambda v: json.loads(v) if isinstance(v, str) else v)
+    return df
+
+
+class CsvBackend:
+    extension = '.csv'
+
+    def write(self, df: pd.DataFrame, path: str):
+        df.to_csv(path, index=False)
+
+    def read(self, path: str, columns: list = None, dtype: dict = None, parse_dates: list = None) -> pd.DataFrame:
+        try:
+            df = pd.read_csv(path, usecols=lambda c: columns is None or c in columns, dtype=dtype)
+        except pd.errors.EmptyDataError:
+            return pd.DataFrame()
+        for col in parse_dates or []:
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col], errors='coerce')
+        return df
+
+
+class ParquetBackend:
+    extension = '.parquet'
+
+    def write(self, df: pd.DataFrame, path: str):
+        import pyarrow.parquet as pq
+        pq.write_table(_to_arrow_table(df), path)
+
+    def read(self, path: str, columns: list = None, **csv_options) -> pd.DataFrame:
+        import pyarrow.parquet as pq
+        # ParquetFile reads just this file: pq.read_table would add hive-style folder names
+        # (e.g. source=odds in the snapshots) as columns
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        if columns is not None:
+            available = parquet_file.schema_arrow.names
+            columns = [c for c in columns if c in available]
+        return _from_arrow_table(parquet_file.read(columns=columns))
+
+
+class ArrowIpcBackend:
+    extension = '.arrow'
+
+    def write(self, df: pd.DataFrame, path: str):
+        import pyarrow as pa
+        table = _to_arrow_table(df)
+        with pa.OSFile(path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    def read(self, path: str, columns: list = None, **csv_options) -> pd.DataFrame:
+        import pyarrow as pa
+        with pa.memory_map(path, 'r') as source:
+            table = pa.ipc.open_file(source).read_all()
+            if columns is not None:
+                table = table.select([c for c in columns if c in table.schema.names])
+            return _from_arrow_table(table)
+
+
+BACKENDS = {
+    'csv': CsvBackend,
+    'parquet': ParquetBackend,
+    'arrow': ArrowIpcBackend,
+}
+
+
+class DataStore:
+    """
+    Saves and loads named tables under `root` with the configured backend.
+
+    Args:
+        root (str): Folder of the tables (./data, ./data/leagues/<id>, ...). None follows the
+                    current data root (see set_data_root).
+        backend (str): 'parquet', 'arrow' or 'csv'. Defaults to GeneralSettings.DATA_BACKEND.
+        csv_export (bool): Also write every table as <name>.csv. Defaults to GeneralSettings.DATA_CSV_EXPORT.
+    """
+    def __init__(self, root: str = None, backend: str = None, csv_export: bool = None):
+        backend = backend or GeneralSettings.DATA_BACKEND
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown storage backend '{backend}'. Options: {', '.join(BACKENDS)}")
+        self._root = root
+        self.backend = BACKENDS[backend]()
+        self.csv_export = GeneralSettings.DATA_CSV_EXPORT if csv_export is None else csv_export
+
+    @property
+    def root(self) -> str:
+        return self._root if self._root is not None else data_root()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.root, name + self.backend.extension)
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(self.path(name))
+
+    def save(self, name: str, df: pd.DataFrame):
+        os.makedirs(self.root, exist_ok=True)
+        # Write to a temp file and rename so readers never see a half-written table
+        path = self.path(name)
+        tmp_path = path + '.tmp'
+        self.backend.write(df, tmp_path)
+        os.replace(tmp_path, path)
+        if self.csv_export and not isinstance(self.backend, CsvBackend):
+            df.to_csv(os.path.join(self.root, name + '.csv'), index=False)
+
+    def load(self, name: str, columns: list = None, dtype: dict = None, parse_dates: list = None) -> pd.DataFrame:
+        """
+        Loads a table. Only `columns` are materialized when given (missing ones are ignored).
+        `dtype` and `parse_dates` are reader hints for the CSV backend; Parquet and Arrow files
+        already store the column types.
+
+        Raises:
+            FileNotFoundError: If the table has not been saved.
+        """
+        path = self.path(name)
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        return self.backend.read(path, columns, dtype=dtype, parse_dates=parse_dates)
+
+
+def load_table(name: str, columns: list = None, root: str = None) -> pd.DataFrame:
+    """Loads a table from the default store, returning an empty DataFrame if it doesn't exist."""
+    store = DataStore(root)
+    if not store.exists(name):
+        return pd.DataFrame()
+    return store.load(name, columns)
+
+
+def flatten_for_export(df: pd.DataFrame) -> pd.DataFrame:
+    """Returns a copy where list/dict cells are converted to text (for Excel and other flat formats)."""
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].map(lambda v: str(v) if isinstance(v, (list, dict, tuple)) else v)
+    return df
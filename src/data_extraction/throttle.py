@@ -0,0 +1,53 @@
+import threading
+import time
+
+# Pacing (rate limits and retry backoff) is disabled when replaying recorded traffic (see cassette.py)
+_pacing = {'enabled': True}
+
+
+def set_pacing(enabled: bool):
+    _pacing['enabled'] = enabled
+
+
+def pacing_enabled() -> bool:
+    return _pacing['enabled']
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+    Allows `rate` requests per second on average, with bursts of up to `capacity` requests.
+    """
+    def __init__(self, rate: float, capacity: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, tokens: int = 1) -> float:
+        """
+        Blocks until `tokens` are available and consumes them.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        if not pacing_enabled():
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                wait_time = (tokens - self._tokens) / self.rate
+            time.sleep(wait_time)
+            waited += wait_time
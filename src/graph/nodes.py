@@ -18,8 +18,12 @@ def data_analyst_node(state: AgentState) -> dict:
     Node: Data Analyst
     ------------------
     Extracts data, performs feature engineering, and generates df_master.
-    This is the entry point of the workflow.
+    This is the entry point of the workflow. A df_master already in the state (e.g. the
+    resident one of the refresh daemon) is used as is.
     """
+    if state.get("df_master") is not None:
+        return {"error": None}
+
     try:
         analyst = DataAnalyst()
         df_master = analyst.run(extract=True)